@@ -0,0 +1,328 @@
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
+import shutil
+import sqlite3
+import tarfile
+import time
+import uuid
+import zlib
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows; tepe bellek raporlanmaz
+    resource = None
+
+SURUM = 1
+# Veritabanı anlık görüntüsü arşive tek başına gzip'lenerek konur: yüklemeler (webp/avif/jpg) zaten
+# sıkıştırılmış olduğundan arşivin tamamını sıkıştırmak çoğu zaman CPU'yu boşa harcar (varsayılan 'none')
+DB_UYESI = 'database.db.gz'
+MANIFEST_UYESI = 'manifest.json'
+UPLOAD_ONEKI = 'uploads/'
+# Yazılmakta olan görseller (images._atomik_kaydet) yedeğe alınmaz
+ATLANAN_UZANTILAR = ('.tmp',)
+# Dosya okuma/yazma parça boyutu; bellek kullanımı dosya boyutundan bağımsızdır
+PARCA = 1024 * 1024
+# Backup API adımı (sayfa); adımlar arasında kilit bırakılır, yazarlar araya girebilir
+ADIM_SAYFA = 1024
+SIKISTIRMALAR = ('none', 'gz', 'xz')
+DB_SEVIYE = 6
+
+
+class GecersizYedek(ValueError):
+    pass
+
+
+# --- anlık görüntü ---
+
+def anlik_goruntu(kaynak, hedef):
+    """
+    Çalışan veritabanının tutarlı bir kopyasını hedef dosyaya alır. WAL'da VACUUM INTO tek bir okuma
+    transaction'ıdır ve yazarları bekletmez; rollback journal'da okuma kilidi yazarları durduracağından
+    online backup API ADIM_SAYFA'lık adımlarla kullanılır (kaynak bu arada değişirse SQLite kopyayı baştan alır).
+    """
+    if os.path.exists(hedef):
+        os.remove(hedef)
+    baglanti = sqlite3.connect(kaynak, timeout=30)
+    try:
+        if baglanti.execute('PRAGMA journal_mode').fetchone()[0].lower() == 'wal':
+            baglanti.execute('VACUUM INTO ?', (hedef,))
+            return
+        kopya = sqlite3.connect(hedef)
+        try:
+            baglanti.backup(kopya, pages=ADIM_SAYFA, sleep=0.005)
+        finally:
+            kopya.close()
+    finally:
+        baglanti.close()
+
+
+def butunluk(yol):
+    """(integrity_check sonucu, user_version)."""
+    baglanti = sqlite3.connect(yol)
+    try:
+        return baglanti.execute('PRAGMA integrity_check').fetchone()[0], baglanti.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        baglanti.close()
+
+
+# --- yardımcılar ---
+
+class _OzetliOkuyucu:
+    """tarfile.addfile'ın okuduğu baytların SHA-256'sını yol üstünde hesaplar; dosya ikinci kez okunmaz."""
+
+    def __init__(self, dosya):
+        self.dosya = dosya
+        self.ozet = hashlib.sha256()
+
+    def read(self, n=-1):
+        veri = self.dosya.read(n)
+        self.ozet.update(veri)
+        return veri
+
+
+def _kopyala(kaynak, hedef_yol):
+    """Akıştan dosyaya parça parça yazar; (boyut, sha256)."""
+    ozet = hashlib.sha256()
+    boyut = 0
+    with open(hedef_yol, 'wb') as hedef:
+        for parca in iter(lambda: kaynak.read(PARCA), b''):
+            ozet.update(parca)
+            hedef.write(parca)
+            boyut += len(parca)
+    return boyut, ozet.hexdigest()
+
+
+def _icerik_adresli(goreli):
+    # ab/ab<62 hex>(-genişlik).webp|avif: aynı ad her zaman aynı içeriktir
+    parcalar = goreli.split('/')
+    return len(parcalar) == 2 and len(parcalar[0]) == 2 and parcalar[1].startswith(parcalar[0]) and len(parcalar[1].split('.', 1)[0].split('-', 1)[0]) == 64
+
+
+def _dosyalar(klasor):
+    """{göreli yol ('/' ayraçlı): os.stat_result}"""
+    sonuc = {}
+    for dizin, alt_dizinler, adlar in os.walk(klasor):
+        alt_dizinler.sort()
+        for ad in sorted(adlar):
+            if ad.endswith(ATLANAN_UZANTILAR):
+                continue
+            yol = os.path.join(dizin, ad)
+            sonuc[os.path.relpath(yol, klasor).replace(os.sep, '/')] = os.stat(yol)
+    return sonuc
+
+
+def _degismemis(goreli, bilgi, eski):
+    if eski is None or eski['boyut'] != bilgi.st_size:
+        return False
+    return _icerik_adresli(goreli) or eski['mtime'] == bilgi.st_mtime_ns
+
+
+def _sikistirici(cikti, sikistirma, seviye):
+    if sikistirma == 'gz':
+        return gzip.GzipFile(fileobj=cikti, mode='wb', compresslevel=seviye, mtime=0)
+    if sikistirma == 'xz':
+        return lzma.LZMAFile(cikti, mode='wb', preset=seviye)
+    return None
+
+
+def tepe_bellek_mb():
+    """Sürecin bugüne kadarki en yüksek RSS'i (MB); ölçülemiyorsa None."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# --- yedekleme ---
+
+def manifest_oku(yol):
+    """Manifest JSON'u, yanındaki .manifest.json ya da arşivin kendisinden (sonuna kadar akışla okunur)."""
+    if yol.endswith('.json'):
+        with open(yol, encoding='utf-8') as f:
+            return json.load(f)
+    if os.path.exists(yol + '.manifest.json'):
+        return manifest_oku(yol + '.manifest.json')
+    with tarfile.open(yol, mode='r|*') as tar:
+        for uye in tar:
+            if uye.name == MANIFEST_UYESI:
+                return json.load(tar.extractfile(uye))
+    raise GecersizYedek(f'{yol}: manifest bulunamadı')
+
+
+def yedekle(cikti, db_yolu, uploads_klasoru, temel=None, sikistirma='none', seviye=6, gecici_klasor=None):
+    """
+    Veritabanı anlık görüntüsünü (gzip'li) ve yüklemeleri cikti akışına (ikili, seek gerekmez: stdout
+    olabilir) tar olarak yazar; sikistirma 'gz'/'xz' ise tüm akış ayrıca sıkıştırılır. manifest arşivin son üyesidir. temel bir önceki yedeğin manifestiyse
+    artımlı yedek alınır: veritabanı her zaman tam, yüklemelerden sadece yeni/değişenler yazılır; manifest
+    yine tüm dosyaları ve her birinin hangi yedekte olduğunu listeler. Manifesti döndürür.
+    """
+    kimlik = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ') + '-' + uuid.uuid4().hex[:6]
+    manifest = {
+        'surum': SURUM, 'kimlik': kimlik, 'temel': temel['kimlik'] if temel else None,
+        'tarih': datetime.utcnow().isoformat(timespec='seconds'), 'sikistirma': sikistirma, 'dosyalar': {},
+    }
+    eski_dosyalar = temel['dosyalar'] if temel else {}
+    sikistirici = _sikistirici(cikti, sikistirma, seviye)
+    gecici = os.path.join(gecici_klasor or os.path.dirname(db_yolu), f'.yedek-{kimlik}.db')
+    try:
+        with tarfile.open(fileobj=sikistirici or cikti, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+            anlik_goruntu(db_yolu, gecici)
+            durum, user_version = butunluk(gecici)
+            if durum != 'ok':
+                raise GecersizYedek(f'anlık görüntü bozuk: {durum}')
+            with open(gecici, 'rb') as f, gzip.GzipFile(gecici + '.gz', 'wb', compresslevel=DB_SEVIYE, mtime=0) as gz:
+                okuyucu = _OzetliOkuyucu(f)
+                shutil.copyfileobj(okuyucu, gz, PARCA)
+            manifest['veritabani'] = {'boyut': os.path.getsize(gecici), 'sha256': okuyucu.ozet.hexdigest(), 'user_version': user_version}
+            os.remove(gecici)
+            with open(gecici + '.gz', 'rb') as f:
+                tar.addfile(tar.gettarinfo(gecici + '.gz', arcname=DB_UYESI, fileobj=f), f)
+            os.remove(gecici + '.gz')
+
+            yazilan = 0
+            for goreli, bilgi in _dosyalar(uploads_klasoru).items():
+                eski = eski_dosyalar.get(goreli)
+                if _degismemis(goreli, bilgi, eski):
+                    manifest['dosyalar'][goreli] = eski
+                    continue
+                yol = os.path.join(uploads_klasoru, *goreli.split('/'))
+                with open(yol, 'rb') as f:
+                    okuyucu = _OzetliOkuyucu(f)
+                    tar.addfile(tar.gettarinfo(yol, arcname=UPLOAD_ONEKI + goreli, fileobj=f), okuyucu)
+                manifest['dosyalar'][goreli] = {'boyut': bilgi.st_size, 'mtime': bilgi.st_mtime_ns, 'sha256': okuyucu.ozet.hexdigest(), 'yedek': kimlik}
+                yazilan += bilgi.st_size
+            manifest['yazilan_bayt'] = yazilan
+
+            veri = json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True).encode()
+            bilgi = tarfile.TarInfo(MANIFEST_UYESI)
+            bilgi.size, bilgi.mtime = len(veri), int(time.time())
+            tar.addfile(bilgi, io.BytesIO(veri))
+    finally:
+        for yol in (gecici, gecici + '.gz'):
+            if os.path.exists(yol):
+                os.remove(yol)
+    if sikistirici is not None:
+        sikistirici.close()
+    return manifest
+
+
+# --- geri yükleme ---
+
+def _guvenli_yol(kok, goreli):
+    yol = os.path.normpath(os.path.join(kok, *goreli.split('/')))
+    if os.path.isabs(goreli) or not yol.startswith(os.path.normpath(kok) + os.sep):
+        raise GecersizYedek(f'arşivde güvensiz yol: {goreli!r}')
+    return yol
+
+
+def _arsivi_ac(arsiv, db_hedefi, uploads_hedefi, db_al):
+    """Arşivi akışla açar; (manifest, {göreli: (boyut, sha256)}, veritabanı (boyut, sha256) ya da None)."""
+    try:
+        return _arsivi_oku(arsiv, db_hedefi, uploads_hedefi, db_al)
+    except (tarfile.TarError, EOFError, zlib.error, lzma.LZMAError, gzip.BadGzipFile, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise GecersizYedek(f'{arsiv}: arşiv okunamadı ({type(e).__name__}: {e})') from e
+
+
+def _arsivi_oku(arsiv, db_hedefi, uploads_hedefi, db_al):
+    cikarilan = {}
+    veritabani = None
+    manifest = None
+    with tarfile.open(arsiv, mode='r|*') as tar:
+        for uye in tar:
+            if uye.name == MANIFEST_UYESI:
+                manifest = json.load(tar.extractfile(uye))
+            elif uye.name == DB_UYESI:
+                # Zincirde sadece son yedeğin veritabanı geçerli; öncekiler okunup geçilir
+                if db_al:
+                    veritabani = _kopyala(gzip.GzipFile(fileobj=tar.extractfile(uye)), db_hedefi)
+            elif uye.isfile() and uye.name.startswith(UPLOAD_ONEKI):
+                goreli = uye.name[len(UPLOAD_ONEKI):]
+                yol = _guvenli_yol(uploads_hedefi, goreli)
+                os.makedirs(os.path.dirname(yol), exist_ok=True)
+                cikarilan[goreli] = _kopyala(tar.extractfile(uye), yol)
+    if manifest is None:
+        raise GecersizYedek(f'{arsiv}: manifest yok (yarım kalmış yedek?)')
+    if manifest.get('surum') != SURUM:
+        raise GecersizYedek(f'{arsiv}: desteklenmeyen yedek sürümü {manifest.get("surum")!r}')
+    return manifest, cikarilan, veritabani
+
+
+def dogrula_ve_hazirla(arsivler, db_hedefi, uploads_hedefi):
+    """
+    Tam yedek + sırasıyla artımlıları db_hedefi/uploads_hedefi'ne açar ve son manifestle doğrular:
+    zincir sırası, her dosyanın boyut/SHA-256'sı, veritabanı özeti ve integrity_check. Hata GecersizYedek'tir.
+    """
+    onceki = None
+    hashler = {}
+    veritabani = None
+    for sira, arsiv in enumerate(arsivler):
+        manifest, cikarilan, db_bilgisi = _arsivi_ac(arsiv, db_hedefi, uploads_hedefi, db_al=sira == len(arsivler) - 1)
+        beklenen_temel = onceki['kimlik'] if onceki else None
+        if manifest['temel'] != beklenen_temel:
+            raise GecersizYedek(f'{arsiv}: yedek zinciri kopuk (temel {manifest["temel"]!r}, beklenen {beklenen_temel!r}); önce tam yedek ve aradaki artımlılar verilmeli')
+        hashler.update(cikarilan)
+        veritabani = db_bilgisi or veritabani
+        onceki = manifest
+    son = onceki
+    if veritabani is None or (veritabani[0], veritabani[1]) != (son['veritabani']['boyut'], son['veritabani']['sha256']):
+        raise GecersizYedek('veritabanı özeti manifestle uyuşmuyor')
+    durum, user_version = butunluk(db_hedefi)
+    if durum != 'ok':
+        raise GecersizYedek(f'veritabanı integrity_check: {durum}')
+    hatalar = []
+    for goreli, bilgi in son['dosyalar'].items():
+        if hashler.get(goreli) != (bilgi['boyut'], bilgi['sha256']):
+            hatalar.append(goreli)
+        else:
+            # Sonraki artımlı yedek değişmemiş dosyaları mtime ile tanır
+            os.utime(_guvenli_yol(uploads_hedefi, goreli), ns=(bilgi['mtime'], bilgi['mtime']))
+    if hatalar:
+        raise GecersizYedek(f'{len(hatalar)} dosya eksik ya da bozuk, örn. {hatalar[0]}')
+    # Artımlılar arasında silinmiş dosyalar son manifestte yoktur
+    for goreli in set(hashler) - set(son['dosyalar']):
+        os.remove(_guvenli_yol(uploads_hedefi, goreli))
+    return {'kimlik': son['kimlik'], 'dosya': len(son['dosyalar']), 'bayt': sum(b['boyut'] for b in son['dosyalar'].values()), 'user_version': user_version}
+
+
+def geri_yukle(arsivler, db_yolu, uploads_klasoru, sadece_dogrula=False, eskiyi_sakla=True):
+    """
+    Arşivleri veritabanı ve yükleme klasörünün yanındaki geçici konumlara açar, doğrular; doğrulama
+    geçerse ikisini de rename ile yerine koyar. Doğrulama başarısızsa mevcut veriye dokunulmaz.
+    Uygulama durdurulmuşken çalıştırılmalıdır (açık bağlantılar eski dosyayı görmeye devam eder).
+    eskiyi_sakla ise mevcut veritabanı ve yüklemeler .eski-<zaman> uzantısıyla bırakılır.
+    """
+    ek = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    db_gecici = f'{db_yolu}.geri-{ek}'
+    uploads_gecici = f'{uploads_klasoru.rstrip(os.sep)}.geri-{ek}'
+    os.makedirs(uploads_gecici)
+    try:
+        rapor = dogrula_ve_hazirla(arsivler, db_gecici, uploads_gecici)
+        if sadece_dogrula:
+            return rapor
+        eski_db, eski_uploads = f'{db_yolu}.eski-{ek}', f'{uploads_klasoru.rstrip(os.sep)}.eski-{ek}'
+        if os.path.exists(db_yolu):
+            os.replace(db_yolu, eski_db)
+        # Eski veritabanının WAL'ı yeni dosyaya uygulanmamalı
+        for ek_dosya in ('-wal', '-shm', '-journal'):
+            if os.path.exists(db_yolu + ek_dosya):
+                os.replace(db_yolu + ek_dosya, eski_db + ek_dosya)
+        os.replace(db_gecici, db_yolu)
+        if os.path.exists(uploads_klasoru):
+            os.replace(uploads_klasoru, eski_uploads)
+        os.replace(uploads_gecici, uploads_klasoru)
+        if eskiyi_sakla:
+            rapor['eski'] = [yol for yol in (eski_db, eski_uploads) if os.path.exists(yol)]
+        else:
+            for yol in (eski_db, eski_db + '-wal', eski_db + '-shm', eski_db + '-journal'):
+                if os.path.exists(yol):
+                    os.remove(yol)
+            shutil.rmtree(eski_uploads, ignore_errors=True)
+        return rapor
+    finally:
+        if os.path.exists(db_gecici):
+            os.remove(db_gecici)
+        shutil.rmtree(uploads_gecici, ignore_errors=True)
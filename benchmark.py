@@ -0,0 +1,700 @@
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import select, event
+from sqlalchemy.exc import OperationalError
+
+from main import create_app
+from extensions import db
+from models import FinansIslem, KurGecmisi, NetServetGunluk, Kullanici, Gorev, Gunluk, Kitap, Mesaj, ProjeFikri, ProjeGorev, StudioProject, StudioWorkLog
+from rates import FixtureProvider
+import finance_stats
+import backup
+import finance_io
+import ledger
+import loadtest
+import net_worth
+import portfolio
+import rate_history
+import queries
+import search
+import schema
+
+FIXTURE_KURLAR = {'ALTIN': 3000.0, 'GUMUS': 35.0, 'USD': 34.0, 'EUR': 37.0}
+
+
+def gecici_uygulama(veri_dizini, **config):
+    """Geçici bir SQLite veritabanı ve ağa çıkmayan kur kaynağıyla uygulama kurar."""
+    ayarlar = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(veri_dizini, 'bench.db'),
+        'RATES_PROVIDER': FixtureProvider(FIXTURE_KURLAR),
+        'RATES_CACHE_PATH': os.path.join(veri_dizini, 'kurlar.json'),
+        'UPLOAD_FOLDER': os.path.join(veri_dizini, 'uploads'),
+        'TESTING': True,
+    }
+    ayarlar.update(config)
+    app = create_app(ayarlar)
+    with app.app_context():
+        db.create_all()
+        schema.upgrade()
+    return app
+
+
+def sure(etiket, fn, *args):
+    t0 = time.perf_counter()
+    sonuc = fn(*args)
+    print(f'  {etiket:<44} {(time.perf_counter() - t0) * 1000:10.1f} ms')
+    return sonuc
+
+
+def finans_islemleri_uret(adet, yil=10, seed=42):
+    rnd = random.Random(seed)
+    bitis = datetime.utcnow()
+    baslangic = bitis - timedelta(days=365 * yil)
+    aralik = int((bitis - baslangic).total_seconds())
+    for _ in range(adet):
+        tarih = baslangic + timedelta(seconds=rnd.randrange(aralik))
+        zar = rnd.random()
+        if zar < 0.35:
+            yield (tarih, 'GELIR', rnd.choice(['MAAS', 'DIGER']), round(rnd.uniform(100, 50000), 2), 0.0, 'FIZIKSEL', None, 0.0, 'NAKIT', None)
+        elif zar < 0.8:
+            yield (tarih, 'GIDER', rnd.choice(['FATURA', 'KIRA', 'MUTFAK', 'DIGER']), round(rnd.uniform(10, 5000), 2), 0.0, 'FIZIKSEL', None, 0.0, 'NAKIT', None)
+        else:
+            tur = rnd.choice(['ALTIN', 'GUMUS', 'USD', 'EUR'])
+            miktar = round(rnd.uniform(0.1, 20), 4)
+            fiyat = FIXTURE_KURLAR[tur] * rnd.uniform(0.5, 1.1)
+            konum = rnd.choice(['FIZIKSEL', 'BANKA'])
+            banka = rnd.choice(['Ziraat Bankası', 'Akbank', 'Midas']) if konum == 'BANKA' else None
+            yield (tarih, rnd.choice(['VARLIK_ALIM', 'VARLIK_ALIM', 'VARLIK_SATIM']), tur, round(miktar * fiyat, 2), miktar, konum, banka, fiyat, tur, None)
+
+
+def finans_seed(db_yolu, adet, parti=50000):
+    con = sqlite3.connect(db_yolu)
+    sql = 'INSERT INTO finans_islem (tarih, islem_turu, kategori, tutar_tl, miktar, varlik_konumu, banka_adi, birim_fiyat, doviz_turu, aciklama) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    satirlar = []
+    for satir in finans_islemleri_uret(adet):
+        satirlar.append((satir[0].strftime('%Y-%m-%d %H:%M:%S.%f'),) + satir[1:])
+        if len(satirlar) >= parti:
+            con.executemany(sql, satirlar)
+            satirlar = []
+    if satirlar:
+        con.executemany(sql, satirlar)
+    con.commit()
+    con.close()
+
+
+class SorguSayaci:
+    """with bloğu içinde motora giden SQL ifadelerini sayar."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.sayi = 0
+
+    def _say(self, *args):
+        self.sayi += 1
+
+    def __enter__(self):
+        self.sayi = 0
+        event.listen(self.engine, 'before_cursor_execute', self._say)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._say)
+
+
+# Sayfa başına izin verilen en fazla sorgu sayısı. Bütçeler satır sayısından bağımsızdır:
+# bir view'da N+1 oluşursa --rows büyüdükçe sayı bütçeyi aşar.
+SORGU_BUTCELERI = {
+    '/admin/dashboard': 5,
+    '/admin/planner': 2,
+    '/admin/diaries': 3,
+    # Sayfalı listelerde toplamlar yüklenen satırlardan değil ayrı bir sayım/toplam sorgusundan gelir
+    '/admin/books': 4,
+    '/admin/inbox': 3,
+    '/admin/ideas': 5,
+    '/admin/studio': 2,
+    '/admin/skills': 2,
+    '/admin/resume': 2,
+    '/admin/projects': 2,
+}
+
+
+def icerik_seed(adet, gorev_basina=5, seed=42):
+    """Admin sayfalarını dolduracak kadar ilişkili içerik (projeler + görevleri, studio + notları, vb.)."""
+    rnd = random.Random(seed)
+    simdi = datetime.utcnow()
+    db.session.add(Kullanici(kullanici_adi='admin', sifre='admin'))
+    for i in range(adet):
+        proje = ProjeFikri(baslik=f'Proje {i}', durum=rnd.choice(['FIKIR', 'AKTIF', 'AKTIF', 'BITTI']), baslangic_tarihi=simdi - timedelta(days=i), bitis_tarihi=simdi + timedelta(days=i))
+        proje.gorevler = [ProjeGorev(baslik=f'Görev {i}.{j}', durum=rnd.choice(['YAPILACAK', 'SURUYOR', 'BITTI'])) for j in range(gorev_basina)]
+        studio = StudioProject(name=f'Studio {i}', category='Web')
+        studio.work_logs = [StudioWorkLog(note=f'Not {i}.{j}') for j in range(gorev_basina)]
+        gun = simdi - timedelta(days=rnd.randrange(7))
+        db.session.add_all([
+            proje, studio,
+            Gorev(baslik=f'Plan {i}', son_tarih=gun, kategori=rnd.choice(['GOREV', 'HEDEF']), ceyrek=rnd.randint(1, 4), onemli_mi=rnd.random() < 0.2),
+            Gunluk(baslik=f'Günlük {i}', icerik='...', tur='GUNLUK', tarih=gun),
+            Kitap(kitap_adi=f'Kitap {i}', yazar=f'Yazar {i % 7}', sayfa_sayisi=rnd.randint(80, 900), okunma_tarihi=gun),
+            Mesaj(gonderen_ad='Ziyaretçi', gonderen_email='z@example.com', mesaj_icerigi='Merhaba', tarih=gun, okundu_mu=rnd.random() < 0.5),
+        ])
+    db.session.commit()
+
+
+def bench_query_budget(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        app = gecici_uygulama(veri_dizini)
+        with app.app_context():
+            schema.upgrade()
+            icerik_seed(args.rows)
+        istemci = app.test_client()
+        istemci.post('/login', data={'kullanici_adi': 'admin', 'sifre': 'admin'})
+        asimlar = 0
+        with app.app_context():
+            engine = db.engine
+        for yol, butce in SORGU_BUTCELERI.items():
+            istemci.get(yol)  # süreç içi önbellekleri (profil, okunmamış sayacı, kurlar) ısıt
+            with SorguSayaci(engine) as sayac:
+                yanit = istemci.get(yol)
+            durum = 'OK' if sayac.sayi <= butce and yanit.status_code == 200 else 'AŞIM'
+            asimlar += durum != 'OK'
+            print(f'  {durum:<5} {yol:<24} {sayac.sayi:4d} sorgu (bütçe {butce}, HTTP {yanit.status_code})')
+        if asimlar:
+            raise SystemExit(1)
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def eszamanli_yuk(app, okuyucu, yazici, saniye):
+    """Okuyucu thread'ler sayfa sorguları, yazıcılar tek satırlık commit'ler yapar; (okuma, yazma, hata) sayıları."""
+    sayilar = {'okuma': 0, 'yazma': 0, 'hata': 0}
+    kilit = threading.Lock()
+    bitis = time.perf_counter() + saniye
+    yil = datetime.utcnow().year
+
+    def okuma_dongusu():
+        yerel = hata = 0
+        with app.app_context():
+            while time.perf_counter() < bitis:
+                try:
+                    queries.gelen_kutusu().limit(50).all()
+                    queries.yilin_kitaplari(yil).limit(50).all()
+                    yerel += 1
+                except OperationalError:
+                    hata += 1
+                finally:
+                    db.session.remove()
+        with kilit:
+            sayilar['okuma'] += yerel
+            sayilar['hata'] += hata
+
+    def yazma_dongusu():
+        yerel = hata = 0
+        with app.app_context():
+            while time.perf_counter() < bitis:
+                try:
+                    db.session.add(Mesaj(gonderen_ad='Yük', gonderen_email='yuk@example.com', mesaj_icerigi='...'))
+                    db.session.commit()
+                    yerel += 1
+                except OperationalError:
+                    db.session.rollback()
+                    hata += 1
+                finally:
+                    db.session.remove()
+        with kilit:
+            sayilar['yazma'] += yerel
+            sayilar['hata'] += hata
+
+    threadler = [threading.Thread(target=okuma_dongusu) for _ in range(okuyucu)] + [threading.Thread(target=yazma_dongusu) for _ in range(yazici)]
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+    return sayilar
+
+
+def bench_sqlite_profile(args):
+    for profil in ('default', 'production'):
+        veri_dizini = tempfile.mkdtemp(prefix='bench-')
+        try:
+            app = gecici_uygulama(veri_dizini, SQLITE_PROFILE=profil, SQLITE_POOL_SIZE=args.readers + args.writers)
+            with app.app_context():
+                schema.upgrade()
+                icerik_seed(args.rows)
+            sonuc = eszamanli_yuk(app, args.readers, args.writers, args.seconds)
+            print(f'  {profil:<11} okuma {sonuc["okuma"] / args.seconds:9.1f}/s   yazma {sonuc["yazma"] / args.seconds:8.1f}/s   kilit hatası {sonuc["hata"]}')
+        finally:
+            shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+KELIMELER = ('bugün', 'yarın', 'ışık', 'şehir', 'İstanbul', 'Ankara', 'kitap', 'okudum', 'yürüyüş', 'deniz', 'çay', 'kahve',
+             'proje', 'toplantı', 'güzel', 'yorgun', 'mutlu', 'öğrendim', 'kod', 'hata', 'düzelttim', 'müzik', 'sınav', 'ödev',
+             'arkadaş', 'aile', 'yağmur', 'güneş', 'akşam', 'sabah', 'gece', 'spor', 'koşu', 'film', 'dizi', 'yemek', 'ğüşiöç')
+
+
+def gunluk_seed(db_yolu, adet, parti=20000, seed=7):
+    rnd = random.Random(seed)
+    # Nadir kelimeler: seçicilik farkı ölçülsün diye her biri ~%0.1 günlükte
+    nadir = [f'nadir{i}' for i in range(1000)]
+    con = sqlite3.connect(db_yolu)
+    sql = 'INSERT INTO gunluk (baslik, icerik, tarih, tur, duygu) VALUES (?, ?, ?, ?, ?)'
+    bitis = datetime.utcnow()
+    satirlar = []
+    for i in range(adet):
+        govde = ' '.join(rnd.choice(KELIMELER) for _ in range(rnd.randint(40, 160))) + ' ' + rnd.choice(nadir)
+        tarih = (bitis - timedelta(minutes=i * 7)).strftime('%Y-%m-%d %H:%M:%S.%f')
+        satirlar.append((' '.join(rnd.choice(KELIMELER) for _ in range(4)).capitalize(), govde, tarih, 'GUNLUK', 'iyi'))
+        if len(satirlar) >= parti:
+            con.executemany(sql, satirlar)
+            satirlar = []
+    if satirlar:
+        con.executemany(sql, satirlar)
+    con.commit()
+    con.close()
+
+
+def bench_search(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        app = gecici_uygulama(veri_dizini)
+        print(f'{args.rows:,} sentetik günlük üretiliyor...')
+        sure('seed (executemany)', gunluk_seed, os.path.join(veri_dizini, 'bench.db'), args.rows)
+        with app.app_context():
+            def yeniden():
+                adet = search.yeniden_olustur()
+                db.session.commit()
+                return adet
+            sure('search-rebuild (FTS5)', yeniden)
+            for sorgu in ('nadir42', 'isik sehir', 'İSTANBUL yağmur', 'yuruyus', 'kod hat'):
+                sonuc = sure(f'FTS: {sorgu!r}', search.ara, sorgu, None, 20)
+                print(f'      {len(sonuc)} sonuç')
+                kelimeler = search.sorgu_ifadesi(sorgu)[1]
+                # Karşılaştırma: indekssiz LIKE taraması (diyakritik katlama olmadan, sadece ilk kelime)
+                sure(f'LIKE taraması: {kelimeler[0]!r}', lambda: Gunluk.query.filter(Gunluk.icerik.like(f'%{kelimeler[0]}%')).order_by(Gunluk.tarih.desc()).limit(20).all())
+            def tek_ekleme():
+                db.session.add(Gunluk(baslik='Yeni', icerik='nadir42 ışık', tur='GUNLUK'))
+                db.session.commit()
+            sure('tek günlük ekleme (indeks dahil)', tek_ekleme)
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def bench_finance_summary(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        app = gecici_uygulama(veri_dizini)
+        with app.app_context():
+            schema.upgrade()
+        print(f'{args.rows:,} satırlık sentetik defter üretiliyor...')
+        sure('seed (executemany)', finans_seed, os.path.join(veri_dizini, 'bench.db'), args.rows)
+        with app.app_context():
+            def python_dongusu():
+                toplamlar = {}
+                for tarih, islem_turu, kategori, tutar in db.session.execute(select(FinansIslem.tarih, FinansIslem.islem_turu, FinansIslem.kategori, FinansIslem.tutar_tl)):
+                    anahtar = (tarih.strftime('%Y-%m'), islem_turu, kategori)
+                    toplamlar[anahtar] = toplamlar.get(anahtar, 0.0) + tutar
+                return toplamlar
+            sure('python döngüsü (tüm defter)', python_dongusu)
+            sure('SQL GROUP BY (tüm defter, önbelleksiz)', finance_stats._gruplu)
+            sure('seri: ilk çağrı (kapalı aylar materialize)', finance_stats.seri, 'ay', FIXTURE_KURLAR)
+            sure('seri: sıcak (sadece içinde bulunulan ay)', finance_stats.seri, 'ay', FIXTURE_KURLAR)
+            sure('seri: yıllık (sıcak)', finance_stats.seri, 'yil', FIXTURE_KURLAR)
+            eski = FinansIslem.query.order_by(FinansIslem.tarih).first()
+            def eski_islemi_sil():
+                db.session.delete(eski)
+                finance_stats.islem_degisti(eski.tarih)
+                db.session.commit()
+            sure('kapalı ayda silme (tek kova yeniden)', eski_islemi_sil)
+            sure('seri: silme sonrası', finance_stats.seri, 'ay', FIXTURE_KURLAR)
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def _bellekli(olc, etiket, fn, *args):
+    """olc ise tracemalloc ile Python yığınının tepe kullanımını da yazar (süreyi birkaç kat uzatır)."""
+    if not olc:
+        return sure(etiket, fn, *args)
+    tracemalloc.start()
+    try:
+        sonuc = sure(etiket + ' [tracemalloc]', fn, *args)
+        print(f'      tepe bellek {tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB')
+    finally:
+        tracemalloc.stop()
+    return sonuc
+
+
+def bench_finance_io(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        kaynak = gecici_uygulama(veri_dizini)
+        print(f'{args.rows:,} satırlık sentetik defter üretiliyor...')
+        sure('seed (executemany)', finans_seed, os.path.join(veri_dizini, 'bench.db'), args.rows)
+        dosya = os.path.join(veri_dizini, f'defter.{args.format}')
+        with kaynak.app_context():
+            def disa_aktar():
+                with open(dosya, 'w', encoding='utf-8') as f:
+                    for parca in finance_io.disa_aktar(args.format):
+                        f.write(parca)
+            _bellekli(args.memory, f'dışa aktarma ({args.format})', disa_aktar)
+            print(f'      {os.path.getsize(dosya) / 1e6:.1f} MB dosya')
+            beklenen = ledger.defterden_hesapla()
+        hedef_dizini = os.path.join(veri_dizini, 'hedef')
+        os.makedirs(hedef_dizini)
+        hedef = gecici_uygulama(hedef_dizini)
+        with hedef.app_context():
+            finance_stats.seri('ay', FIXTURE_KURLAR)
+            def ice_aktar():
+                with open(dosya, 'rb') as f:
+                    return finance_io.ice_aktar(finance_io.satirlar(f, args.format), parti=args.batch_size)
+            sonuc = _bellekli(args.memory, f'içe aktarma (parti {args.batch_size})', ice_aktar)
+            print(f'      {sonuc["eklenen"]:,} satır')
+            farklar = [(tur, alan) for tur in beklenen for alan in ledger.ALANLAR if abs(beklenen[tur][alan] - ledger.envanter()[tur][alan]) > 1e-6 * max(1.0, abs(beklenen[tur][alan]))]
+            print(f'  bakiyeler kaynakla {"AYNI" if not farklar else "FARKLI: " + str(farklar)}; sapma {len(ledger.sapmalari_bul())}')
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def _portfoy_farki(a, b):
+    """İki ozet() sonucunun havuz satırları arasındaki en büyük göreli fark."""
+    fark = 0.0
+    for x, y in zip(a['havuzlar'], b['havuzlar']):
+        for alan in ('miktar', 'maliyet', 'gerceklesen'):
+            fark = max(fark, abs(x[alan] - y[alan]) / max(1.0, abs(y[alan])))
+    return fark if len(a['havuzlar']) == len(b['havuzlar']) else float('inf')
+
+
+def bench_portfolio(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        app = gecici_uygulama(veri_dizini)
+        print(f'{args.rows:,} satırlık sentetik defter üretiliyor...')
+        sure('seed (executemany)', finans_seed, os.path.join(veri_dizini, 'bench.db'), args.rows)
+        with app.app_context():
+            adet = db.session.execute(select(db.func.count()).select_from(FinansIslem).where(portfolio.VARLIK_ISLEMI)).scalar()
+            plan = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + str(portfolio._sorgu().compile(compile_kwargs={'literal_binds': True})))).all()
+            print(f'  {adet:,} varlık işlemi; plan: {" / ".join(satir[-1] for satir in plan)}')
+            portfoy = portfolio.Portfolio()
+            _bellekli(args.memory, 'tam kurulum (FIFO + ortalama, tek geçiş)', portfoy.yeniden_olustur)
+            for yontem in portfolio.YONTEMLER:
+                ozet = sure(f'ozet({yontem}), değişiklik yok', portfoy.ozet, FIXTURE_KURLAR, yontem)
+                t = ozet['toplam']
+                print(f'      maliyet {t["maliyet"]:,.0f}  değer {t["deger"]:,.0f}  gerçekleşmemiş {t["gerceklesmemis"]:+,.0f}  gerçekleşen {t["gerceklesen"]:+,.0f}')
+
+            # Yeni işlemler: ORM insert icerik_surum'u artırır, sonraki ozet() sadece bunları uygular
+            rnd = random.Random(7)
+            simdi = datetime.utcnow()
+            yeni = [{'tarih': simdi + timedelta(seconds=i), 'islem_turu': rnd.choice(['VARLIK_ALIM', 'VARLIK_SATIM']), 'kategori': tur, 'doviz_turu': tur, 'tutar_tl': round(miktar * FIXTURE_KURLAR[tur], 2), 'miktar': miktar, 'varlik_konumu': 'FIZIKSEL', 'banka_adi': None, 'birim_fiyat': FIXTURE_KURLAR[tur], 'aciklama': None}
+                    for i, (tur, miktar) in enumerate((rnd.choice(list(FIXTURE_KURLAR)), round(rnd.uniform(0.1, 5), 4)) for _ in range(args.new_rows))]
+            finance_io._yaz(yeni)
+            artimli = sure(f'artımlı güncelleme (+{args.new_rows:,} işlem)', portfoy.ozet, FIXTURE_KURLAR, 'fifo')
+            sifirdan = portfolio.Portfolio()
+            sifirdan.yeniden_olustur()
+            print(f'      sıfırdan kurulumla en büyük göreli fark {_portfoy_farki(artimli, sifirdan.ozet(FIXTURE_KURLAR, "fifo")):.2e}')
+
+            # Geriye tarihli işlem sıralamayı bozar: tam yeniden kurulum
+            finance_io._yaz([dict(yeni[0], tarih=simdi - timedelta(days=365))])
+            sure('geriye tarihli ekleme sonrası (yeniden kurulum)', portfoy.ozet, FIXTURE_KURLAR, 'fifo')
+
+            envanter = ledger.envanter()
+            farklar = [tur for tur, degerler in ozet['varliklar'].items() if degerler['eksik'] == 0 and abs(envanter[tur]['toplam'] - portfoy.ozet(FIXTURE_KURLAR)['varliklar'][tur]['miktar']) > 1e-6 * max(1.0, envanter[tur]['toplam'])]
+            print(f'  eldeki miktarlar bakiye tablosuyla {"AYNI" if not farklar else "FARKLI: " + ", ".join(farklar)} (alımsız satışı olmayan varlıklar)')
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def kur_gecmisi_seed(db_yolu, gun, aralik=300, seed=5, parti=50000):
+    """Son gun günlük, aralik saniyede bir nokta: rastgele yürüyüşle FIXTURE_KURLAR'a varan alış/satış; satır sayısını döndürür."""
+    rnd = random.Random(seed)
+    con = sqlite3.connect(db_yolu)
+    sql = 'INSERT INTO kur_gecmisi (varlik, zaman, alis, satis) VALUES (?, ?, ?, ?)'
+    bitis = int(time.time())
+    zaman = bitis - gun * 86400
+    fiyatlar = {varlik: kur * 0.5 for varlik, kur in FIXTURE_KURLAR.items()}
+    adim = (1 / 0.5) ** (1 / ((bitis - zaman) / aralik))
+    satirlar, adet = [], 0
+    while zaman < bitis:
+        for varlik in fiyatlar:
+            fiyatlar[varlik] *= adim * rnd.uniform(0.999, 1.001)
+            satirlar.append((varlik, zaman, round(fiyatlar[varlik], 4), round(fiyatlar[varlik] * 1.01, 4)))
+        if len(satirlar) >= parti:
+            con.executemany(sql, satirlar)
+            adet += len(satirlar)
+            satirlar = []
+        zaman += aralik
+    con.executemany(sql, satirlar)
+    con.commit()
+    con.close()
+    return adet + len(satirlar)
+
+
+def bench_net_worth(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        app = gecici_uygulama(veri_dizini, RATES_PROVIDER=FixtureProvider(FIXTURE_KURLAR))
+        db_yolu = os.path.join(veri_dizini, 'bench.db')
+        print(f'{args.rows:,} satırlık defter ve {args.days:,} günlük kur geçmişi ({args.interval} sn aralıklı) üretiliyor...')
+        sure('defter seed', finans_seed, db_yolu, args.rows)
+        noktalar = sure('kur geçmişi seed', kur_gecmisi_seed, db_yolu, args.days, args.interval)
+        print(f'      {noktalar:,} kur noktası, {os.path.getsize(db_yolu) / 1e6:.0f} MB veritabanı')
+        with app.app_context():
+            gun_sayisi = sure('tam geri doldurma (deftere ve kurlara karşı)', net_worth.kapali_gunleri_doldur)
+            once = {o.gun: o.net_servet for o in NetServetGunluk.query.all()}
+            print(f'      {gun_sayisi:,} gün')
+            silinen = sure('seyreltme (RATE_HISTORY_TIERS)', rate_history.seyrelt, app.config['RATE_HISTORY_TIERS'])
+            kalan = db.session.execute(select(db.func.count()).select_from(KurGecmisi)).scalar()
+            print(f'      {silinen:,} nokta silindi, {kalan:,} kaldı')
+
+            # Seyreltme günün son noktasını koruduğu için gün sonu değerleri değişmemeli
+            net_worth.gunler_degisti({datetime.min.date()})
+            db.session.commit()
+            net_worth.kapali_gunleri_doldur()
+            sonra = {o.gun: o.net_servet for o in NetServetGunluk.query.all()}
+            fark = max((abs(once[gun] - sonra.get(gun, float('inf'))) / max(1.0, abs(once[gun])) for gun in once), default=0.0)
+            print(f'  seyreltme sonrası yeniden üretimle en büyük göreli fark {fark:.2e}')
+
+            bugun = datetime.utcnow().date()
+            kurlar = app.extensions['rate_service'].get_rates()
+            ledger.envanter()
+            seri = sure(f'seri({args.chart_days} gün), anlık görüntülerden', net_worth.seri, bugun - timedelta(days=args.chart_days), None, kurlar, bugun)
+            print(f'      {len(seri):,} nokta')
+            plan = db.session.execute(db.text('EXPLAIN QUERY PLAN SELECT * FROM net_servet_gunluk WHERE gun >= :g ORDER BY gun'), {'g': str(bugun)}).all()
+            print(f'      plan: {" / ".join(satir[-1] for satir in plan)}')
+
+            # Günlük iş: sadece dün eksik
+            db.session.execute(db.delete(NetServetGunluk).where(NetServetGunluk.gun == bugun - timedelta(days=1)))
+            db.session.commit()
+            sure('günlük iş (1 yeni gün)', net_worth.kapali_gunleri_doldur)
+
+            # Geriye tarihli işlem: o günden sonrası silinir, sonraki okuma yeniden üretir
+            finance_io._yaz([{'tarih': datetime.utcnow() - timedelta(days=30), 'islem_turu': 'GELIR', 'kategori': 'MAAS', 'doviz_turu': 'NAKIT', 'tutar_tl': 1000.0, 'miktar': 0.0, 'varlik_konumu': 'FIZIKSEL', 'banka_adi': None, 'birim_fiyat': 0.0, 'aciklama': None}])
+            sure('30 gün geriye tarihli işlem sonrası seri', net_worth.seri, bugun - timedelta(days=args.chart_days), None, kurlar, bugun)
+            artimli = {o.gun: o.net_servet for o in NetServetGunluk.query.all()}
+            net_worth.gunler_degisti({datetime.min.date()})
+            db.session.commit()
+            net_worth.kapali_gunleri_doldur()
+            fark = max((abs(o.net_servet - artimli.get(o.gun, float('inf'))) / max(1.0, abs(o.net_servet)) for o in NetServetGunluk.query.all()), default=0.0)
+            print(f'  artımlı anlık görüntülerle sıfırdan üretim arasındaki en büyük göreli fark {fark:.2e}')
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def yukleme_seed(klasor, toplam_mb, ortalama_kb=400, seed=3):
+    """İçerik adresli (ab/ab….webp) rastgele, sıkıştırılamaz dosyalar; toplam boyutu döner."""
+    rnd = random.Random(seed)
+    toplam = 0
+    while toplam < toplam_mb * 1024 * 1024:
+        veri = rnd.randbytes(rnd.randint(ortalama_kb // 2, ortalama_kb * 3 // 2) * 1024)
+        ozet = hashlib.sha256(veri).hexdigest()
+        os.makedirs(os.path.join(klasor, ozet[:2]), exist_ok=True)
+        with open(os.path.join(klasor, ozet[:2], ozet + '.webp'), 'wb') as f:
+            f.write(veri)
+        toplam += len(veri)
+    return toplam
+
+
+def bench_backup(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        yuklemeler = os.path.join(veri_dizini, 'uploads')
+        app = gecici_uygulama(veri_dizini, UPLOAD_FOLDER=yuklemeler, SQLITE_PROFILE='production')
+        db_yolu = os.path.join(veri_dizini, 'bench.db')
+        print(f'veritabanı (ölçek {args.scale}) ve {args.uploads_mb:,} MB yükleme üretiliyor...')
+        loadtest.seed(db_yolu, loadtest.hacimler(args.scale), rapor=lambda satir: None)
+        sure('yükleme dosyaları', yukleme_seed, yuklemeler, args.uploads_mb)
+        print(f'  veritabanı {os.path.getsize(db_yolu) / 1e6:.0f} MB')
+        tam, artimli = os.path.join(veri_dizini, 'tam.tar'), os.path.join(veri_dizini, 'artimli.tar')
+
+        def yedek_al(yol, temel=None):
+            with open(yol, 'wb') as f:
+                return backup.yedekle(f, db_yolu, yuklemeler, temel, args.compression, args.level)
+
+        with app.app_context():
+            # Yedek sırasında yazma: WAL'da VACUUM INTO yazarları bekletmemeli
+            yazilan = []
+            bitti = threading.Event()
+
+            def yazar():
+                with app.app_context():
+                    while not bitti.is_set():
+                        db.session.add(Mesaj(gonderen_ad='Yük', gonderen_email='yuk@example.com', mesaj_icerigi='...'))
+                        db.session.commit()
+                        yazilan.append(time.perf_counter())
+                        time.sleep(0.01)
+            thread = threading.Thread(target=yazar)
+            thread.start()
+            try:
+                manifest = _bellekli(args.memory, f'tam yedek ({args.compression})', yedek_al, tam)
+            finally:
+                bitti.set()
+                thread.join()
+            bosluklar = [b - a for a, b in zip(yazilan, yazilan[1:])]
+            print(f'      arşiv {os.path.getsize(tam) / 1e6:,.0f} MB; yedek sırasında {len(yazilan)} commit, en uzun bekleme {max(bosluklar, default=0) * 1000:.0f} ms')
+        yeni_mb = max(1, args.uploads_mb // 100)
+        yukleme_seed(yuklemeler, yeni_mb, seed=4)
+        _bellekli(args.memory, f'artımlı yedek (+{yeni_mb} MB)', yedek_al, artimli, manifest)
+        print(f'      arşiv {os.path.getsize(artimli) / 1e6:,.0f} MB')
+        hedef = os.path.join(veri_dizini, 'geri')
+        os.makedirs(hedef)
+        rapor = _bellekli(args.memory, 'geri yükleme (tam + artımlı, doğrulamalı)', backup.geri_yukle, [tam, artimli], os.path.join(hedef, 'bench.db'), os.path.join(hedef, 'uploads'))
+        print(f"      {rapor['dosya']:,} dosya, {rapor['bayt'] / 1e6:,.0f} MB doğrulandı")
+        tepe = backup.tepe_bellek_mb()
+        if tepe:
+            print(f'  süreç tepe RSS {tepe:.0f} MB')
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def _hacim_argumanlari(ozel):
+    """['gunluk=5000', ...] -> {'gunluk': 5000}"""
+    sonuc = {}
+    for arguman in ozel or ():
+        tablo, _, adet = arguman.partition('=')
+        if tablo not in loadtest.HACIMLER or not adet.isdigit():
+            raise SystemExit(f'geçersiz --volume {arguman!r}; tablolar: {", ".join(loadtest.HACIMLER)}')
+        sonuc[tablo] = int(adet)
+    return sonuc
+
+
+def seed_veritabani(veri_dizini, args):
+    """veri_dizini/bench.db'yi --scale/--volume hacimleriyle doldurur ve türetilmiş tabloları kurar."""
+    app = gecici_uygulama(veri_dizini)
+    hacim = loadtest.hacimler(args.scale, **_hacim_argumanlari(args.volume))
+    print(f'seed (ölçek {args.scale}):')
+    t0 = time.perf_counter()
+    loadtest.seed(os.path.join(veri_dizini, 'bench.db'), hacim)
+    with app.app_context():
+        sure('türetilmiş tablolar (bakiye, özetler, arama)', loadtest.turetilmisleri_kur)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+    print(f'  toplam {time.perf_counter() - t0:.1f} s')
+
+
+def bench_seed(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        seed_veritabani(veri_dizini, args)
+        shutil.move(os.path.join(veri_dizini, 'bench.db'), args.out)
+        print(f'{args.out} yazıldı ({os.path.getsize(args.out) / 1e6:.0f} MB)')
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def bench_load(args):
+    veri_dizini = tempfile.mkdtemp(prefix='bench-')
+    try:
+        if args.db:
+            # Yazma istekleri hazır veritabanını değiştirmesin: her koşu bir kopya üzerinde
+            shutil.copyfile(args.db, os.path.join(veri_dizini, 'bench.db'))
+        else:
+            seed_veritabani(veri_dizini, args)
+        app = gecici_uygulama(veri_dizini, METRICS_ENABLED=True, SQLITE_PROFILE=args.profile, SQLITE_POOL_SIZE=args.threads)
+        metrik = app.extensions['metrics']
+        with app.app_context():
+            karisim = loadtest.istek_karisimi(random.Random(args.seed))
+        sonuclar = {}
+        if args.mode in ('client', 'both'):
+            metrik.sifirla()
+            olcumler, gecen = loadtest.test_istemcisiyle(app, karisim, args.requests, seed=args.seed)
+            sonuclar['client'] = loadtest.rapor(olcumler, gecen, metrik, karisim)
+            loadtest.yazdir(f'test client: {args.requests} istek, {gecen:.1f} s', sonuclar['client'])
+        if args.mode in ('http', 'both'):
+            metrik.sifirla()
+            olcumler, gecen = loadtest.http_ile(app, karisim, args.threads, args.seconds, seed=args.seed)
+            sonuclar['http'] = loadtest.rapor(olcumler, gecen, metrik, karisim)
+            loadtest.yazdir(f'HTTP ({args.profile} profil): {args.threads} thread, {gecen:.1f} s', sonuclar['http'])
+        if args.save_baseline:
+            loadtest.taban_yaz(args.save_baseline, sonuclar, scale=args.scale, db=args.db, threads=args.threads, profile=args.profile)
+            print(f'\ntaban yazıldı: {args.save_baseline}')
+        if args.baseline:
+            taban = loadtest.taban_oku(args.baseline)
+            bilgi = taban.get('_bilgi', {})
+            if (bilgi.get('scale'), bilgi.get('db')) != (args.scale, args.db):
+                print(f'\nUYARI: taban farklı veriyle alınmış (scale={bilgi.get("scale")}, db={bilgi.get("db")})')
+            gerilemeler = loadtest.karsilastir(sonuclar, taban, args.tolerance)
+            for mod, etiket, aciklama in gerilemeler:
+                print(f'  GERİLEME [{mod}] {etiket}: {aciklama}')
+            if gerilemeler:
+                sys.exit(1)
+            print(f'\ntabana göre gerileme yok ({args.baseline}, tolerans %{args.tolerance * 100:.0f})')
+    finally:
+        shutil.rmtree(veri_dizini, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sentetik veriyle performans ölçümleri.')
+    alt = parser.add_subparsers(dest='komut', required=True)
+    p = alt.add_parser('finance-summary', help='Aylık/yıllık finans özetleri')
+    p.add_argument('--rows', type=int, default=1_000_000)
+    p.set_defaults(fn=bench_finance_summary)
+    p = alt.add_parser('query-budget', help='Admin sayfalarının sorgu sayısını bütçeyle karşılaştırır (N+1 kontrolü)')
+    p.add_argument('--rows', type=int, default=200)
+    p.set_defaults(fn=bench_query_budget)
+    p = alt.add_parser('sqlite-profile', help='default ve production SQLite profillerinde eşzamanlı okuma/yazma')
+    p.add_argument('--rows', type=int, default=2000)
+    p.add_argument('--readers', type=int, default=8)
+    p.add_argument('--writers', type=int, default=2)
+    p.add_argument('--seconds', type=float, default=5)
+    p.set_defaults(fn=bench_sqlite_profile)
+    p = alt.add_parser('search', help='FTS5 arama: indeks kurulumu ve sorgu süreleri')
+    p.add_argument('--rows', type=int, default=100_000)
+    p.set_defaults(fn=bench_search)
+    p = alt.add_parser('finance-io', help='Akışlı finans dışa/içe aktarma: süre ve tepe bellek')
+    p.add_argument('--rows', type=int, default=200_000)
+    p.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+    p.add_argument('--batch-size', type=int, default=finance_io.PARTI)
+    p.add_argument('--memory', action='store_true', help='tepe belleği tracemalloc ile ölç')
+    p.set_defaults(fn=bench_finance_io)
+    p = alt.add_parser('portfolio', help='Maliyet esası ve kâr/zarar: tam kurulum, değişmeyen okuma ve artımlı güncelleme süreleri')
+    p.add_argument('--rows', type=int, default=500_000)
+    p.add_argument('--new-rows', type=int, default=1000)
+    p.add_argument('--memory', action='store_true', help='tepe belleği tracemalloc ile ölç')
+    p.set_defaults(fn=bench_portfolio)
+    p = alt.add_parser('net-worth', help='Kur geçmişi ve günlük net servet: geri doldurma, seyreltme, grafik okuma süreleri')
+    p.add_argument('--rows', type=int, default=500_000)
+    p.add_argument('--days', type=int, default=3 * 365, help='kur geçmişinin kapsadığı gün')
+    p.add_argument('--interval', type=int, default=300, help='kur noktaları arası saniye (RATES_TTL)')
+    p.add_argument('--chart-days', type=int, default=365)
+    p.set_defaults(fn=bench_net_worth)
+    p = alt.add_parser('backup', help='Akışlı yedek/geri yükleme: süre, tepe bellek, yedek sırasında yazma gecikmesi')
+    p.add_argument('--uploads-mb', type=int, default=2048)
+    p.add_argument('--scale', type=float, default=0.1, help='veritabanı hacmi (seed ölçeği)')
+    p.add_argument('--compression', choices=backup.SIKISTIRMALAR, default='none')
+    p.add_argument('--level', type=int, default=6)
+    p.add_argument('--memory', action='store_true', help='tepe belleği tracemalloc ile ölç')
+    p.set_defaults(fn=bench_backup)
+    hacim = argparse.ArgumentParser(add_help=False)
+    hacim.add_argument('--scale', type=float, default=1.0, help='varsayılan hacimlerin çarpanı (1.0: 1M ziyaretçi, 200k finans işlemi...)')
+    hacim.add_argument('--volume', action='append', metavar='TABLO=ADET', help='tek tablonun hacmini ezer, örn. --volume gorev=100000')
+    p = alt.add_parser('seed', parents=[hacim], help='Tüm modeller için sentetik veritabanı üretir')
+    p.add_argument('--out', default='bench.db')
+    p.set_defaults(fn=bench_seed)
+    p = alt.add_parser('load', parents=[hacim], help='Gerçekçi istek karışımıyla yük testi: endpoint başına p50/p95/p99, istek/s, sorgu/istek')
+    p.add_argument('--db', help='seed ile üretilmiş veritabanı (kopyası kullanılır); verilmezse --scale ile üretilir')
+    p.add_argument('--mode', choices=('client', 'http', 'both'), default='both')
+    p.add_argument('--requests', type=int, default=2000, help='test client modunda istek sayısı')
+    p.add_argument('--threads', type=int, default=8, help='HTTP modunda eşzamanlı istemci sayısı')
+    p.add_argument('--seconds', type=float, default=20, help='HTTP modunda süre')
+    p.add_argument('--profile', choices=('default', 'production'), default='production', help='SQLite profili')
+    p.add_argument('--seed', type=int, default=1)
+    p.add_argument('--save-baseline', metavar='DOSYA', help='sonuçları taban olarak JSON yaz')
+    p.add_argument('--baseline', metavar='DOSYA', help='tabanla karşılaştır; gerileme varsa çıkış kodu 1')
+    p.add_argument('--tolerance', type=float, default=0.25, help='p95 için izin verilen göreli artış')
+    p.set_defaults(fn=bench_load)
+    args = parser.parse_args()
+    args.fn(args)
+
+
+if __name__ == '__main__':
+    main()
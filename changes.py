@@ -0,0 +1,69 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Commit edilen işlemde değişen tabloları dinleyicilere bildirir.
+# ORM nesneleri (add/update/delete) after_flush ile, toplu update/delete/insert ifadeleri do_orm_execute ile yakalanır.
+_dinleyiciler = []
+_commit_oncesi = []
+
+
+def commit_sonrasi(fn):
+    """fn(tablolar: set[str]) her başarılı commit'ten sonra, değişen tablo adlarıyla çağrılır."""
+    _dinleyiciler.append(fn)
+    return fn
+
+
+def commit_oncesi(fn):
+    """fn(session, tablolar: set[str]) commit'ten hemen önce, aynı transaction içinde çağrılır."""
+    _commit_oncesi.append(fn)
+    return fn
+
+
+def _isaretle(session, tablo):
+    session.info.setdefault('degisen_tablolar', set()).add(tablo)
+
+
+def dokun(session, *tablolar):
+    """Satırları değişmeden tabloları değişmiş say (örn. disktaki türev dosyalar); sonraki commit bildirir."""
+    for tablo in tablolar:
+        _isaretle(session, tablo)
+
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session, flush_context):
+    for nesne in list(session.new) + list(session.dirty) + list(session.deleted):
+        tablo = getattr(nesne, '__tablename__', None)
+        if tablo:
+            _isaretle(session, tablo)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _do_orm_execute(state):
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None:
+        _isaretle(state.session, state.bind_mapper.local_table.name)
+
+
+@event.listens_for(Session, 'before_commit')
+def _before_commit(session):
+    if not _commit_oncesi:
+        return
+    session.flush()
+    tablolar = session.info.get('degisen_tablolar')
+    if not tablolar:
+        return
+    for fn in _commit_oncesi:
+        fn(session, set(tablolar))
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    tablolar = session.info.pop('degisen_tablolar', None)
+    if not tablolar:
+        return
+    for fn in _dinleyiciler:
+        fn(tablolar)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('degisen_tablolar', None)
@@ -0,0 +1,221 @@
+import csv
+import io
+import itertools
+import json
+import math
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+
+from extensions import db
+from models import FinansIslem
+import finance_stats
+import ledger
+import net_worth
+
+# CSV başlığı / JSONL anahtarları; dışa aktarım bu sırayla yazar, içe aktarım bu adlarla okur
+KOLONLAR = ('tarih', 'islem_turu', 'kategori', 'tutar_tl', 'miktar', 'varlik_konumu', 'banka_adi', 'birim_fiyat', 'doviz_turu', 'aciklama')
+ZORUNLU = ('tarih', 'islem_turu', 'tutar_tl')
+ISLEM_TURLERI = ('GELIR', 'GIDER', 'VARLIK_ALIM', 'VARLIK_SATIM')
+KONUMLAR = ('FIZIKSEL', 'BANKA')
+# Banka ekstrelerindeki gün.ay.yıl biçimleri; ISO biçimleri fromisoformat ile okunur
+TARIH_BICIMLERI = ('%d.%m.%Y', '%d.%m.%Y %H:%M', '%d.%m.%Y %H:%M:%S', '%d/%m/%Y')
+PARTI = 5000
+# Yanıtta listelenen en fazla hatalı satır; sayım tüm dosya için yapılır
+HATA_LISTESI = 100
+# Dışa aktarımda istemciye gönderilen parça boyutu (karakter)
+PARCA = 64 * 1024
+
+
+class GecersizSatir(ValueError):
+    pass
+
+
+def _metin(kayit, alan, uzunluk):
+    deger = kayit.get(alan)
+    deger = str(deger).strip() if deger is not None else ''
+    return deger[:uzunluk] or None
+
+
+def _sayi(kayit, alan, varsayilan=None):
+    deger = kayit.get(alan)
+    if deger is None or (isinstance(deger, str) and not deger.strip()):
+        if varsayilan is None:
+            raise GecersizSatir(f'{alan} boş')
+        return varsayilan
+    if isinstance(deger, str):
+        deger = deger.strip()
+        # Virgüllü ondalık (1234,56); binlik ayırıcılı biçimler belirsiz olduğu için kabul edilmez
+        if ',' in deger and '.' not in deger:
+            deger = deger.replace(',', '.')
+    try:
+        sayi = float(deger)
+    except (TypeError, ValueError):
+        raise GecersizSatir(f'{alan} sayı değil: {deger!r}') from None
+    if not math.isfinite(sayi) or sayi < 0:
+        raise GecersizSatir(f'{alan} negatif ya da geçersiz: {deger!r}')
+    return sayi
+
+
+def _tarih(deger):
+    if isinstance(deger, datetime):
+        return deger
+    deger = (deger or '').strip() if isinstance(deger, str) else ''
+    if not deger:
+        raise GecersizSatir('tarih boş')
+    try:
+        tarih = datetime.fromisoformat(deger)
+    except ValueError:
+        pass
+    else:
+        # Kayıtlar saat dilimsiz UTC tutulur
+        return tarih.astimezone(timezone.utc).replace(tzinfo=None) if tarih.tzinfo else tarih
+    for bicim in TARIH_BICIMLERI:
+        try:
+            return datetime.strptime(deger, bicim)
+        except ValueError:
+            continue
+    raise GecersizSatir(f'tarih okunamadı: {deger!r}')
+
+
+def dogrula(kayit):
+    """Ham satırı (dict) doğrular ve add_finance_item formunun ürettiği alanlara normalleştirir."""
+    if not isinstance(kayit, dict):
+        raise GecersizSatir('satır bir nesne değil')
+    islem_turu = (_metin(kayit, 'islem_turu', 50) or '').upper()
+    if islem_turu not in ISLEM_TURLERI:
+        raise GecersizSatir(f'islem_turu geçersiz: {kayit.get("islem_turu")!r}')
+    satir = {'tarih': _tarih(kayit.get('tarih')), 'islem_turu': islem_turu, 'tutar_tl': _sayi(kayit, 'tutar_tl'), 'aciklama': _metin(kayit, 'aciklama', 255)}
+    if islem_turu in ('GELIR', 'GIDER'):
+        satir.update(kategori=_metin(kayit, 'kategori', 50) or 'NAKIT', miktar=0.0, banka_adi=None, varlik_konumu='FIZIKSEL', birim_fiyat=0.0, doviz_turu='NAKIT')
+        return satir
+    doviz_turu = (_metin(kayit, 'doviz_turu', 20) or _metin(kayit, 'kategori', 50) or '').upper()
+    if doviz_turu not in ledger.VARLIK_TURLERI or doviz_turu == 'NAKIT':
+        raise GecersizSatir(f'doviz_turu geçersiz: {doviz_turu!r}')
+    miktar = _sayi(kayit, 'miktar')
+    if miktar == 0:
+        raise GecersizSatir('varlık işleminde miktar 0')
+    varlik_konumu = (_metin(kayit, 'varlik_konumu', 50) or 'FIZIKSEL').upper()
+    if varlik_konumu not in KONUMLAR:
+        raise GecersizSatir(f'varlik_konumu geçersiz: {varlik_konumu!r}')
+    satir.update(kategori=doviz_turu, miktar=miktar, banka_adi=_metin(kayit, 'banka_adi', 100), varlik_konumu=varlik_konumu, birim_fiyat=satir['tutar_tl'] / miktar, doviz_turu=doviz_turu)
+    return satir
+
+
+# --- okuyucular: (satır no, kayıt) üretir; dosya belleğe alınmaz ---
+
+def csv_satirlari(akis):
+    """Ayırıcı (',' ya da ';') başlık satırından seçilir; Excel'in Türkçe yerel ayarı ';' kullanır."""
+    baslik = akis.readline()
+    ayirici = ';' if baslik.count(';') > baslik.count(',') else ','
+    okuyucu = csv.DictReader(itertools.chain([baslik], akis), delimiter=ayirici)
+    eksik = [kolon for kolon in ZORUNLU if kolon not in (okuyucu.fieldnames or ())]
+    if eksik:
+        raise GecersizSatir(f'CSV başlığında eksik kolon: {", ".join(eksik)}')
+    for kayit in okuyucu:
+        yield okuyucu.line_num, kayit
+
+
+def jsonl_satirlari(akis):
+    """Bozuk JSON satırı tüm dosyayı durdurmaz: kayıt yerine hata döner ve o satır raporlanır."""
+    for no, satir in enumerate(akis, start=1):
+        if not satir.strip():
+            continue
+        try:
+            yield no, json.loads(satir)
+        except ValueError as e:
+            yield no, GecersizSatir(f'JSON okunamadı: {e}')
+
+
+def bicim_sec(dosya_adi, bicim=None):
+    if bicim:
+        return bicim
+    return 'jsonl' if (dosya_adi or '').lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def satirlar(ikili_akis, bicim):
+    """İkili dosya akışını (yükleme ya da açık dosya) satır satır okunan metne sarar; BOM'lu UTF-8 de kabul edilir."""
+    akis = io.TextIOWrapper(ikili_akis, encoding='utf-8-sig', newline='')
+    return jsonl_satirlari(akis) if bicim == 'jsonl' else csv_satirlari(akis)
+
+
+# --- içe aktarma ---
+
+def _yaz(parti):
+    """Bir partiyi tek transaction'da yazar: executemany INSERT, tür başına bakiye UPDATE'i, etkilenen kapalı aylar ve günler."""
+    # render_nulls: None'lı satırlar ayrı gruplara bölünmez, parti tek executemany olur. ORM insert'i
+    # (Table değil) değişen tablo takibine (changes.py) görünür; dışa aktarmanın ETag'i buna bağlı.
+    db.session.execute(insert(FinansIslem).execution_options(render_nulls=True), parti)
+    ledger.islemleri_yansit([(s['islem_turu'], s['tutar_tl'], s['miktar'], s['doviz_turu'], s['kategori'], s['varlik_konumu']) for s in parti])
+    finance_stats.aylar_degisti({finance_stats.ay_anahtari(s['tarih']) for s in parti})
+    net_worth.gunler_degisti({s['tarih'].date() for s in parti})
+    db.session.commit()
+
+
+def ice_aktar(kayitlar, parti=PARTI, kuru=False):
+    """
+    (satır no, kayıt) akışını doğrulayıp parti parti yazar; bellekte en fazla bir parti tutulur.
+    Geçersiz satırlar atlanır ve raporlanır. Her parti ayrı commit'tir: yarıda kesilen bir aktarımda
+    önceki partiler yazılmış kalır. kuru=True ise sadece doğrular.
+    {'gecerli', 'eklenen', 'gecersiz', 'hatalar': [(satır no, mesaj)]}
+    """
+    sonuc = {'gecerli': 0, 'eklenen': 0, 'gecersiz': 0, 'hatalar': []}
+    bekleyen = []
+    for no, kayit in kayitlar:
+        try:
+            if isinstance(kayit, GecersizSatir):
+                raise kayit
+            bekleyen.append(dogrula(kayit))
+        except GecersizSatir as e:
+            sonuc['gecersiz'] += 1
+            if len(sonuc['hatalar']) < HATA_LISTESI:
+                sonuc['hatalar'].append((no, str(e)))
+            continue
+        sonuc['gecerli'] += 1
+        if len(bekleyen) >= parti:
+            if not kuru:
+                _yaz(bekleyen)
+                sonuc['eklenen'] += len(bekleyen)
+            bekleyen = []
+    if bekleyen and not kuru:
+        _yaz(bekleyen)
+        sonuc['eklenen'] += len(bekleyen)
+    return sonuc
+
+
+# --- dışa aktarma ---
+
+def _sorgu(baslangic=None, bitis=None):
+    sorgu = select(*[getattr(FinansIslem, kolon) for kolon in KOLONLAR]).order_by(FinansIslem.tarih, FinansIslem.id)
+    if baslangic is not None:
+        sorgu = sorgu.where(FinansIslem.tarih >= baslangic)
+    if bitis is not None:
+        sorgu = sorgu.where(FinansIslem.tarih < bitis)
+    return sorgu.execution_options(yield_per=PARTI)
+
+
+def _deger(deger):
+    return deger.isoformat(sep=' ') if isinstance(deger, datetime) else deger
+
+
+def disa_aktar(bicim='csv', baslangic=None, bitis=None):
+    """
+    Defteri tarih sırasıyla CSV ya da JSONL metin parçaları olarak üretir. Satırlar imleçten yield_per
+    ile okunur ve PARCA boyutunda gönderilir; bellek kullanımı defter boyutundan bağımsızdır.
+    Çıktı ice_aktar ile geri okunabilir.
+    """
+    tampon = io.StringIO()
+    yazici = csv.writer(tampon, lineterminator='\n')
+    if bicim == 'csv':
+        yazici.writerow(KOLONLAR)
+    for satir in db.session.execute(_sorgu(baslangic, bitis)):
+        degerler = [_deger(deger) for deger in satir]
+        if bicim == 'csv':
+            yazici.writerow(degerler)
+        else:
+            tampon.write(json.dumps(dict(zip(KOLONLAR, degerler)), ensure_ascii=False) + '\n')
+        if tampon.tell() >= PARCA:
+            yield tampon.getvalue()
+            tampon.seek(0)
+            tampon.truncate()
+    yield tampon.getvalue()
@@ -0,0 +1,132 @@
+from datetime import datetime
+
+from sqlalchemy import select, delete, func, insert
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import FinansIslem, FinansAylikOzet, FinansOzetDurum
+import ledger
+
+
+def ay_anahtari(tarih):
+    return tarih.strftime('%Y-%m')
+
+
+def ay_baslangici(ay):
+    return datetime(int(ay[:4]), int(ay[5:7]), 1)
+
+
+def sonraki_ay(ay):
+    yil, ay_no = int(ay[:4]), int(ay[5:7])
+    return f'{yil + 1}-01' if ay_no == 12 else f'{yil}-{ay_no + 1:02d}'
+
+
+def onceki_ay(ay):
+    yil, ay_no = int(ay[:4]), int(ay[5:7])
+    return f'{yil - 1}-12' if ay_no == 1 else f'{yil}-{ay_no - 1:02d}'
+
+
+def _gruplu(baslangic=None, bitis=None):
+    """GROUP BY ay, islem_turu, kategori SQLite'ta çalışır; tarih filtresi index'li yarı açık aralıktır."""
+    ay = func.strftime('%Y-%m', FinansIslem.tarih)
+    sorgu = select(ay, FinansIslem.islem_turu, FinansIslem.kategori, func.sum(FinansIslem.tutar_tl), func.coalesce(func.sum(FinansIslem.miktar), 0.0), func.count()).group_by(ay, FinansIslem.islem_turu, FinansIslem.kategori)
+    if baslangic is not None:
+        sorgu = sorgu.where(FinansIslem.tarih >= baslangic)
+    if bitis is not None:
+        sorgu = sorgu.where(FinansIslem.tarih < bitis)
+    return [satir for satir in db.session.execute(sorgu).all() if satir[0] is not None]
+
+
+def _kaydet(satirlar):
+    # Oturuma nesne eklemeden: aynı oturumda aynı ay tekrar hesaplandığında (toplu içe aktarma) kimlik çakışması olmaz
+    degerler = [{'ay': ay, 'islem_turu': islem_turu, 'kategori': kategori, 'tutar_tl': tutar_tl or 0.0, 'miktar': miktar or 0.0, 'adet': adet} for ay, islem_turu, kategori, tutar_tl, miktar, adet in satirlar]
+    if degerler:
+        db.session.execute(insert(FinansAylikOzet), degerler)
+
+
+def _kapali_aylari_guncelle(bu_ay):
+    """İçinde bulunulan aydan önceki, henüz materialize edilmemiş ayları bir kez hesaplayıp saklar."""
+    hedef = onceki_ay(bu_ay)
+    durum = db.session.get(FinansOzetDurum, 1)
+    if durum and durum.kapali_ay and durum.kapali_ay >= hedef:
+        return
+    baslangic = None
+    if durum and durum.kapali_ay:
+        baslangic = ay_baslangici(sonraki_ay(durum.kapali_ay))
+    try:
+        if baslangic is None:
+            db.session.execute(delete(FinansAylikOzet))
+        else:
+            db.session.execute(delete(FinansAylikOzet).where(FinansAylikOzet.ay >= sonraki_ay(durum.kapali_ay)))
+        _kaydet(_gruplu(baslangic, ay_baslangici(bu_ay)))
+        if durum is None:
+            durum = FinansOzetDurum(id=1)
+            db.session.add(durum)
+        durum.kapali_ay = hedef
+        db.session.commit()
+    except IntegrityError:
+        # Başka bir worker aynı ayları aynı anda yazdı; onun sonucu geçerli
+        db.session.rollback()
+
+
+def islem_degisti(tarih):
+    """
+    Kapanmış bir aya ait işlem eklendiğinde/silindiğinde o ayın kovasını yeniden hesaplar.
+    Çağıranın oturumunda, commit'ten önce çağrılmalıdır.
+    """
+    if tarih is None:
+        return
+    aylar_degisti({ay_anahtari(tarih)})
+
+
+def aylar_degisti(aylar):
+    """islem_degisti'nin toplu hali: verilen aylardan kapanmış olanların her biri bir kez yeniden hesaplanır."""
+    durum = db.session.get(FinansOzetDurum, 1)
+    if durum is None or not durum.kapali_ay:
+        return
+    for ay in sorted(ay for ay in aylar if ay <= durum.kapali_ay):
+        db.session.execute(delete(FinansAylikOzet).where(FinansAylikOzet.ay == ay))
+        _kaydet(_gruplu(ay_baslangici(ay), ay_baslangici(sonraki_ay(ay))))
+
+
+def aylik_kovalar(simdi=None):
+    """[(ay, islem_turu, kategori, tutar_tl, miktar, adet)] — kapalı aylar tablodan, içinde bulunulan ay SQL'den."""
+    bu_ay = ay_anahtari(simdi or datetime.utcnow())
+    _kapali_aylari_guncelle(bu_ay)
+    kovalar = [(o.ay, o.islem_turu, o.kategori, o.tutar_tl, o.miktar, o.adet) for o in FinansAylikOzet.query.order_by(FinansAylikOzet.ay).all()]
+    kovalar.extend(tuple(satir) for satir in _gruplu(ay_baslangici(bu_ay)))
+    return kovalar
+
+
+def seri(periyot='ay', kurlar=None, simdi=None):
+    """
+    Aylık ya da yıllık gelir/gider dağılımı ve dönem sonu kümülatif bakiyeler.
+    net_servet, dönem sonundaki varlık miktarlarının verilen kurlarla değerlenmesidir.
+    """
+    kurlar = kurlar or {}
+    donemler = {}
+    for ay, islem_turu, kategori, tutar_tl, miktar, adet in aylik_kovalar(simdi):
+        donem = ay if periyot == 'ay' else ay[:4]
+        d = donemler.get(donem)
+        if d is None:
+            d = donemler[donem] = {'donem': donem, 'gelir': 0.0, 'gider': 0.0, 'varlik_alim': 0.0, 'varlik_satim': 0.0, 'islem_sayisi': 0, 'kategoriler': {'GELIR': {}, 'GIDER': {}}, '_fark': {tur: 0.0 for tur in ledger.VARLIK_TURLERI}}
+        alan = islem_turu.lower()
+        if alan in d:
+            d[alan] += tutar_tl
+        if islem_turu in d['kategoriler']:
+            d['kategoriler'][islem_turu][kategori] = d['kategoriler'][islem_turu].get(kategori, 0.0) + tutar_tl
+        d['islem_sayisi'] += adet
+        for tur, d_toplam, _, _ in ledger.islem_etkileri(islem_turu, tutar_tl, miktar, None, kategori, None):
+            d['_fark'][tur] += d_toplam
+
+    bakiyeler = {tur: 0.0 for tur in ledger.VARLIK_TURLERI}
+    sonuc = []
+    for donem in sorted(donemler):
+        d = donemler[donem]
+        for tur, fark in d.pop('_fark').items():
+            bakiyeler[tur] += fark
+        d['net'] = d['gelir'] - d['gider']
+        d['bakiyeler'] = dict(bakiyeler)
+        d['net_servet'] = bakiyeler['NAKIT'] + sum(bakiyeler[tur] * kurlar.get(tur, 0.0) for tur in ledger.VARLIK_TURLERI if tur != 'NAKIT')
+        sonuc.append(d)
+    return sonuc
@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from markupsafe import Markup
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Responsive varyant genişlikleri (px); orijinalden geniş olanlar üretilmez
+GENISLIKLER = (320, 640, 1280)
+# Ana görselin (src) en fazla genişliği
+MAKS_GENISLIK = 1920
+# Pillow AVIF desteğiyle derlenmemişse sadece WebP üretilir
+AVIF_VAR = features.check('avif')
+# Varyantları henüz tamamlanmamış görselin dosya listesi bu kadar saniye önbellekte kalır; tamamlanınca kalıcıdır
+EKSIK_TTL = 5
+
+# url_for('static', filename='uploads/ab/<sha256>.webp') biçimindeki içerik adresli URL'ler
+ICERIK_URL = re.compile(r'/uploads/([0-9a-f]{2})/([0-9a-f]{64})\.webp$')
+
+
+class GecersizResim(ValueError):
+    pass
+
+
+def _duzlestir(resim):
+    """EXIF yönünü piksellere uygular ve WebP/AVIF'in kabul ettiği moda çevirir."""
+    resim = ImageOps.exif_transpose(resim)
+    if resim.mode in ('RGBA', 'LA') or (resim.mode == 'P' and 'transparency' in resim.info):
+        return resim.convert('RGBA')
+    return resim.convert('RGB')
+
+
+def _atomik_kaydet(resim, yol, bicim, **secenekler):
+    # Yarım yazılmış dosya hiçbir zaman sunulmasın diye önce geçici ada
+    gecici = f'{yol}.{threading.get_ident()}.tmp'
+    # exif / icc parametresi verilmediği için meta veriler yeni dosyaya taşınmaz
+    resim.save(gecici, bicim, **secenekler)
+    os.replace(gecici, yol)
+
+
+class ImagePipeline:
+    """
+    Yüklenen görselleri işler. kaydet() istek içinde dosyayı akış halinde diske yazıp SHA-256'sını çıkarır
+    ve EXIF'siz, en fazla MAKS_GENISLIK genişlikte ana WebP'yi üretir (veritabanına yazılacak URL bu dosyadır).
+    Küçük genişlikler ve AVIF kopyaları arka plandaki iş havuzunda üretilir; hazır olanlar resim() ile
+    <picture>/srcset olarak basılır. bitince(ozet) tüm varyantlar yazılınca iş thread'inde çağrılır. Aynı içerik ikinci kez yüklenirse hiçbir şey yeniden üretilmez.
+    """
+
+    def __init__(self, klasor, gecici_klasor, genislikler=GENISLIKLER, maks_genislik=MAKS_GENISLIK, kalite=80, isci=2, bitince=None):
+        self.klasor = klasor
+        self.gecici_klasor = gecici_klasor
+        self.genislikler = tuple(sorted(genislikler))
+        self.maks_genislik = maks_genislik
+        self.kalite = kalite
+        self.bitince = bitince
+        self._havuz = ThreadPoolExecutor(max_workers=isci, thread_name_prefix='resim')
+        self._lock = threading.Lock()
+        self._bekleyen = {}
+        self._hazir = {}
+        os.makedirs(gecici_klasor, exist_ok=True)
+
+    def _genislik_yolu(self, ozet):
+        # Ana görselin kodlanmış genişliği; ozet ile başladığı için uploads GC'si blobla birlikte siler
+        return os.path.join(self.klasor, ozet[:2], f'{ozet}.genislik')
+
+    def ana_genislik(self, ozet):
+        """Ana WebP'nin gerçek genişliği: kayıtta yazılan yan dosyadan, yoksa (eski yüklemeler) WebP başlığından."""
+        try:
+            with open(self._genislik_yolu(ozet)) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            pass
+        try:
+            with Image.open(self._yol(ozet)) as resim:
+                return resim.width
+        except OSError:
+            return self.maks_genislik
+
+    def _yol(self, ozet, genislik=None, uzanti='webp'):
+        ad = ozet if genislik is None else f'{ozet}-{genislik}'
+        return os.path.join(self.klasor, ozet[:2], f'{ad}.{uzanti}')
+
+    def goreli_yol(self, ozet, genislik=None, uzanti='webp'):
+        """UPLOAD_FOLDER'ın static altındaki adıyla birlikte url_for('static', filename=...) için."""
+        return os.path.relpath(self._yol(ozet, genislik, uzanti), os.path.dirname(self.klasor)).replace(os.sep, '/')
+
+    def kaydet(self, dosya):
+        """dosya: read() destekleyen nesne (FileStorage, açık dosya). Ana WebP'nin göreli yolunu döner."""
+        fd, gecici = tempfile.mkstemp(dir=self.gecici_klasor)
+        ozet = hashlib.sha256()
+        with os.fdopen(fd, 'wb') as hedef:
+            while True:
+                parca = dosya.read(64 * 1024)
+                if not parca:
+                    break
+                ozet.update(parca)
+                hedef.write(parca)
+        ozet = ozet.hexdigest()
+        ana = self._yol(ozet)
+        try:
+            if os.path.exists(ana):
+                os.remove(gecici)
+                return self.goreli_yol(ozet)
+            with Image.open(gecici) as resim:
+                resim.load()
+                resim = _duzlestir(resim)
+            os.makedirs(os.path.dirname(ana), exist_ok=True)
+            ana_resim = resim.copy()
+            ana_resim.thumbnail((self.maks_genislik, self.maks_genislik * 4), Image.LANCZOS)
+            _atomik_kaydet(ana_resim, ana, 'WEBP', quality=self.kalite, method=4)
+            gecici_genislik = f'{self._genislik_yolu(ozet)}.{threading.get_ident()}.tmp'
+            with open(gecici_genislik, 'w') as f:
+                f.write(str(ana_resim.width))
+            os.replace(gecici_genislik, self._genislik_yolu(ozet))
+        except (OSError, Image.DecompressionBombError) as e:
+            os.remove(gecici)
+            raise GecersizResim(str(e)) from e
+        with self._lock:
+            is_ = self._bekleyen[ozet] = self._havuz.submit(self._varyantlar, ozet, gecici, ana_resim.width)
+        is_.add_done_callback(lambda is_: self._sonuc(ozet, is_))
+        return self.goreli_yol(ozet)
+
+    @staticmethod
+    def _sonuc(ozet, is_):
+        # İstek akışında kimse result() çağırmaz; hata loglanmazsa srcset eksik dosyaları göstermeye devam eder
+        hata = is_.exception()
+        if hata is not None:
+            logger.error('%s varyantları üretilemedi', ozet[:12], exc_info=hata)
+
+    def _varyantlar(self, ozet, gecici, genislik):
+        try:
+            with Image.open(gecici) as resim:
+                resim.load()
+                resim = _duzlestir(resim)
+            for hedef in self.genislikler:
+                if hedef >= genislik:
+                    break
+                kucuk = resim.copy()
+                kucuk.thumbnail((hedef, hedef * 4), Image.LANCZOS)
+                _atomik_kaydet(kucuk, self._yol(ozet, hedef), 'WEBP', quality=self.kalite, method=4)
+                if AVIF_VAR:
+                    _atomik_kaydet(kucuk, self._yol(ozet, hedef, 'avif'), 'AVIF', quality=self.kalite - 20)
+            if AVIF_VAR:
+                ana = resim.copy()
+                ana.thumbnail((self.maks_genislik, self.maks_genislik * 4), Image.LANCZOS)
+                _atomik_kaydet(ana, self._yol(ozet, uzanti='avif'), 'AVIF', quality=self.kalite - 20)
+        finally:
+            os.remove(gecici)
+            with self._lock:
+                self._bekleyen.pop(ozet, None)
+                self._hazir.pop(ozet, None)
+        if self.bitince:
+            self.bitince(ozet)
+
+    def bekle(self):
+        """Kuyruktaki tüm varyant işleri bitene kadar bekler (CLI ve ölçümler için)."""
+        with self._lock:
+            isler = list(self._bekleyen.values())
+        for is_ in isler:
+            is_.result()
+
+    def _mevcut(self, ozet):
+        """
+        (genişlik, webp_var, avif_var, srcset genişliği) listesi; genişlik None ana görseldir. Liste ancak ana
+        görselden dar tüm varyantlar (ve AVIF kopyaları) diskteyse kalıcı saklanır: varyantları başka bir
+        worker'da üretilmekte olan görsel en geç EKSIK_TTL saniye sonra yeniden taranır.
+        """
+        simdi = time.monotonic()
+        with self._lock:
+            kayit = self._hazir.get(ozet)
+            if kayit is not None and kayit[1] > simdi:
+                return kayit[0]
+            bekliyor = ozet in self._bekleyen
+        ana_genislik = self.ana_genislik(ozet)
+        mevcut = []
+        tamam = True
+        for genislik in self.genislikler + (None,):
+            if genislik is not None and genislik >= ana_genislik:
+                continue
+            webp = os.path.exists(self._yol(ozet, genislik))
+            avif = os.path.exists(self._yol(ozet, genislik, 'avif'))
+            if webp or avif:
+                mevcut.append((genislik, webp, avif, genislik or ana_genislik))
+            tamam = tamam and webp and (avif or not AVIF_VAR)
+        if not bekliyor:
+            with self._lock:
+                self._hazir[ozet] = (mevcut, float('inf') if tamam else simdi + EKSIK_TTL)
+        return mevcut
+
+    def _boyutlu(self, url, ozet, mevcut, uzanti):
+        kok = url[:-len(f'{ozet}.webp')]
+        parcalar = []
+        for genislik, webp, avif, w in mevcut:
+            if (webp if uzanti == 'webp' else avif):
+                ad = ozet if genislik is None else f'{ozet}-{genislik}'
+                parcalar.append(f'{kok}{ad}.{uzanti} {w}w')
+        return ', '.join(parcalar)
+
+    def kucuk(self, url, genislik):
+        """Küçük önizlemeler için: genislik'e eşit ya da daha geniş en küçük hazır WebP varyantının URL'si."""
+        eslesme = ICERIK_URL.search(url or '')
+        if not eslesme:
+            return url
+        ozet = eslesme.group(2)
+        for g, webp, _, _ in self._mevcut(ozet):
+            if g is not None and g >= genislik and webp:
+                return url[:-len(f'{ozet}.webp')] + f'{ozet}-{g}.webp'
+        return url
+
+    def resim(self, url, sizes='100vw', yukleme='lazy', **nitelikler):
+        """
+        Şablonlar için <picture> etiketi. İçerik adresli görsellerde hazır varyantlardan AVIF ve WebP srcset'leri
+        basılır; eski (düz) URL'lerde sadece <img src> döner. Sayfanın ana (LCP) görseli için yukleme='eager'.
+        """
+        nitelikler = dict(nitelikler, loading=yukleme, decoding='async')
+        eslesme = ICERIK_URL.search(url or '')
+        kaynaklar = Markup('')
+        if eslesme:
+            ozet = eslesme.group(2)
+            mevcut = self._mevcut(ozet)
+            avif = self._boyutlu(url, ozet, mevcut, 'avif')
+            webp = self._boyutlu(url, ozet, mevcut, 'webp')
+            if avif:
+                kaynaklar = Markup('<source type="image/avif" srcset="{}" sizes="{}">').format(avif, sizes)
+            if webp:
+                nitelikler.update(srcset=webp, sizes=sizes)
+        img = Markup('<img src="{}"').format(url)
+        for ad, deger in nitelikler.items():
+            img += Markup(' {}="{}"').format(ad.rstrip('_').replace('_', '-'), deger)
+        img += Markup('>')
+        if not eslesme:
+            return img
+        return Markup('<picture>') + kaynaklar + img + Markup('</picture>')
@@ -0,0 +1,120 @@
+import logging
+
+from sqlalchemy import select, update, delete
+
+from extensions import db
+from models import FinansIslem, VarlikBakiye
+
+logger = logging.getLogger(__name__)
+
+VARLIK_TURLERI = ('ALTIN', 'GUMUS', 'USD', 'EUR', 'NAKIT')
+ALANLAR = ('toplam', 'fiziksel', 'banka')
+TOLERANS = 1e-6
+
+
+def bos_envanter():
+    return {tur: {alan: 0.0 for alan in ALANLAR} for tur in VARLIK_TURLERI}
+
+
+def islem_etkileri(islem_turu, tutar_tl, miktar, doviz_turu, kategori, varlik_konumu):
+    """Bir işlemin bakiyelere etkisini (tur, toplam, fiziksel, banka) farkları olarak döndürür."""
+    tutar_tl = tutar_tl or 0.0
+    if islem_turu == 'GELIR':
+        return [('NAKIT', tutar_tl, tutar_tl, 0.0)]
+    if islem_turu == 'GIDER':
+        return [('NAKIT', -tutar_tl, -tutar_tl, 0.0)]
+    if islem_turu not in ('VARLIK_ALIM', 'VARLIK_SATIM'):
+        return []
+    carpan = 1 if islem_turu == 'VARLIK_ALIM' else -1
+    etkiler = [('NAKIT', -tutar_tl * carpan, -tutar_tl * carpan, 0.0)]
+    v_turu = doviz_turu or kategori
+    if v_turu in VARLIK_TURLERI:
+        fark = (miktar or 0.0) * carpan
+        if varlik_konumu == 'BANKA':
+            etkiler.append((v_turu, fark, 0.0, fark))
+        else:
+            etkiler.append((v_turu, fark, fark, 0.0))
+    return etkiler
+
+
+def _etkiler(islem):
+    return islem_etkileri(islem.islem_turu, islem.tutar_tl, islem.miktar, islem.doviz_turu, islem.kategori, islem.varlik_konumu)
+
+
+def islemleri_yansit(islemler, isaret=1):
+    """
+    İşlemleri (isaret=1) ya da silinmelerini (isaret=-1) bakiye tablosuna yansıtır.
+    islemler: FinansIslem nesneleri ya da islem_etkileri() argüman sırasında demetler. Farklar türe göre
+    toplanır, her tür tek UPDATE ile yazılır. Çağıranın oturumunda çalışır; commit ile işlem kayıtları
+    ve bakiyeler birlikte yazılır.
+    """
+    farklar = {}
+    for islem in islemler:
+        for tur, d_toplam, d_fiziksel, d_banka in (_etkiler(islem) if isinstance(islem, FinansIslem) else islem_etkileri(*islem)):
+            toplam, fiziksel, banka = farklar.get(tur, (0.0, 0.0, 0.0))
+            farklar[tur] = (toplam + d_toplam, fiziksel + d_fiziksel, banka + d_banka)
+    for tur, (d_toplam, d_fiziksel, d_banka) in farklar.items():
+        sonuc = db.session.execute(
+            update(VarlikBakiye).where(VarlikBakiye.doviz_turu == tur).values(
+                toplam=VarlikBakiye.toplam + d_toplam * isaret,
+                fiziksel=VarlikBakiye.fiziksel + d_fiziksel * isaret,
+                banka=VarlikBakiye.banka + d_banka * isaret))
+        if sonuc.rowcount == 0:
+            # Tablo hiç oluşturulmamış: defterden baştan kur (bekleyen değişiklik autoflush ile dahil olur)
+            yeniden_olustur()
+            return
+
+
+def bakiyeleri_guncelle(islem, isaret=1):
+    islemleri_yansit([islem], isaret)
+
+
+def defterden_hesapla():
+    """Tüm defteri ORM nesnesi üretmeden tek geçişte oynatır."""
+    envanter = bos_envanter()
+    sorgu = select(FinansIslem.islem_turu, FinansIslem.tutar_tl, FinansIslem.miktar, FinansIslem.doviz_turu, FinansIslem.kategori, FinansIslem.varlik_konumu)
+    for satir in db.session.execute(sorgu):
+        for tur, d_toplam, d_fiziksel, d_banka in islem_etkileri(*satir):
+            envanter[tur]['toplam'] += d_toplam
+            envanter[tur]['fiziksel'] += d_fiziksel
+            envanter[tur]['banka'] += d_banka
+    return envanter
+
+
+def yeniden_olustur():
+    envanter = defterden_hesapla()
+    db.session.execute(delete(VarlikBakiye))
+    for tur, degerler in envanter.items():
+        db.session.add(VarlikBakiye(doviz_turu=tur, **degerler))
+    db.session.flush()
+    return envanter
+
+
+def envanter():
+    """
+    Güncel bakiyeler; maliyet işlem geçmişinden bağımsız olarak varlık türü sayısıyla orantılıdır.
+    Tablo schema.upgrade() ve 'flask ledger-rebuild' ile kurulur. Boşsa GET isteğinde yazılmaz
+    (aynı anda gelen iki istek ikisi de kurmaya çalışır): bakiyeler defterden salt okunur hesaplanır.
+    """
+    satirlar = VarlikBakiye.query.all()
+    if not satirlar:
+        logger.warning("varlik_bakiye boş; bakiyeler defterden hesaplandı, 'flask ledger-rebuild' çalıştırın")
+        return defterden_hesapla()
+    sonuc = bos_envanter()
+    for satir in satirlar:
+        sonuc[satir.doviz_turu] = {alan: getattr(satir, alan) for alan in ALANLAR}
+    return sonuc
+
+
+def sapmalari_bul():
+    """Tablodaki bakiyeleri defterden hesaplananla karşılaştırır: [(tur, alan, tablodaki, beklenen)]."""
+    beklenen = defterden_hesapla()
+    mevcut = bos_envanter()
+    for satir in VarlikBakiye.query.all():
+        mevcut[satir.doviz_turu] = {alan: getattr(satir, alan) for alan in ALANLAR}
+    sapmalar = []
+    for tur in VARLIK_TURLERI:
+        for alan in ALANLAR:
+            if abs(mevcut[tur][alan] - beklenen[tur][alan]) > TOLERANS * max(1.0, abs(beklenen[tur][alan])):
+                sapmalar.append((tur, alan, mevcut[tur][alan], beklenen[tur][alan]))
+    return sapmalar
@@ -0,0 +1,388 @@
+import http.client
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from flask import current_app
+from werkzeug.serving import make_server
+
+from extensions import db
+from models import Gunluk, Mesaj, Proje, StudioProject
+import ledger
+import queries
+import reading_stats
+import search
+import uploads
+import visitors
+
+# Varsayılan hacimler (--scale ile çarpılır). Türetilmiş tablolar (varlik_bakiye, okuma_ozet, ziyaret_ozet,
+# arama, upload_blob) seed sonrası kendi yeniden kurma fonksiyonlarıyla doldurulur.
+HACIMLER = {
+    'gunluk': 20_000,
+    'varlik': 200,
+    'calisma_kategori': 10,
+    'yol_haritasi': 200,
+    'yetenek': 100,
+    'proje': 500,
+    'kitap': 5_000,
+    'plan': 5_000,
+    'fikir': 2_000,
+    'finans_islem': 200_000,
+    'gorev': 50_000,
+    'mesaj': 20_000,
+    'ziyaretci': 1_000_000,
+    'proje_fikri': 2_000,
+    'proje_gorev': 20_000,
+    'studio_project': 1_000,
+    'studio_work_log': 20_000,
+}
+
+KELIMELER = ('bugün', 'yarın', 'ışık', 'şehir', 'İstanbul', 'Ankara', 'kitap', 'okudum', 'yürüyüş', 'deniz', 'çay', 'kahve',
+             'proje', 'toplantı', 'güzel', 'yorgun', 'mutlu', 'öğrendim', 'kod', 'hata', 'düzelttim', 'müzik', 'sınav', 'ödev')
+YAZARLAR = ('Orhan Pamuk', 'Sabahattin Ali', 'Yaşar Kemal', 'Oğuz Atay', 'Tezer Özlü', 'Ahmet Hamdi Tanpınar', 'Sait Faik', '')
+SAYFALAR = ('/', '/', '/', '/project/1', '/project/2', '/project/3')
+# Rastgele tarihlerin yayıldığı dönem (bugünden geriye)
+YIL = 5
+
+
+def _metin(rnd, kelime):
+    return ' '.join(rnd.choice(KELIMELER) for _ in range(kelime))
+
+
+def _tarih(rnd, simdi, gun=365 * YIL, ileri=0):
+    return (simdi - timedelta(seconds=rnd.randrange(-ileri * 86400, gun * 86400))).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def _uretecler(rnd, hacim, simdi):
+    """tablo -> (kolonlar, satır üreteci). Sıra yabancı anahtarlara göre: ebeveynler önce."""
+    from benchmark import finans_islemleri_uret
+    return {
+        'gunluk': (('baslik', 'icerik', 'tarih', 'tur', 'duygu'), (
+            (_metin(rnd, 4).capitalize(), _metin(rnd, rnd.randint(40, 160)), _tarih(rnd, simdi), 'YILLIK' if i % 50 == 0 else 'GUNLUK', rnd.choice(['harika', 'iyi', 'orta', 'kotu']))
+            for i in range(hacim['gunluk']))),
+        'varlik': (('tur', 'konum', 'miktar', 'alis_fiyati', 'alis_tarihi'), (
+            (rnd.choice(['ALTIN', 'GUMUS', 'USD', 'EUR']), rnd.choice(['FIZIKSEL', 'BANKA']), round(rnd.uniform(0.1, 50), 4), round(rnd.uniform(10, 3000), 2), _tarih(rnd, simdi))
+            for _ in range(hacim['varlik']))),
+        'calisma_kategori': (('ad',), ((f'Kategori {i}',) for i in range(hacim['calisma_kategori']))),
+        'yol_haritasi': (('baslik', 'tip', 'notlar', 'order_index', 'start_date', 'end_date', 'is_active'), (
+            (f'Kurum {i}', rnd.choice(['Egitim', 'Deneyim']), _metin(rnd, 20), rnd.randint(1, 20), str(2000 + i % 25), str(2001 + i % 25), i % 10 == 0)
+            for i in range(hacim['yol_haritasi']))),
+        'yetenek': (('ad', 'yuzde'), ((f'Yetenek {i}', rnd.randint(10, 100)) for i in range(hacim['yetenek']))),
+        'proje': (('baslik', 'notlar', 'detayli_icerik', 'github_link', 'ilerleme_yuzde'), (
+            (f'Proje {i}', _metin(rnd, 20), _metin(rnd, 200), f'https://github.com/ornek/proje-{i}', rnd.randint(0, 100))
+            for i in range(hacim['proje']))),
+        'kitap': (('kitap_adi', 'yazar', 'sayfa_sayisi', 'okunma_tarihi'), (
+            (f'Kitap {i}', rnd.choice(YAZARLAR), rnd.randint(80, 900), None if i % 40 == 0 else _tarih(rnd, simdi, gun=365 * 15))
+            for i in range(hacim['kitap']))),
+        'plan': (('icerik', 'plan_tipi', 'hedef_tarih', 'tamamlandi_mi', 'arsivlendi_mi'), (
+            (_metin(rnd, 8), rnd.choice(['GUNLUK', 'HAFTALIK', 'AYLIK']), _tarih(rnd, simdi), rnd.random() < 0.5, rnd.random() < 0.2)
+            for _ in range(hacim['plan']))),
+        'fikir': (('baslik', 'aciklama', 'teknoloji_stack', 'olusturulma_tarihi'), (
+            (f'Fikir {i}', _metin(rnd, 30), 'Python, Flask', _tarih(rnd, simdi)) for i in range(hacim['fikir']))),
+        'finans_islem': (('tarih', 'islem_turu', 'kategori', 'tutar_tl', 'miktar', 'varlik_konumu', 'banka_adi', 'birim_fiyat', 'doviz_turu', 'aciklama'), (
+            (satir[0].strftime('%Y-%m-%d %H:%M:%S.%f'),) + satir[1:] for satir in finans_islemleri_uret(hacim['finans_islem'], yil=YIL, seed=rnd.randrange(1 << 30)))),
+        # Görevler bugünün iki yıl öncesi ile bir yıl sonrası arasında; planner penceresine de düşerler
+        'gorev': (('baslik', 'aciklama', 'durum', 'oncelik', 'son_tarih', 'tarih', 'kategori', 'ceyrek', 'saat', 'onemli_mi'), (
+            (f'Görev {i}', _metin(rnd, 10), rnd.choice(['YAPILACAK', 'SURUYOR', 'BITTI']), rnd.choice(['DUSUK', 'NORMAL', 'YUKSEK']), _tarih(rnd, simdi, gun=730, ileri=365), _tarih(rnd, simdi, gun=730),
+             'HEDEF' if i % 100 == 0 else 'GOREV', rnd.randint(1, 4), f'{rnd.randint(8, 20):02d}:00', rnd.random() < 0.1)
+            for i in range(hacim['gorev']))),
+        'mesaj': (('gonderen_ad', 'gonderen_email', 'konu', 'mesaj_icerigi', 'tarih', 'okundu_mu'), (
+            (f'Ziyaretçi {i}', f'z{i}@example.com', _metin(rnd, 4), _metin(rnd, 60), _tarih(rnd, simdi), rnd.random() < 0.9)
+            for i in range(hacim['mesaj']))),
+        # (ip, gün) tekil index'i nedeniyle her satıra ayrı ip
+        'ziyaretci': (('ip_adresi', 'tarih', 'sayfa'), (
+            (f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}', _tarih(rnd, simdi, gun=365 * 2), rnd.choice(SAYFALAR))
+            for i in range(hacim['ziyaretci']))),
+        'proje_fikri': (('baslik', 'ozet', 'detay', 'sorun', 'teknolojiler', 'durum', 'baslangic_tarihi', 'bitis_tarihi', 'ilerleme', 'olusturma_tarihi'), (
+            (f'Fikir {i}', _metin(rnd, 8), _metin(rnd, 80), _metin(rnd, 20), 'Python, SQLite', rnd.choice(['FIKIR', 'FIKIR', 'AKTIF', 'BITTI']), _tarih(rnd, simdi), _tarih(rnd, simdi, ileri=180), rnd.randint(0, 100), _tarih(rnd, simdi))
+            for i in range(hacim['proje_fikri']))),
+        'proje_gorev': (('proje_id', 'baslik', 'faz', 'durum', 'sira'), (
+            (rnd.randint(1, max(1, hacim['proje_fikri'])), f'Görev {i}', rnd.choice(['Faz 1', 'Backend', 'UI/UX']), rnd.choice(['BEKLIYOR', 'YAPILACAK', 'SURUYOR', 'BITTI']), i % 20)
+            for i in range(hacim['proje_gorev'] if hacim['proje_fikri'] else 0))),
+        'studio_project': (('name', 'category', 'secure_data', 'olusturma_tarihi'), (
+            (f'Studio {i}', rnd.choice(['Web', 'Mobil', 'IoT / Donanım', 'Masaüstü']), _metin(rnd, 10), _tarih(rnd, simdi)) for i in range(hacim['studio_project']))),
+        'studio_work_log': (('proje_id', 'note'), (
+            (rnd.randint(1, max(1, hacim['studio_project'])), _metin(rnd, 15)) for _ in range(hacim['studio_work_log'] if hacim['studio_project'] else 0))),
+    }
+
+
+def hacimler(olcek=1.0, **ozel):
+    sonuc = {tablo: int(adet * olcek) for tablo, adet in HACIMLER.items()}
+    sonuc.update(ozel)
+    return sonuc
+
+
+def seed(db_yolu, hacim, seed=42, parti=20_000, rapor=print):
+    """
+    Boş (tabloları kurulmuş) bir veritabanını her modelden hacim kadar sentetik satırla doldurur.
+    ORM yerine doğrudan sqlite3 executemany: 1M satır dakikalar değil saniyeler sürer.
+    Türetilmiş tablolar ayrıca turetilmisleri_kur() ile doldurulmalıdır.
+    """
+    rnd = random.Random(seed)
+    simdi = datetime.utcnow()
+    con = sqlite3.connect(db_yolu)
+    try:
+        con.execute('INSERT OR IGNORE INTO kullanici (kullanici_adi, sifre) VALUES (?, ?)', ('admin', 'admin'))
+        for tablo, (kolonlar, satirlar) in _uretecler(rnd, hacim, simdi).items():
+            t0 = time.perf_counter()
+            sql = f'INSERT INTO {tablo} ({", ".join(kolonlar)}) VALUES ({", ".join("?" * len(kolonlar))})'
+            adet = 0
+            parca = []
+            for satir in satirlar:
+                parca.append(satir)
+                if len(parca) >= parti:
+                    con.executemany(sql, parca)
+                    adet += len(parca)
+                    parca = []
+            if parca:
+                con.executemany(sql, parca)
+                adet += len(parca)
+            con.commit()
+            rapor(f'  {tablo:<20} {adet:>10,} satır  {time.perf_counter() - t0:7.1f} s')
+    finally:
+        con.close()
+
+
+def turetilmisleri_kur():
+    """Ham tablolar doğrudan yazıldıktan sonra bakiyeleri, özetleri, arama indeksini ve referans sayılarını kurar."""
+    ledger.yeniden_olustur()
+    reading_stats.yeniden_olustur()
+    visitors.ozet_doldur()
+    uploads.yeniden_say()
+    current_app.extensions['unread_counter'].yeniden_say()
+    search.yeniden_olustur()
+    db.session.commit()
+
+
+# --- istek karışımı ---
+
+def istek_karisimi(rnd):
+    """
+    (ağırlık, etiket, metod, yol üreteci, form) listesi. Ağırlıklar tek kişilik bir portfolyo + yönetim panelinin
+    gerçekçi trafiğini taklit eder: genel sayfalar ağırlıkta, yazmalar seyrek. Yol üreteçleri çağrıldıkça
+    farklı kimlikler/yıllar/sayfa imleçleri döner.
+    """
+    bugun = datetime.utcnow().date()
+    ay_basi = bugun.replace(day=1)
+    derin_gunluk = Gunluk.query.filter_by(tur='GUNLUK').order_by(Gunluk.tarih.desc(), Gunluk.id.desc()).offset(500).first()
+    derin_mesaj = Mesaj.query.order_by(Mesaj.tarih.desc(), Mesaj.id.desc()).offset(500).first()
+    imlecler = {
+        'gunluk': queries.GUNLUK_SIRASI.imlec(derin_gunluk) if derin_gunluk else '',
+        'mesaj': queries.MESAJ_SIRASI.imlec(derin_mesaj) if derin_mesaj else '',
+    }
+    yillar = reading_stats.yillar() or [bugun.year]
+    en_buyuk = {model: db.session.query(db.func.max(model.id)).scalar() or 1 for model in (Mesaj, Proje, StudioProject)}
+
+    def sorgulu(yol, **parametreler):
+        return lambda: f'{yol}?{urlencode({ad: deger() if callable(deger) else deger for ad, deger in parametreler.items()})}'
+
+    return [
+        (20, 'home', 'GET', lambda: '/', None),
+        (10, 'project_detail', 'GET', lambda: f'/project/{rnd.randint(1, en_buyuk[Proje])}', None),
+        (1, 'contact', 'POST', lambda: '/iletisim', lambda: {'ad_soyad': 'Yük Testi', 'email': 'yuk@example.com', 'konu': 'Merhaba', 'mesaj': _metin(rnd, 30)}),
+        (5, 'dashboard', 'GET', lambda: '/admin/dashboard', None),
+        (5, 'admin_planner', 'GET', lambda: '/admin/planner', None),
+        (5, 'planner_events', 'GET', sorgulu('/admin/planner/events', start=ay_basi.isoformat(), end=(ay_basi + timedelta(days=42)).isoformat()), None),
+        (4, 'admin_diaries', 'GET', lambda: '/admin/diaries', None),
+        (2, 'admin_diaries (sayfa)', 'GET', sorgulu('/admin/diaries', format='json', tur='GUNLUK', imlec=imlecler['gunluk']), None),
+        (4, 'admin_inbox', 'GET', lambda: '/admin/inbox', None),
+        (2, 'admin_inbox (sayfa)', 'GET', sorgulu('/admin/inbox', format='json', imlec=imlecler['mesaj']), None),
+        (2, 'read_message', 'GET', lambda: f'/admin/inbox/{rnd.randint(1, en_buyuk[Mesaj])}', None),
+        (3, 'admin_books', 'GET', sorgulu('/admin/books', yil=lambda: rnd.choice(yillar)), None),
+        (1, 'book_stats', 'GET', lambda: '/admin/books/stats', None),
+        (3, 'admin_finance', 'GET', lambda: '/admin/finance', None),
+        (2, 'finance_summary', 'GET', sorgulu('/admin/finance/summary', periyot=lambda: rnd.choice(['ay', 'yil'])), None),
+        (3, 'admin_search', 'GET', sorgulu('/admin/search', q=lambda: rnd.choice(KELIMELER)), None),
+        (2, 'admin_ideas', 'GET', lambda: '/admin/ideas', None),
+        (2, 'admin_studio', 'GET', lambda: '/admin/studio', None),
+        (1, 'studio_detail', 'GET', lambda: f'/admin/studio/{rnd.randint(1, en_buyuk[StudioProject])}', None),
+        (1, 'add_diary', 'POST', lambda: '/admin/diaries/add', lambda: {'tur': 'GUNLUK', 'baslik': _metin(rnd, 3), 'icerik': _metin(rnd, 80), 'duygu': 'iyi'}),
+    ]
+
+
+def _secici(karisim, rnd):
+    agirliklar = [k[0] for k in karisim]
+    return lambda: rnd.choices(karisim, weights=agirliklar)[0]
+
+
+# --- sürücüler ---
+
+def test_istemcisiyle(app, karisim, istek_sayisi, seed=1):
+    """Süreç içi, tek thread: ağ ve WSGI sunucusu maliyeti olmadan view + ORM + şablon maliyeti."""
+    rnd = random.Random(seed)
+    sec = _secici(karisim, rnd)
+    istemci = app.test_client()
+    istemci.post('/login', data={'kullanici_adi': 'admin', 'sifre': 'admin'})
+    olcumler = {}
+    t0 = time.perf_counter()
+    for _ in range(istek_sayisi):
+        _, etiket, metod, yol, form = sec()
+        b = time.perf_counter()
+        yanit = istemci.open(yol(), method=metod, data=form() if form else None)
+        yanit.close()
+        olcumler.setdefault(etiket, []).append((time.perf_counter() - b, yanit.status_code))
+    return olcumler, time.perf_counter() - t0
+
+
+class _Baglanti:
+    """Thread başına kalıcı HTTP bağlantısı ve oturum çerezi."""
+
+    def __init__(self, port):
+        self.port = port
+        self.cerez = None
+        self.baglanti = None
+
+    def istek(self, metod, yol, form=None):
+        govde = urlencode(form) if form else None
+        basliklar = {'Content-Type': 'application/x-www-form-urlencoded'} if form else {}
+        if self.cerez:
+            basliklar['Cookie'] = self.cerez
+        for deneme in range(2):
+            if self.baglanti is None:
+                self.baglanti = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            try:
+                self.baglanti.request(metod, yol, body=govde, headers=basliklar)
+                yanit = self.baglanti.getresponse()
+                yanit.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # Sunucu keep-alive bağlantıyı kapattıysa bir kez yeniden bağlan
+                self.baglanti.close()
+                self.baglanti = None
+                if deneme:
+                    raise
+        cerez = yanit.getheader('Set-Cookie')
+        if cerez:
+            self.cerez = cerez.split(';', 1)[0]
+        if yanit.getheader('Connection', '').lower() == 'close':
+            self.baglanti.close()
+            self.baglanti = None
+        return yanit.status
+
+
+def http_ile(app, karisim, thread_sayisi, saniye, seed=1):
+    """Gerçek bir thread'li WSGI sunucusuna (werkzeug) eşzamanlı istemciler: kilit ve havuz çekişmesi dahil."""
+    # İstek başına erişim logu ölçümü bozar
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    sunucu = make_server('127.0.0.1', 0, app, threaded=True)
+    sunucu_thread = threading.Thread(target=sunucu.serve_forever, daemon=True)
+    sunucu_thread.start()
+    olcumler = {}
+    kilit = threading.Lock()
+    bitis = time.perf_counter() + saniye
+
+    def dongu(no):
+        rnd = random.Random(seed + no)
+        sec = _secici(karisim, rnd)
+        baglanti = _Baglanti(sunucu.server_port)
+        baglanti.istek('POST', '/login', {'kullanici_adi': 'admin', 'sifre': 'admin'})
+        yerel = {}
+        while time.perf_counter() < bitis:
+            _, etiket, metod, yol, form = sec()
+            b = time.perf_counter()
+            try:
+                durum = baglanti.istek(metod, yol(), form() if form else None)
+            except (http.client.HTTPException, OSError):
+                durum = 599
+            yerel.setdefault(etiket, []).append((time.perf_counter() - b, durum))
+        with kilit:
+            for etiket, liste in yerel.items():
+                olcumler.setdefault(etiket, []).extend(liste)
+
+    t0 = time.perf_counter()
+    threadler = [threading.Thread(target=dongu, args=(i,)) for i in range(thread_sayisi)]
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+    gecen = time.perf_counter() - t0
+    sunucu.shutdown()
+    return olcumler, gecen
+
+
+# --- raporlama ---
+
+def yuzdelik(sirali, oran):
+    """En yakın sıra yöntemi; sirali boş olmamalı."""
+    return sirali[min(len(sirali) - 1, max(0, int(round(oran * len(sirali) + 0.5)) - 1))]
+
+
+def rapor(olcumler, gecen, metrik, karisim):
+    """
+    Etiket başına {'istek', 'hata', 'p50', 'p95', 'p99' (ms), 'rps', 'sorgu'}. Sorgu/istek sayısı sunucu tarafındaki
+    Metrics'ten endpoint bazında gelir (aynı endpoint'i paylaşan etiketler aynı ortalamayı gösterir).
+    """
+    endpointler = {s['endpoint']: s for s in metrik.ozet()} if metrik else {}
+    sonuc = {}
+    for _, etiket, _, _, _ in karisim:
+        liste = olcumler.get(etiket)
+        if not liste:
+            continue
+        sureler = sorted(s for s, _ in liste)
+        endpoint = endpointler.get(etiket.split(' ')[0])
+        sonuc[etiket] = {
+            'istek': len(liste),
+            'hata': sum(1 for _, durum in liste if durum >= 500),
+            'p50': yuzdelik(sureler, 0.50) * 1000,
+            'p95': yuzdelik(sureler, 0.95) * 1000,
+            'p99': yuzdelik(sureler, 0.99) * 1000,
+            'rps': len(liste) / gecen,
+            'sorgu': endpoint['ort_sorgu'] if endpoint else None,
+        }
+    toplam = sum(s['istek'] for s in sonuc.values())
+    sonuc['TOPLAM'] = {'istek': toplam, 'hata': sum(s['hata'] for s in sonuc.values()), 'rps': toplam / gecen}
+    return sonuc
+
+
+def yazdir(baslik, sonuc):
+    print(f'\n{baslik}')
+    print(f'  {"endpoint":<24} {"istek":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"istek/s":>9} {"sorgu":>7} {"5xx":>5}')
+    for etiket, s in sonuc.items():
+        if etiket == 'TOPLAM':
+            continue
+        sorgu = f'{s["sorgu"]:.1f}' if s['sorgu'] is not None else '-'
+        print(f'  {etiket:<24} {s["istek"]:>7} {s["p50"]:>9.1f} {s["p95"]:>9.1f} {s["p99"]:>9.1f} {s["rps"]:>9.1f} {sorgu:>7} {s["hata"]:>5}')
+    t = sonuc['TOPLAM']
+    print(f'  {"TOPLAM":<24} {t["istek"]:>7} {"":>9} {"":>9} {"":>9} {t["rps"]:>9.1f} {"":>7} {t["hata"]:>5}')
+
+
+# p95 karşılaştırması için etiket başına gereken en az istek
+MIN_ORNEK = 20
+
+
+def karsilastir(sonuclar, taban, tolerans):
+    """
+    Taban dosyasıyla karşılaştırır; [(mod, etiket, açıklama)] gerilemeler. p95 tolerans oranından (ve 2 ms'den)
+    fazla artarsa (en az MIN_ORNEK istekli etiketlerde) ya da istek başına sorgu sayısı artarsa gerileme sayılır. Sorgu sayısı makineden bağımsızdır,
+    süreler değildir: taban aynı makinede ve aynı --scale ile alınmalıdır.
+    """
+    gerilemeler = []
+    for mod, satirlar in sonuclar.items():
+        for etiket, s in satirlar.items():
+            eski = taban.get(mod, {}).get(etiket)
+            if etiket == 'TOPLAM' or not eski:
+                continue
+            # Az örnekli etiketlerin p95'i tek bir yavaş isteğe eşittir; süre karşılaştırmasına alınmaz
+            yeterli = min(s['istek'], eski['istek']) >= MIN_ORNEK
+            if yeterli and s['p95'] > eski['p95'] * (1 + tolerans) and s['p95'] - eski['p95'] > 2:
+                gerilemeler.append((mod, etiket, f'p95 {eski["p95"]:.1f} → {s["p95"]:.1f} ms'))
+            if s['sorgu'] is not None and eski.get('sorgu') is not None and s['sorgu'] > eski['sorgu'] + 0.5:
+                gerilemeler.append((mod, etiket, f'sorgu/istek {eski["sorgu"]:.1f} → {s["sorgu"]:.1f}'))
+            if s['hata'] > eski.get('hata', 0):
+                gerilemeler.append((mod, etiket, f'5xx {eski.get("hata", 0)} → {s["hata"]}'))
+    return gerilemeler
+
+
+def taban_oku(yol):
+    with open(yol, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def taban_yaz(yol, sonuclar, **bilgi):
+    with open(yol, 'w', encoding='utf-8') as f:
+        json.dump(dict(sonuclar, _bilgi=dict(bilgi, tarih=datetime.utcnow().isoformat(timespec='seconds'))), f, ensure_ascii=False, indent=2, sort_keys=True)
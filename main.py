@@ -1,71 +1,170 @@
 import os
-import requests
-from bs4 import BeautifulSoup
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+import json
+import time
+import click
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, Response, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
 from extensions import db, login_manager
-from models import Kullanici, Gunluk, Varlik, YolHaritasi, Proje, Mesaj, Yetenek, Kitap, FinansIslem, Gorev, Ziyaretci, ProjeFikri, ProjeGorev, StudioProject, StudioWorkLog
-from datetime import datetime, date
-from sqlalchemy import func, extract
+from models import Kullanici, Gunluk, Varlik, YolHaritasi, Proje, Mesaj, Yetenek, Kitap, FinansIslem, Gorev, Ziyaretci, ProjeFikri, ProjeGorev, StudioProject, StudioWorkLog, OkumaOzet
+from rates import RateService, DovizComProvider
+import ledger
+import finance_stats
+import finance_io
+import rate_history
+import net_worth
+import reading_stats
+import visitors
+from visitors import VisitorTracker
+from page_cache import PageCache
+import versions
+import changes
+import queries
+import pagination
+import planner
+from unread import UnreadCounter
+from profile_cache import ProfileCache
+from portfolio import Portfolio
+import portfolio
+import metrics
+from metrics import Metrics
+import sqlite_profile
+import schema
+import images
+from images import ImagePipeline, GecersizResim
+import uploads
+import backup
+import search
+from static_assets import StaticAssets
+import static_assets
+from datetime import datetime, date, timedelta
+from sqlalchemy.exc import OperationalError
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'gizli-anahtar-123'
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static/uploads')
+    app.config['RATES_PROVIDER'] = None # None ise doviz.com; testlerde FixtureProvider verilebilir
+    app.config['RATES_TTL'] = 300 # saniye; bu süre içinde kurlar önbellekten gelir
+    app.config['RATES_STALE_TTL'] = 86400 # bu süreye kadar eski kur gösterilip arka planda yenilenir
+    app.config['RATES_CACHE_PATH'] = os.path.join(app.instance_path, 'kurlar.json')
+    app.config['RATE_HISTORY_TIERS'] = ((7, 3600), (90, 86400)) # (gün, saniye): finance-snapshot bu günden eski kur noktalarını kova başına bire indirir
+    app.config['NET_WORTH_CHART_DAYS'] = 365 # admin_finance net servet grafiğinin kapsadığı gün sayısı
+    app.config['VISITOR_FLUSH_INTERVAL'] = 5 # saniye; biriken ziyaretler en geç bu aralıkla yazılır
+    app.config['VISITOR_FLUSH_BATCH'] = 100 # bu kadar ziyaret birikince beklemeden yazılır
+    app.config['VISITOR_BUFFER_MAX'] = 10000 # yazılamayıp yeniden denenecek en fazla ziyaret; aşan en eski kayıtlar bırakılır
+    app.config['VISITOR_RETENTION_DAYS'] = 90 # visitors-compact bu günden eski ham ziyaretleri özete katlar
+    app.config['UNREAD_CACHE_TTL'] = 5 # saniye; diğer worker'lardaki okunmamış mesaj değişiklikleri en geç bu sürede görünür
+    app.config['PAGE_CACHE_TTL'] = 300 # saniye; önbellekteki sayfa sürümü değişmemiş olsa da en geç bu sürede yeniden üretilir
+    app.config['PROFILE_CACHE_TTL'] = 60 # saniye; çok worker'lı kurulumda profil değişikliği en geç bu sürede görünür
+    app.config['DB_AUTO_UPGRADE'] = True # açılışta eksik tabloları ve şema adımlarını uygular (schema.yukselt); kapatılırsa deploy'da 'flask db-upgrade' zorunlu
+    app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'default') # 'production': WAL, synchronous=NORMAL, mmap, havuz (sqlite_profile.py)
+    app.config['SQLITE_PRAGMAS'] = {} # profil PRAGMA'larının üzerine yazılır, örn. {'mmap_size': 0}
+    app.config['SQLITE_POOL_SIZE'] = 10 # worker başına açık tutulan bağlantı sayısı (thread sayısı kadar)
+    app.config['SQLITE_POOL_OVERFLOW'] = 10
+    app.config['IMAGE_WIDTHS'] = (320, 640, 1280) # srcset için üretilen varyant genişlikleri
+    app.config['IMAGE_QUALITY'] = 80 # WebP kalitesi; AVIF bundan 20 düşük kodlanır
+    app.config['IMAGE_WORKERS'] = 2 # varyantları üreten arka plan thread sayısı
+    app.config['STATIC_PRECOMPRESS'] = True # başlangıçta static/ altındaki metin dosyalarının .gz/.br kopyalarını üret
+    app.config['METRICS_ENABLED'] = False # istek başına sorgu/render/dış çağrı ölçümü (/admin/metrics, /metrics)
+    app.config['METRICS_SLOW_QUERY_MS'] = 100 # bu süreyi aşan SELECT'ler EXPLAIN QUERY PLAN ile loglanır
+    app.config['METRICS_TOKEN'] = None # verilirse /metrics 'Authorization: Bearer <token>' ile giriş yapmadan okunabilir
+    app.config['BACKUP_FOLDER'] = os.path.join(app.instance_path, 'backups') # backup-create çıktısı (--output verilmezse)
+    app.config['ADMIN_PAGE_SIZE'] = 50 # admin listelerinde sayfa başına satır; devamı kaydırdıkça ?imlec= ile gelir
+    if config:
+        app.config.update(config)
     
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.instance_path, exist_ok=True)
 
+    def kurlari_kaydet(quotes, fetched_at):
+        # Kur yenilemesi arka plan thread'inde de çalışır; geçmişe kendi uygulama bağlamında yazılır
+        with app.app_context():
+            rate_history.kaydet(quotes, fetched_at)
+
+    rate_service = RateService(app.config['RATES_PROVIDER'] or DovizComProvider(), ttl=app.config['RATES_TTL'], stale_ttl=app.config['RATES_STALE_TTL'], persist_path=app.config['RATES_CACHE_PATH'], on_fetch=kurlari_kaydet)
+    app.extensions['rate_service'] = rate_service
+    visitor_tracker = VisitorTracker(app, flush_interval=app.config['VISITOR_FLUSH_INTERVAL'], batch_size=app.config['VISITOR_FLUSH_BATCH'], azami_bekleyen=app.config['VISITOR_BUFFER_MAX'])
+    app.extensions['visitor_tracker'] = visitor_tracker
+    page_cache = PageCache(ttl=app.config['PAGE_CACHE_TTL'])
+    app.extensions['page_cache'] = page_cache
+    unread_counter = UnreadCounter(ttl=app.config['UNREAD_CACHE_TTL'])
+    app.extensions['unread_counter'] = unread_counter
+    profile_cache = ProfileCache(ttl=app.config['PROFILE_CACHE_TTL'])
+    app.extensions['profile_cache'] = profile_cache
+    portfoy = Portfolio()
+    app.extensions['portfolio'] = portfoy
+    # Varyantlar hazır olunca önbellekteki sayfalar srcset'li haliyle yeniden üretilsin
+    def varyantlar_hazir(ozet):
+        # Görseli kullanan tabloların içerik sürümü artırılır: tüm worker'lardaki sayfa önbelleği ve ETag'ler
+        # yeni srcset ile yeniden üretilir. Kayıt henüz commit edilmemişse onun commit'i zaten sürümü artırır.
+        with app.app_context():
+            tablolar = uploads.sahip_tablolar(ozet)
+            if tablolar:
+                changes.dokun(db.session, *tablolar)
+                db.session.commit()
+
+    image_pipeline = ImagePipeline(app.config['UPLOAD_FOLDER'], os.path.join(app.instance_path, 'upload_tmp'), genislikler=app.config['IMAGE_WIDTHS'], kalite=app.config['IMAGE_QUALITY'], isci=app.config['IMAGE_WORKERS'], bitince=varyantlar_hazir)
+    app.extensions['image_pipeline'] = image_pipeline
+    app.jinja_env.globals['resim'] = image_pipeline.resim
+    app.jinja_env.filters['kucuk'] = image_pipeline.kucuk
+    app.extensions['static_assets'] = StaticAssets(app, on_sikistirma=app.config['STATIC_PRECOMPRESS'], haric=[app.config['UPLOAD_FOLDER']])
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(sqlite_profile.motor_ayarlari(app), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
     db.init_app(app)
+    sqlite_profile.uygula(app)
+    if app.config['DB_AUTO_UPGRADE']:
+        # gunicorn/Vercel main:app ile başlar, run_app.py'den geçmez; yeni tablolar olmadan sürüm, arama ve ziyaret kancaları 500 verir
+        with app.app_context():
+            try:
+                schema.yukselt()
+            except Exception:
+                app.logger.exception("Şema yükseltmesi başarısız; 'flask db-upgrade' ile elle çalıştırın")
+            finally:
+                db.session.remove()
     login_manager.init_app(app)
 
+    metrik = Metrics(app, yavas_sorgu_ms=app.config['METRICS_SLOW_QUERY_MS']) if app.config['METRICS_ENABLED'] else None
+    app.extensions['metrics'] = metrik
+
     @login_manager.user_loader
     def load_user(user_id):
-        return Kullanici.query.get(int(user_id))
+        return profile_cache.kullanici(int(user_id))
 
     def get_live_rates():
-        rates = {'ALTIN': 0.0, 'GUMUS': 0.0, 'USD': 0.0, 'EUR': 0.0}
+        with metrics.dis_cagri():
+            return rate_service.get_rates()
+
+    def yuklenen_resim(alan):
+        """request.files[alan] doluysa işlenmiş görselin URL'si; boşsa ya da görsel değilse None."""
+        file = request.files.get(alan)
+        if not file or file.filename == '':
+            return None
         try:
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.get('https://www.doviz.com/', headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                def parse_val(el):
-                    if not el: return 0.0
-                    return float(el.text.replace('.', '').replace(',', '.'))
-                gold_buy = soup.find('span', {'data-socket-key': 'gram-altin', 'data-socket-attr': 'buy'})
-                usd_buy = soup.find('span', {'data-socket-key': 'USD', 'data-socket-attr': 'buy'})
-                eur_buy = soup.find('span', {'data-socket-key': 'EUR', 'data-socket-attr': 'buy'})
-                gumus_buy = soup.find('span', {'data-socket-key': 'gumus', 'data-socket-attr': 'buy'})
-                if gold_buy: rates['ALTIN'] = parse_val(gold_buy)
-                if usd_buy: rates['USD'] = parse_val(usd_buy)
-                if eur_buy: rates['EUR'] = parse_val(eur_buy)
-                if gumus_buy: rates['GUMUS'] = parse_val(gumus_buy)
-        except: pass
-        return rates
+            return url_for('static', filename=image_pipeline.kaydet(file))
+        except GecersizResim:
+            flash(f'{file.filename} bir görsel olarak okunamadı, yüklenmedi.', 'error')
+            return None
 
     @app.context_processor
     def inject_globals():
         if current_user.is_authenticated:
-            unseen_count = Mesaj.query.filter_by(okundu_mu=False).count()
+            unseen_count = unread_counter.get()
             return dict(unseen_count=unseen_count)
         return dict(unseen_count=0)
 
+    @app.before_request
+    def ziyaret_kaydet():
+        # Sayfa önbellekten dönse de ziyaret sayılsın diye view dışında
+        if request.endpoint == 'home':
+            visitor_tracker.track(request.remote_addr, '/')
+
     @app.route('/')
+    @page_cache.cached(Kullanici, Proje, Yetenek, YolHaritasi)
     def home():
-        try:
-            ip = request.remote_addr
-            bugun = date.today()
-            mevcut_ziyaret = Ziyaretci.query.filter(Ziyaretci.ip_adresi == ip, func.date(Ziyaretci.tarih) == bugun).first()
-            if not mevcut_ziyaret:
-                yeni_ziyaret = Ziyaretci(ip_adresi=ip, sayfa='/')
-                db.session.add(yeni_ziyaret)
-                db.session.commit()
-        except: pass
-        admin = Kullanici.query.first()
+        admin = profile_cache.admin()
         projeler = Proje.query.order_by(Proje.id.desc()).all()
         yetenekler = Yetenek.query.all()
         egitimler = YolHaritasi.query.filter_by(tip='Egitim').order_by(YolHaritasi.order_index.asc()).all()
@@ -92,11 +191,14 @@ def create_app():
         return redirect(url_for('home'))
 
     @app.route('/admin/dashboard')
+    @versions.etag_yok
     @login_required
     def dashboard():
-        toplam_ziyaret = Ziyaretci.query.count()
-        bugun = date.today()
-        bugun_ziyaret = Ziyaretci.query.filter(func.date(Ziyaretci.tarih) == bugun).count()
+        bugun = datetime.utcnow().date()
+        toplam_ziyaret, bugun_ziyaret = visitors.istatistikler(bugun)
+        bekleyen = visitor_tracker.bekleyen_tekil(bugun)
+        toplam_ziyaret += bekleyen
+        bugun_ziyaret += bekleyen
         proje_sayisi = Proje.query.count()
         yetenek_sayisi = Yetenek.query.count()
         mesaj_sayisi = Mesaj.query.count()
@@ -105,8 +207,8 @@ def create_app():
     @app.route('/admin/settings', methods=['GET', 'POST'])
     @login_required
     def admin_settings():
-        admin = Kullanici.query.first()
         if request.method == 'POST':
+            admin = Kullanici.query.first()
             admin.kullanici_adi = request.form.get('kullanici_adi')
             admin.unvan = request.form.get('unvan')
             admin.hakkimda_yazisi = request.form.get('hakkimda_yazisi')
@@ -118,16 +220,14 @@ def create_app():
             admin.sosyal_linkedin = request.form.get('sosyal_linkedin')
             admin.website_label = request.form.get('website_label')
             admin.website_url = request.form.get('website_url')
-            if 'profil_foto' in request.files:
-                file = request.files['profil_foto']
-                if file and file.filename != '':
-                    filename = secure_filename(file.filename)
-                    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                    admin.profil_foto_url = url_for('static', filename='uploads/' + filename)
+            yeni_url = yuklenen_resim('profil_foto')
+            if yeni_url:
+                admin.profil_foto_url = yeni_url
             db.session.commit()
+            profile_cache.yenile()
             flash('Ayarlar güncellendi.', 'success')
             return redirect(url_for('admin_settings'))
-        return render_template('admin_settings.html', admin=admin)
+        return render_template('admin_settings.html', admin=profile_cache.admin())
 
     @app.route('/admin/resume', methods=['GET', 'POST'])
     @login_required
@@ -142,20 +242,16 @@ def create_app():
             is_active = 'is_active' in request.form
             degree = request.form.get('degree') if tip == 'Egitim' else None
             position = request.form.get('position') if tip == 'Deneyim' else None
-            logo_url = None
-            if 'logo' in request.files:
-                file = request.files['logo']
-                if file and file.filename != '':
-                    filename = secure_filename(file.filename)
-                    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                    logo_url = url_for('static', filename='uploads/' + filename)
+            logo_url = yuklenen_resim('logo')
             yeni_item = YolHaritasi(tip=tip, baslik=baslik, notlar=notlar, logo_url=logo_url, order_index=order_index, start_date=start_date, end_date=end_date, is_active=is_active, position=position, degree=degree)
             db.session.add(yeni_item)
             db.session.commit()
             flash('Kayıt eklendi.', 'success')
             return redirect(url_for('admin_resume'))
-        items = YolHaritasi.query.order_by(YolHaritasi.order_index.asc()).all()
-        return render_template('admin_resume.html', items=items)
+        sayfa = pagination.istek_sayfasi(queries.YOL_HARITASI_SIRASI, YolHaritasi.query)
+        if pagination.json_istegi():
+            return pagination.json_yaniti(sayfa, 'partials/resume_items.html', 'items')
+        return render_template('admin_resume.html', items=sayfa.ogeler, sayfa=sayfa)
 
     @app.route('/admin/resume/edit/<int:id>', methods=['GET', 'POST'])
     @login_required
@@ -171,12 +267,9 @@ def create_app():
             item.is_active = 'is_active' in request.form
             item.degree = request.form.get('degree') if item.tip == 'Egitim' else None
             item.position = request.form.get('position') if item.tip == 'Deneyim' else None
-            if 'logo' in request.files:
-                file = request.files['logo']
-                if file and file.filename != '':
-                    filename = secure_filename(file.filename)
-                    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                    item.logo_url = url_for('static', filename='uploads/' + filename)
+            yeni_url = yuklenen_resim('logo')
+            if yeni_url:
+                item.logo_url = yeni_url
             db.session.commit()
             flash('Kayıt güncellendi.', 'success')
             return redirect(url_for('admin_resume'))
@@ -195,6 +288,7 @@ def create_app():
     def contact():
         yeni_mesaj = Mesaj(gonderen_ad=request.form.get('ad_soyad'), gonderen_email=request.form.get('email'), konu=request.form.get('konu'), mesaj_icerigi=request.form.get('mesaj'))
         db.session.add(yeni_mesaj)
+        unread_counter.degistir(1)
         db.session.commit()
         flash('Mesajınız gönderildi.', 'success')
         return redirect(url_for('home', _anchor='iletisim'))
@@ -202,12 +296,48 @@ def create_app():
     @app.route('/admin/inbox')
     @login_required
     def admin_inbox():
-        mesajlar = Mesaj.query.order_by(Mesaj.tarih.desc()).all()
-        return render_template('admin_inbox.html', mesajlar=mesajlar)
+        sayfa = pagination.istek_sayfasi(queries.MESAJ_SIRASI, queries.gelen_kutusu())
+        if pagination.json_istegi():
+            return pagination.json_yaniti(sayfa, 'partials/inbox_rows.html', 'mesajlar')
+        # Tam sayım yerine Sayac'tan gelen okunmamış sayısı (inject_globals'taki unseen_count) gösterilir
+        return render_template('admin_inbox.html', mesajlar=sayfa.ogeler, sayfa=sayfa)
+
+    @app.route('/admin/search')
+    @versions.bagimli(Gunluk, ProjeFikri, Proje, Mesaj)
+    @login_required
+    def admin_search():
+        q = request.args.get('q', '').strip()
+        kaynak = request.args.get('kaynak') or None
+        sonuclar = search.ara(q, kaynak=kaynak, limit=min(request.args.get('limit', 50, type=int), 200)) if q else []
+        if request.args.get('format') == 'json':
+            return jsonify([{'kaynak': s['kaynak'], 'id': s['id'], 'baslik': str(s['baslik']), 'ozet': str(s['ozet']), 'skor': s['skor'], 'tarih': s['tarih'].isoformat() if s['tarih'] else None} for s in sonuclar])
+        return render_template('admin_search.html', q=q, kaynak=kaynak, sonuclar=sonuclar, kaynaklar=search.KAYNAKLAR)
+
+    @app.route('/admin/inbox/<int:id>')
+    @login_required
+    def read_message(id):
+        mesaj = Mesaj.query.get_or_404(id)
+        if not mesaj.okundu_mu:
+            mesaj.okundu_mu = True
+            unread_counter.degistir(-1)
+            db.session.commit()
+        return render_template('admin_message_detail.html', mesaj=mesaj)
+
+    @app.route('/admin/inbox/delete/<int:id>')
+    @login_required
+    def delete_message(id):
+        mesaj = Mesaj.query.get_or_404(id)
+        if not mesaj.okundu_mu:
+            unread_counter.degistir(-1)
+        db.session.delete(mesaj)
+        db.session.commit()
+        flash('Mesaj silindi.', 'success')
+        return redirect(url_for('admin_inbox'))
 
     @app.route('/project/<int:id>')
+    @page_cache.cached(Kullanici, Proje)
     def project_detail(id):
-        admin = Kullanici.query.first()
+        admin = profile_cache.admin()
         proje = Proje.query.get_or_404(id)
         return render_template('project_detail.html', admin=admin, proje=proje)
 
@@ -216,61 +346,35 @@ def create_app():
     def admin_projects():
         if request.method == 'POST':
             yeni_proje = Proje(baslik=request.form.get('baslik'), notlar=request.form.get('notlar'), detayli_icerik=request.form.get('detayli_icerik'), github_link=request.form.get('github_link'), canli_link=request.form.get('canli_link'))
-            if 'kapak_resmi' in request.files:
-                file = request.files['kapak_resmi']
-                if file and file.filename != '':
-                    filename = secure_filename(file.filename)
-                    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                    yeni_proje.kapak_resmi = url_for('static', filename='uploads/' + filename)
+            yeni_proje.kapak_resmi = yuklenen_resim('kapak_resmi')
             db.session.add(yeni_proje)
             db.session.commit()
             flash('Proje eklendi.', 'success')
             return redirect(url_for('admin_projects'))
-        return render_template('admin_projects.html', projeler=Proje.query.all())
+        sayfa = pagination.istek_sayfasi(queries.PROJE_SIRASI, Proje.query)
+        if pagination.json_istegi():
+            return pagination.json_yaniti(sayfa, 'partials/project_cards.html', 'projeler')
+        return render_template('admin_projects.html', projeler=sayfa.ogeler, sayfa=sayfa)
 
     @app.route('/admin/finance')
+    @versions.etag_yok
     @login_required
     def admin_finance():
-        # Başlangıç Envanteri
-        varliklar = {
-            'ALTIN': {'toplam': 0.0, 'fiziksel': 0.0, 'banka': 0.0},
-            'GUMUS': {'toplam': 0.0, 'fiziksel': 0.0, 'banka': 0.0},
-            'USD': {'toplam': 0.0, 'fiziksel': 0.0, 'banka': 0.0},
-            'EUR': {'toplam': 0.0, 'fiziksel': 0.0, 'banka': 0.0},
-            'NAKIT': {'toplam': 0.0, 'fiziksel': 0.0, 'banka': 0.0}
-        }
-
-        tum_islemler = FinansIslem.query.all()
-        
-        for islem in tum_islemler:
-            if islem.islem_turu == 'GELIR':
-                varliklar['NAKIT']['toplam'] += islem.tutar_tl
-                varliklar['NAKIT']['fiziksel'] += islem.tutar_tl
-            elif islem.islem_turu == 'GIDER':
-                varliklar['NAKIT']['toplam'] -= islem.tutar_tl
-                varliklar['NAKIT']['fiziksel'] -= islem.tutar_tl
-            elif islem.islem_turu in ['VARLIK_ALIM', 'VARLIK_SATIM']:
-                carpan = 1 if islem.islem_turu == 'VARLIK_ALIM' else -1
-                varliklar['NAKIT']['toplam'] -= (islem.tutar_tl * carpan)
-                varliklar['NAKIT']['fiziksel'] -= (islem.tutar_tl * carpan)
-                v_turu = islem.doviz_turu or islem.kategori
-                if v_turu in varliklar:
-                    miktar = islem.miktar
-                    varliklar[v_turu]['toplam'] += (miktar * carpan)
-                    if islem.varlik_konumu == 'BANKA':
-                        varliklar[v_turu]['banka'] += (miktar * carpan)
-                    else:
-                        varliklar[v_turu]['fiziksel'] += (miktar * carpan)
+        varliklar = ledger.envanter()
 
         canli_kurlar = get_live_rates()
-        net_servet = varliklar['NAKIT']['toplam']
-        net_servet += varliklar['ALTIN']['toplam'] * canli_kurlar['ALTIN']
-        net_servet += varliklar['GUMUS']['toplam'] * canli_kurlar['GUMUS']
-        net_servet += varliklar['USD']['toplam'] * canli_kurlar['USD']
-        net_servet += varliklar['EUR']['toplam'] * canli_kurlar['EUR']
+        bakiyeler = {tur: degerler['toplam'] for tur, degerler in varliklar.items()}
+        net_servet = net_worth.degerle(bakiyeler, canli_kurlar)
+        bugun = datetime.utcnow().date()
+        grafik = net_worth.cizgi(net_worth.seri(bugun - timedelta(days=app.config['NET_WORTH_CHART_DAYS']), kurlar=canli_kurlar, bugun=bugun, bakiyeler=bakiyeler))
+
+        yontem = request.args.get('yontem', 'fifo')
+        if yontem not in portfolio.YONTEMLER:
+            yontem = 'fifo'
+        portfoy_ozeti = portfoy.ozet(canli_kurlar, yontem)
 
-        islemler = FinansIslem.query.order_by(FinansIslem.tarih.desc()).limit(20).all()
-        return render_template('admin_finance.html', varliklar=varliklar, net_servet=net_servet, canli_kurlar=canli_kurlar, islemler=islemler)
+        islemler = queries.son_finans_islemleri(20).all()
+        return render_template('admin_finance.html', varliklar=varliklar, net_servet=net_servet, canli_kurlar=canli_kurlar, islemler=islemler, portfoy=portfoy_ozeti, grafik=grafik)
 
     @app.route('/admin/finance/add', methods=['POST'])
     @login_required
@@ -295,6 +399,9 @@ def create_app():
         birim_fiyat = tutar_tl / miktar if miktar > 0 else 0
         yeni_islem = FinansIslem(islem_turu=islem_turu, kategori=kategori, tutar_tl=tutar_tl, miktar=miktar, banka_adi=banka_adi, varlik_konumu=varlik_konumu, birim_fiyat=birim_fiyat, doviz_turu=doviz_turu, aciklama=aciklama)
         db.session.add(yeni_islem)
+        ledger.bakiyeleri_guncelle(yeni_islem)
+        finance_stats.islem_degisti(yeni_islem.tarih)
+        net_worth.islem_degisti(yeni_islem.tarih)
         db.session.commit()
         flash('Finansal işlem başarıyla kaydedildi.', 'success')
         return redirect(url_for('admin_finance'))
@@ -304,30 +411,137 @@ def create_app():
     def delete_finance_item(id):
         islem = FinansIslem.query.get_or_404(id)
         db.session.delete(islem)
+        ledger.bakiyeleri_guncelle(islem, isaret=-1)
+        finance_stats.islem_degisti(islem.tarih)
+        net_worth.islem_degisti(islem.tarih)
         db.session.commit()
         flash('İşlem silindi.', 'success')
         return redirect(url_for('admin_finance'))
 
+    @app.route('/admin/finance/import', methods=['POST'])
+    @login_required
+    def import_finance():
+        dosya = request.files.get('dosya')
+        if not dosya or not dosya.filename:
+            flash('İçe aktarılacak dosya seçilmedi.', 'error')
+            return redirect(url_for('admin_finance'))
+        bicim = finance_io.bicim_sec(dosya.filename, request.form.get('bicim'))
+        try:
+            sonuc = finance_io.ice_aktar(finance_io.satirlar(dosya.stream, bicim), kuru='kuru' in request.form)
+        except (finance_io.GecersizSatir, UnicodeDecodeError) as e:
+            db.session.rollback()
+            if pagination.json_istegi():
+                return jsonify({'success': False, 'error': str(e)}), 400
+            flash(f'Dosya okunamadı: {e}', 'error')
+            return redirect(url_for('admin_finance'))
+        if pagination.json_istegi():
+            return jsonify(dict(sonuc, success=True))
+        mesaj = f"{sonuc['eklenen']} işlem içe aktarıldı." if 'kuru' not in request.form else f"{sonuc['gecerli']} satır geçerli (deneme, yazılmadı)."
+        if sonuc['gecersiz']:
+            mesaj += f" {sonuc['gecersiz']} geçersiz satır atlandı; ilki satır {sonuc['hatalar'][0][0]}: {sonuc['hatalar'][0][1]}"
+        flash(mesaj, 'error' if sonuc['gecersiz'] else 'success')
+        return redirect(url_for('admin_finance'))
+
+    @app.route('/admin/finance/export')
+    @versions.bagimli(FinansIslem)
+    @login_required
+    def export_finance():
+        """?format=csv|jsonl, isteğe bağlı ?baslangic=&bitis= (YYYY-MM-DD, bitiş hariç). Yanıt parça parça üretilir."""
+        bicim = request.args.get('format', 'csv')
+        if bicim not in ('csv', 'jsonl'):
+            return jsonify({'success': False, 'error': 'format csv veya jsonl olmalı'}), 400
+        try:
+            baslangic, bitis = [datetime.strptime(request.args[ad], '%Y-%m-%d') if request.args.get(ad) else None for ad in ('baslangic', 'bitis')]
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Tarih formatı hatalı'}), 400
+        mimetype = 'text/csv' if bicim == 'csv' else 'application/x-ndjson'
+        response = Response(stream_with_context(finance_io.disa_aktar(bicim, baslangic, bitis)), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=finans-{date.today().isoformat()}.{bicim}'
+        return response
+
+    @app.route('/admin/finance/summary')
+    @versions.etag_yok
+    @login_required
+    def finance_summary():
+        periyot = request.args.get('periyot', 'ay')
+        if periyot not in ('ay', 'yil'):
+            return jsonify({'success': False, 'error': 'periyot ay veya yil olmalı'}), 400
+        canli_kurlar = get_live_rates()
+        return jsonify({'success': True, 'periyot': periyot, 'kurlar': canli_kurlar, 'seri': finance_stats.seri(periyot, canli_kurlar)})
+
+    @app.route('/admin/finance/networth')
+    @versions.etag_yok
+    @login_required
+    def finance_networth():
+        """?baslangic=&bitis= (YYYY-MM-DD, bitiş hariç; varsayılan son NET_WORTH_CHART_DAYS gün). Kapanmış günler anlık görüntü tablosundan okunur."""
+        bugun = datetime.utcnow().date()
+        try:
+            baslangic = datetime.strptime(request.args['baslangic'], '%Y-%m-%d').date() if request.args.get('baslangic') else bugun - timedelta(days=app.config['NET_WORTH_CHART_DAYS'])
+            bitis = datetime.strptime(request.args['bitis'], '%Y-%m-%d').date() if request.args.get('bitis') else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Tarih formatı hatalı'}), 400
+        return jsonify({'success': True, 'seri': net_worth.seri(baslangic, bitis, kurlar=get_live_rates(), bugun=bugun)})
+
+    @app.route('/admin/finance/portfolio')
+    @versions.etag_yok
+    @login_required
+    def finance_portfolio():
+        """?yontem=fifo|ortalama: varlık ve konum/banka başına maliyet esası, gerçekleşen ve gerçekleşmemiş kâr/zarar."""
+        yontem = request.args.get('yontem', 'fifo')
+        if yontem not in portfolio.YONTEMLER:
+            return jsonify({'success': False, 'error': 'yontem fifo veya ortalama olmalı'}), 400
+        canli_kurlar = get_live_rates()
+        return jsonify({'success': True, 'kurlar': canli_kurlar, **portfoy.ozet(canli_kurlar, yontem)})
+
+    @app.route('/admin/cache/stats')
+    @versions.etag_yok
+    @login_required
+    def cache_stats():
+        return jsonify({'profil': profile_cache.istatistik(), 'sayfa': {'hit': page_cache.hit, 'miss': page_cache.miss}})
+
+    @app.route('/admin/metrics')
+    @versions.etag_yok
+    @login_required
+    def admin_metrics():
+        if metrik is None:
+            abort(404)
+        return render_template('admin_metrics.html', satirlar=metrik.ozet(), yavas_sorgular=list(reversed(metrik.yavas_sorgular)), esik=metrik.yavas_sorgu_ms)
+
+    @app.route('/admin/metrics/reset', methods=['POST'])
+    @login_required
+    def reset_metrics():
+        if metrik is None:
+            abort(404)
+        metrik.sifirla()
+        flash('Ölçümler sıfırlandı.', 'success')
+        return redirect(url_for('admin_metrics'))
+
+    @app.route('/metrics')
+    @versions.etag_yok
+    def prometheus_metrics():
+        if metrik is None:
+            abort(404)
+        token = app.config['METRICS_TOKEN']
+        if not current_user.is_authenticated and not (token and request.headers.get('Authorization') == f'Bearer {token}'):
+            abort(401)
+        return app.response_class(metrik.prometheus(), mimetype='text/plain; version=0.0.4')
+
     @app.route('/admin/planner')
     @login_required
     def admin_planner():
-        from datetime import timedelta
-        bugun = date.today()
-        gunluk_plan = Gorev.query.filter(func.date(Gorev.son_tarih) == bugun, Gorev.kategori == 'GOREV').order_by(Gorev.saat).all()
-        gunun_onemlileri = Gorev.query.filter(func.date(Gorev.son_tarih) == bugun, Gorev.onemli_mi == True).all()
-        hafta_basla = bugun - timedelta(days=bugun.weekday())
-        hafta_sonu = hafta_basla + timedelta(days=6)
-        haftalik_gorevler = Gorev.query.filter(Gorev.son_tarih.isnot(None), func.date(Gorev.son_tarih) >= hafta_basla, func.date(Gorev.son_tarih) <= hafta_sonu).all()
-        haftalik_plan = {'Pazartesi': [], 'Salı': [], 'Çarşamba': [], 'Perşembe': [], 'Cuma': [], 'Cumartesi': [], 'Pazar': []}
-        gun_map = {0: 'Pazartesi', 1: 'Salı', 2: 'Çarşamba', 3: 'Perşembe', 4: 'Cuma', 5: 'Cumartesi', 6: 'Pazar'}
-        for gorev in haftalik_gorevler:
-            if gorev.son_tarih:
-                gun_index = gorev.son_tarih.date().weekday()
-                gun_adi = gun_map.get(gun_index)
-                if gun_adi: haftalik_plan[gun_adi].append(gorev)
-        tum_gorevler = Gorev.query.all()
-        yillik_hedefler = Gorev.query.filter_by(kategori='HEDEF').all()
-        return render_template('admin_planner.html', gunluk_plan=gunluk_plan, gunun_onemlileri=gunun_onemlileri, haftalik_plan=haftalik_plan, tum_gorevler=tum_gorevler, yillik_hedefler=yillik_hedefler)
+        return render_template('admin_planner.html', **planner.planlayici_verisi(date.today()))
+
+    @app.route('/admin/planner/events')
+    @versions.bagimli(Gorev)
+    @login_required
+    def planner_events():
+        baslangic, bitis = request.args.get('start'), request.args.get('end')
+        if not baslangic or not bitis:
+            return jsonify({'success': False, 'error': 'start ve end gerekli'}), 400
+        try:
+            return jsonify(planner.takvim_olaylari(baslangic, bitis))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Tarih formatı hatalı'}), 400
 
     @app.route('/admin/planner/add', methods=['POST'])
     @login_required
@@ -371,9 +585,17 @@ def create_app():
     @app.route('/admin/diaries')
     @login_required
     def admin_diaries():
-        gunlukler = Gunluk.query.filter_by(tur='GUNLUK').order_by(Gunluk.tarih.desc()).all()
-        yilliklar = Gunluk.query.filter_by(tur='YILLIK').order_by(Gunluk.tarih.desc()).all()
-        return render_template('admin_diaries.html', gunlukler=gunlukler, yilliklar=yilliklar)
+        if pagination.json_istegi():
+            # Sekmeler ayrı ayrı kaydırılır: ?tur= hangi listenin devamının istendiğini söyler
+            if request.args.get('tur') == 'YILLIK':
+                sayfa = pagination.istek_sayfasi(queries.GUNLUK_SIRASI, queries.gunlukler('YILLIK'))
+                return pagination.json_yaniti(sayfa, 'partials/diary_yearly.html', 'yilliklar')
+            sayfa = pagination.istek_sayfasi(queries.GUNLUK_SIRASI, queries.gunlukler('GUNLUK'))
+            return pagination.json_yaniti(sayfa, 'partials/diary_cards.html', 'gunlukler')
+        boyut = app.config['ADMIN_PAGE_SIZE']
+        gunluk_sayfasi = queries.GUNLUK_SIRASI.sayfa(queries.gunlukler('GUNLUK'), boyut=boyut)
+        yillik_sayfasi = queries.GUNLUK_SIRASI.sayfa(queries.gunlukler('YILLIK'), boyut=boyut)
+        return render_template('admin_diaries.html', gunlukler=gunluk_sayfasi.ogeler, yilliklar=yillik_sayfasi.ogeler, gunluk_sayfasi=gunluk_sayfasi, yillik_sayfasi=yillik_sayfasi)
 
     @app.route('/admin/diaries/add', methods=['POST'])
     @login_required
@@ -413,20 +635,29 @@ def create_app():
     @login_required
     def admin_books():
         secili_yil = request.args.get('yil')
-        yillar_query = db.session.query(extract('year', Kitap.okunma_tarihi)).filter(Kitap.okunma_tarihi.isnot(None)).distinct().all()
-        yillar = sorted([int(y[0]) for y in yillar_query if y[0] is not None], reverse=True)
-        query = Kitap.query
         if secili_yil and secili_yil != 'genel':
-            query = query.filter(extract('year', Kitap.okunma_tarihi) == int(secili_yil))
+            yil = int(secili_yil)
             secili_yil_display = secili_yil
         else:
+            yil = None
             secili_yil_display = 'Genel'
             secili_yil = 'genel'
-        kitaplar = query.order_by(Kitap.okunma_tarihi.desc()).all()
-        toplam_kitap = len(kitaplar)
-        toplam_sayfa = sum(kitap.sayfa_sayisi for kitap in kitaplar if kitap.sayfa_sayisi)
-        toplam_yazar = len(set([kitap.yazar for kitap in kitaplar if kitap.yazar]))
-        return render_template('admin_books.html', books=kitaplar, toplam_kitap=toplam_kitap, toplam_sayfa=toplam_sayfa, toplam_yazar=toplam_yazar, yillar=yillar, secili_yil=secili_yil, secili_yil_display=secili_yil_display)
+        sayfa = pagination.istek_sayfasi(queries.KITAP_SIRASI, queries.kitaplar(yil))
+        if pagination.json_istegi():
+            return pagination.json_yaniti(sayfa, 'partials/book_rows.html', 'books')
+        istatistik = reading_stats.ozet(yil)
+        return render_template('admin_books.html', books=sayfa.ogeler, sayfa=sayfa, toplam_kitap=istatistik['kitap'], toplam_sayfa=istatistik['sayfa'], toplam_yazar=istatistik['yazar'], istatistik=istatistik, yillar=reading_stats.yillar(), secili_yil=secili_yil, secili_yil_display=secili_yil_display)
+
+    @app.route('/admin/books/stats')
+    @versions.bagimli(Kitap, OkumaOzet)
+    @login_required
+    def book_stats():
+        """Trend grafikleri için: yıllık seri, ?yil= verilirse o yılın aylık dağılımı ve en çok okunan yazarları."""
+        yanit = {'success': True, 'yillik': reading_stats.yillik_seri()}
+        yil = request.args.get('yil', type=int)
+        if yil:
+            yanit['yil'] = dict(reading_stats.ozet(yil), yil=yil)
+        return jsonify(yanit)
 
     @app.route('/admin/books/add', methods=['POST'])
     @login_required
@@ -435,6 +666,7 @@ def create_app():
         okunma_tarihi = datetime.strptime(okunma_tarihi_str, '%Y-%m-%d') if okunma_tarihi_str else None
         yeni_kitap = Kitap(kitap_adi=request.form.get('kitap_adi'), yazar=request.form.get('yazar'), sayfa_sayisi=int(request.form.get('sayfa_sayisi') or 0), okunma_tarihi=okunma_tarihi)
         db.session.add(yeni_kitap)
+        reading_stats.kitap_degisti(yeni_kitap)
         db.session.commit()
         flash('Kitap eklendi.', 'success')
         return redirect(url_for('admin_books'))
@@ -444,6 +676,7 @@ def create_app():
     def delete_book(id):
         kitap = Kitap.query.get_or_404(id)
         db.session.delete(kitap)
+        reading_stats.kitap_degisti(kitap, isaret=-1)
         db.session.commit()
         flash('Kitap silindi.', 'success')
         return redirect(url_for('admin_books'))
@@ -452,10 +685,11 @@ def create_app():
     @login_required
     def admin_ideas():
         fikirler = ProjeFikri.query.filter_by(durum='FIKIR').order_by(ProjeFikri.olusturma_tarihi.desc()).all()
-        aktif_projeler = ProjeFikri.query.filter_by(durum='AKTIF').order_by(ProjeFikri.baslangic_tarihi.desc()).all()
+        aktif_projeler = queries.aktif_projeler().all()
         for proje in aktif_projeler:
+            # gorevler selectinload ile tek sorguda geldi; kanban da aynı listeyi kullanır
             toplam = len(proje.gorevler)
-            biten = len([g for g in proje.gorevler if g.durum == 'BITTI'])
+            biten = sum(1 for g in proje.gorevler if g.durum == 'BITTI')
             proje.ilerleme_yuzde = (biten / toplam * 100) if toplam > 0 else 0
         biten_projeler = ProjeFikri.query.filter_by(durum='BITTI').order_by(ProjeFikri.bitis_tarihi.desc()).all()
         return render_template('admin_ideas.html', fikirler=fikirler, aktif_projeler=aktif_projeler, biten_projeler=biten_projeler, now=datetime.now())
@@ -485,8 +719,14 @@ def create_app():
     @app.route('/admin/studio')
     @login_required
     def admin_studio():
-        projeler = StudioProject.query.order_by(StudioProject.olusturma_tarihi.desc()).all()
-        return render_template('studio.html', projeler=projeler)
+        sayfa = pagination.istek_sayfasi(queries.STUDIO_SIRASI, queries.studio_projeleri())
+        projeler = []
+        for proje, not_sayisi in sayfa.ogeler:
+            proje.not_sayisi = not_sayisi
+            projeler.append(proje)
+        if pagination.json_istegi():
+            return pagination.json_yaniti(sayfa._replace(ogeler=projeler), 'partials/studio_cards.html', 'projeler')
+        return render_template('studio.html', projeler=projeler, sayfa=sayfa)
 
     @app.route('/admin/studio/add', methods=['POST'])
     @login_required
@@ -551,6 +791,8 @@ def create_app():
         kitap = Kitap.query.get_or_404(id)
         data = request.get_json()
         if data:
+            # Özetten eski hali çıkarılıp yeni hali eklenir; yıl, ay ya da yazar değiştiyse kova da değişir
+            reading_stats.kitap_degisti(kitap, isaret=-1)
             kitap.kitap_adi = data.get('kitap_adi', kitap.kitap_adi)
             kitap.yazar = data.get('yazar', kitap.yazar)
             kitap.sayfa_sayisi = int(data.get('sayfa_sayisi') or kitap.sayfa_sayisi)
@@ -558,6 +800,7 @@ def create_app():
                 try:
                     kitap.okunma_tarihi = datetime.strptime(data.get('okunma_tarihi'), '%Y-%m-%d')
                 except: pass
+            reading_stats.kitap_degisti(kitap)
             db.session.commit()
             return jsonify({'success': True})
         return jsonify({'success': False}), 400
@@ -619,12 +862,9 @@ def create_app():
             proje.detayli_icerik = request.form.get('detayli_icerik')
             proje.github_link = request.form.get('github_link')
             proje.canli_link = request.form.get('canli_link')
-            if 'kapak_resmi' in request.files:
-                file = request.files['kapak_resmi']
-                if file and file.filename != '':
-                    filename = secure_filename(file.filename)
-                    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                    proje.kapak_resmi = url_for('static', filename='uploads/' + filename)
+            yeni_url = yuklenen_resim('kapak_resmi')
+            if yeni_url:
+                proje.kapak_resmi = yeni_url
             db.session.commit()
             flash('Proje güncellendi.', 'success')
             return redirect(url_for('admin_projects'))
@@ -642,7 +882,7 @@ def create_app():
     @app.route('/admin/studio/<int:id>')
     @login_required
     def studio_detail(id):
-        admin = Kullanici.query.first()
+        admin = profile_cache.admin()
         proje = StudioProject.query.get_or_404(id)
         return render_template('studio_detail.html', admin=admin, proje=proje)
 
@@ -654,7 +894,245 @@ def create_app():
             db.session.commit()
             flash('Yetenek eklendi.', 'success')
             return redirect(url_for('admin_skills'))
-        return render_template('admin_skills.html', yetenekler=Yetenek.query.all())
+        sayfa = pagination.istek_sayfasi(queries.YETENEK_SIRASI, Yetenek.query)
+        if pagination.json_istegi():
+            return pagination.json_yaniti(sayfa, 'partials/skill_rows.html', 'yetenekler')
+        return render_template('admin_skills.html', yetenekler=sayfa.ogeler, sayfa=sayfa)
+
+    versions.ConditionalGet(app)
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade():
+        """Eksik tabloları kurar ve bekleyen şema adımlarını uygular (deploy adımı; idempotent)."""
+        onceki = schema.surum()
+        try:
+            degisti = schema.yukselt()
+        except OperationalError as e:
+            raise click.ClickException(f'şema yükseltilemedi: {e}')
+        if degisti:
+            click.echo(f'Şema {onceki} -> {schema.surum()} sürümüne yükseltildi, eksik tablolar kuruldu.')
+        else:
+            click.echo(f'Şema güncel (sürüm {schema.surum()}).')
+
+    @app.cli.command('ledger-rebuild')
+    @click.option('--check', is_flag=True, help='Sadece sapmaları raporla, tabloyu değiştirme.')
+    def ledger_rebuild(check):
+        """Varlık bakiyelerini FinansIslem defterinden yeniden hesaplar."""
+        sapmalar = ledger.sapmalari_bul()
+        for tur, alan, mevcut, beklenen in sapmalar:
+            click.echo(f'{tur}.{alan}: tabloda {mevcut:,.4f}, defterde {beklenen:,.4f} (fark {mevcut - beklenen:+,.4f})')
+        if not sapmalar:
+            click.echo('Bakiyeler defterle tutarlı.')
+        if check:
+            if sapmalar:
+                raise SystemExit(1)
+            return
+        ledger.yeniden_olustur()
+        db.session.commit()
+        click.echo('Bakiye tablosu yeniden oluşturuldu.')
+
+    @app.cli.command('finance-snapshot')
+    @click.option('--rebuild', is_flag=True, help='Tüm günlük anlık görüntüleri silip kur geçmişinden yeniden üretir.')
+    def finance_snapshot(rebuild):
+        """Günlük iş (cron): eski kur noktalarını RATE_HISTORY_TIERS'a göre seyreltir, kapanmış günlerin net servetini yazar."""
+        silinen = rate_history.seyrelt(app.config['RATE_HISTORY_TIERS'])
+        if rebuild:
+            net_worth.gunler_degisti({date.min})
+            db.session.commit()
+        yazilan = net_worth.kapali_gunleri_doldur()
+        click.echo(f'{silinen} kur noktası seyreltildi, {yazilan} günün net serveti yazıldı.')
+
+    @app.cli.command('finance-import')
+    @click.argument('dosya', type=click.File('rb'))
+    @click.option('--format', 'bicim', type=click.Choice(['csv', 'jsonl']), default=None, help='Verilmezse dosya uzantısından seçilir.')
+    @click.option('--batch-size', type=int, default=finance_io.PARTI, help='Transaction başına satır.')
+    @click.option('--dry-run', is_flag=True, help='Sadece doğrula, yazma.')
+    def finance_import(dosya, bicim, batch_size, dry_run):
+        """CSV/JSONL işlem dosyasını (ya da '-' ile stdin) parti parti FinansIslem'e aktarır; bakiyeler parti başına güncellenir."""
+        try:
+            sonuc = finance_io.ice_aktar(finance_io.satirlar(dosya, finance_io.bicim_sec(dosya.name, bicim)), parti=batch_size, kuru=dry_run)
+        except (finance_io.GecersizSatir, UnicodeDecodeError) as e:
+            raise click.ClickException(str(e))
+        for no, hata in sonuc['hatalar']:
+            click.echo(f'satır {no}: {hata}')
+        if sonuc['gecersiz'] > len(sonuc['hatalar']):
+            click.echo(f"... ve {sonuc['gecersiz'] - len(sonuc['hatalar'])} hatalı satır daha")
+        click.echo(f"{sonuc['gecerli']} geçerli, {sonuc['gecersiz']} geçersiz satır; {sonuc['eklenen']} işlem yazıldı.")
+        if sonuc['gecersiz']:
+            raise SystemExit(1)
+
+    @app.cli.command('finance-export')
+    @click.option('--format', 'bicim', type=click.Choice(['csv', 'jsonl']), default='csv')
+    @click.option('--since', type=click.DateTime(['%Y-%m-%d']), default=None)
+    @click.option('--until', type=click.DateTime(['%Y-%m-%d']), default=None, help='Bu gün hariç.')
+    @click.option('--output', type=click.File('w', encoding='utf-8'), default='-')
+    def finance_export(bicim, since, until, output):
+        """FinansIslem defterini tarih sırasıyla CSV/JSONL olarak yazar; defter belleğe alınmaz."""
+        for parca in finance_io.disa_aktar(bicim, since, until):
+            output.write(parca)
+
+    @app.cli.command('reading-stats-rebuild')
+    @click.option('--check', is_flag=True, help='Sadece sapmaları raporla, tabloyu değiştirme.')
+    def reading_stats_rebuild(check):
+        """Okuma istatistikleri özetini Kitap tablosundan yeniden hesaplar."""
+        sapmalar = reading_stats.sapmalari_bul()
+        for (yil, ay, yazar), (adet, sayfa), (b_adet, b_sayfa) in sapmalar:
+            click.echo(f'{yil}-{ay:02d} {yazar or "(yazarsız)"}: tabloda {adet} kitap/{sayfa} sayfa, beklenen {b_adet} kitap/{b_sayfa} sayfa')
+        if not sapmalar:
+            click.echo('Okuma özeti kitaplarla tutarlı.')
+        if check:
+            if sapmalar:
+                raise SystemExit(1)
+            return
+        reading_stats.yeniden_olustur()
+        db.session.commit()
+        click.echo('Okuma özeti yeniden oluşturuldu.')
+
+    @app.cli.command('check-indexes')
+    def check_indexes():
+        """Sıcak sorguların EXPLAIN QUERY PLAN çıktısında tam tablo taraması olmadığını doğrular."""
+        hatali = 0
+        for ad, sorgu in queries.kontrol_edilecek_sorgular():
+            plan = queries.sorgu_plani(sorgu)
+            tarama = queries.tam_tarama_var(plan)
+            hatali += tarama
+            click.echo(f"{'TARAMA' if tarama else 'OK':<7} {ad}: {' | '.join(plan)}")
+        if hatali:
+            raise SystemExit(1)
+
+    @app.cli.command('sqlite-status')
+    def sqlite_status():
+        """Aktif SQLITE_PROFILE'ın bağlantıda gerçekten geçerli olan PRAGMA değerlerini gösterir."""
+        click.echo(f"profil: {app.config['SQLITE_PROFILE']}")
+        for ad, deger in sqlite_profile.durum().items():
+            click.echo(f'  {ad:<14} {deger}')
+
+    @app.cli.command('images-convert')
+    def images_convert():
+        """static/uploads altındaki eski (işlenmemiş) görselleri WebP/AVIF varyantlarına çevirip URL'leri günceller."""
+        onek = app.static_url_path + '/'
+        alanlar = [(Kullanici, 'profil_foto_url'), (YolHaritasi, 'logo_url'), (Proje, 'kapak_resmi')]
+        cevrilen = {}
+        for model, alan in alanlar:
+            for kayit in model.query.filter(getattr(model, alan).like(onek + '%')).all():
+                eski = getattr(kayit, alan)
+                if eski not in cevrilen:
+                    yol = os.path.join(app.static_folder, eski[len(onek):])
+                    if images.ICERIK_URL.search(eski) or not os.path.isfile(yol):
+                        continue
+                    try:
+                        with open(yol, 'rb') as f:
+                            cevrilen[eski] = onek + image_pipeline.kaydet(f)
+                    except GecersizResim as e:
+                        click.echo(f'atlandı {eski}: {e}')
+                        continue
+                    click.echo(f'{eski} -> {cevrilen[eski]} ({os.path.getsize(yol) // 1024} KB -> {os.path.getsize(os.path.join(app.static_folder, cevrilen[eski][len(onek):])) // 1024} KB)')
+                setattr(kayit, alan, cevrilen[eski])
+        db.session.commit()
+        profile_cache.yenile()
+        image_pipeline.bekle()
+        click.echo(f'{len(cevrilen)} görsel çevrildi; varyantlar hazır. Eski dosyalar yerinde bırakıldı.')
+
+    @app.cli.command('uploads-gc')
+    @click.option('--dry-run', is_flag=True, help='Silinecekleri listele, dosyalara dokunma.')
+    @click.option('--legacy', is_flag=True, help='Hiçbir kayıtta geçmeyen eski düz yüklemeleri de sil.')
+    @click.option('--grace', type=int, default=uploads.GC_BEKLEME, help='Bu kadar saniyeden yeni dosyalar silinmez.')
+    def uploads_gc(dry_run, legacy, grace):
+        """Referans sayısı 0 olan içerik adresli görselleri (tüm varyantlarıyla) siler; sayaç sapmalarını düzeltir."""
+        # Doğrulama: sayaçlar kolonlardan yeniden sayılıp karşılaştırılır; sapma varsa silmeden önce düzeltilir
+        sapmalar = uploads.sapmalari_bul()
+        for h, tablodaki, gercek in sapmalar:
+            click.echo(f'referans sapması {h[:12]}: tabloda {tablodaki}, kolonlarda {gercek}')
+        if sapmalar and not dry_run:
+            uploads.yeniden_say()
+            db.session.commit()
+        klasor = app.config['UPLOAD_FOLDER']
+        sahipsiz = uploads.sahipsizler(klasor, grace, korunan={h for h, _, gercek in sapmalar if gercek})
+        silinecek = [(h[:12], dosyalar, bayt) for h, dosyalar, bayt in sahipsiz]
+        if legacy:
+            url_oneki = app.static_url_path + '/' + os.path.relpath(klasor, app.static_folder).replace(os.sep, '/') + '/'
+            silinecek += [(os.path.basename(yol), [yol], bayt) for yol, bayt in uploads.eski_dosyalar(klasor, url_oneki, grace)]
+        for ad, dosyalar, bayt in silinecek:
+            click.echo(f"{'silinecek' if dry_run else 'silindi'}: {ad} ({len(dosyalar)} dosya, {bayt // 1024} KB)")
+            if not dry_run:
+                for yol in dosyalar:
+                    os.remove(yol)
+                if os.path.dirname(dosyalar[0]) != klasor and not os.listdir(os.path.dirname(dosyalar[0])):
+                    os.rmdir(os.path.dirname(dosyalar[0]))
+        if not dry_run:
+            uploads.kayitlari_sil([h for h, _, _ in sahipsiz])
+            db.session.commit()
+        click.echo(f"{len(silinecek)} sahipsiz görsel, toplam {sum(b for _, _, b in silinecek) // 1024} KB.")
+
+    @app.cli.command('backup-create')
+    @click.option('--output', default=None, help="Arşiv yolu; '-' ise stdout. Varsayılan BACKUP_FOLDER/yedek-<zaman>.tar.<sıkıştırma>.")
+    @click.option('--incremental-from', 'temel', default=None, help='Önceki yedek (arşiv ya da .manifest.json); sadece yeni/değişen yüklemeler yazılır.')
+    @click.option('--compression', type=click.Choice(backup.SIKISTIRMALAR), default='none', help='Tüm arşivin sıkıştırması; veritabanı her durumda gzip\'lidir.')
+    @click.option('--level', type=click.IntRange(0, 9), default=6)
+    def backup_create(output, temel, compression, level):
+        """Veritabanının yazarları bekletmeyen anlık görüntüsünü ve yüklemeleri tek bir tar akışı olarak yazar."""
+        t0 = time.perf_counter()
+        db_yolu = db.engine.url.database
+        temel_manifest = backup.manifest_oku(temel) if temel else None
+        if output == '-':
+            manifest = backup.yedekle(click.get_binary_stream('stdout'), db_yolu, app.config['UPLOAD_FOLDER'], temel_manifest, compression, level)
+        else:
+            if output is None:
+                os.makedirs(app.config['BACKUP_FOLDER'], exist_ok=True)
+                uzanti = '.tar' if compression == 'none' else f'.tar.{compression}'
+                output = os.path.join(app.config['BACKUP_FOLDER'], f"yedek-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}{'-artimli' if temel else ''}{uzanti}")
+            gecici = output + '.tmp'
+            with open(gecici, 'wb') as f:
+                manifest = backup.yedekle(f, db_yolu, app.config['UPLOAD_FOLDER'], temel_manifest, compression, level)
+            os.replace(gecici, output)
+            # Sonraki --incremental-from arşivi baştan sona açmadan manifesti okuyabilsin
+            with open(output + '.manifest.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, sort_keys=True)
+        yeni = sum(1 for bilgi in manifest['dosyalar'].values() if bilgi['yedek'] == manifest['kimlik'])
+        tepe = backup.tepe_bellek_mb()
+        click.echo(f"{manifest['kimlik']}: veritabanı {manifest['veritabani']['boyut'] / 1e6:.1f} MB, {yeni}/{len(manifest['dosyalar'])} yükleme yazıldı "
+                   f"({manifest['yazilan_bayt'] / 1e6:.1f} MB) -> {output}; {time.perf_counter() - t0:.1f} s" + (f', tepe RSS {tepe:.0f} MB' if tepe else ''), err=output == '-')
+
+    @app.cli.command('backup-restore')
+    @click.argument('arsivler', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+    @click.option('--verify-only', is_flag=True, help='Sadece aç ve doğrula, mevcut veriye dokunma.')
+    @click.option('--discard-old', is_flag=True, help='Mevcut veritabanı ve yüklemeleri .eski-<zaman> olarak saklama.')
+    def backup_restore(arsivler, verify_only, discard_old):
+        """Tam yedek ve (sırasıyla) artımlı yedeklerini doğrulayıp veritabanı ve yüklemelerin yerine koyar. Uygulama durdurulmuş olmalı."""
+        t0 = time.perf_counter()
+        db_yolu = db.engine.url.database
+        db.session.remove()
+        db.engine.dispose()
+        try:
+            rapor = backup.geri_yukle(list(arsivler), db_yolu, app.config['UPLOAD_FOLDER'], sadece_dogrula=verify_only, eskiyi_sakla=not discard_old)
+        except backup.GecersizYedek as e:
+            raise click.ClickException(f'doğrulama başarısız, mevcut veriye dokunulmadı: {e}')
+        tepe = backup.tepe_bellek_mb()
+        click.echo(f"{rapor['kimlik']} {'doğrulandı' if verify_only else 'geri yüklendi'}: {rapor['dosya']} yükleme ({rapor['bayt'] / 1e6:.1f} MB), şema sürümü {rapor['user_version']}; "
+                   f"{time.perf_counter() - t0:.1f} s" + (f', tepe RSS {tepe:.0f} MB' if tepe else ''))
+        for yol in rapor.get('eski', ()):
+            click.echo(f'önceki hali: {yol}')
+
+    @app.cli.command('assets-build')
+    def assets_build():
+        """static/ altındaki metin dosyalarını (yüklemeler hariç) gzip (ve brotli kuruluysa br) ile önceden sıkıştırır."""
+        yeni, atlanan = static_assets.on_sikistir(app.static_folder, [app.config['UPLOAD_FOLDER']])
+        click.echo(f"{yeni} sıkıştırılmış kopya üretildi, {atlanan} güncel kopya atlandı{'' if static_assets.brotli else ' (brotli kurulu değil, sadece gzip)'}.")
+
+    @app.cli.command('search-rebuild')
+    def search_rebuild():
+        """FTS5 arama tablosunu günlük, fikir, proje ve mesajlardan baştan kurar."""
+        adet = search.yeniden_olustur()
+        db.session.commit()
+        click.echo(f'{adet} kayıt indekslendi.')
+
+    @app.cli.command('visitors-compact')
+    @click.option('--days', type=int, default=None, help='Bu günden eski ham ziyaretler katlanır (varsayılan VISITOR_RETENTION_DAYS).')
+    def visitors_compact(days):
+        """Eski Ziyaretci satırlarını günlük özete katlayıp siler."""
+        gun_sayisi = days if days is not None else app.config['VISITOR_RETENTION_DAYS']
+        katlanan, silinen = visitors.sikistir(gun_sayisi)
+        click.echo(f'{katlanan} gün/sayfa özeti güncellendi, {silinen} ham ziyaret silindi.')
 
     return app
 
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request, request_started, request_finished, before_render_template, template_rendered
+from sqlalchemy import event
+
+from extensions import db
+
+# İstek süresi histogramının üst sınırları (saniye); Prometheus 'le' etiketleri
+SURE_KOVALARI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+@contextmanager
+def dis_cagri():
+    """Ağa / dış servise giden çağrıyı sarar; süresi isteğin 'dış' süresine eklenir. Ölçüm kapalıysa etkisizdir."""
+    olcum = g.get('olcum') if has_request_context() else None
+    if olcum is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        olcum['dis'] += time.perf_counter() - t0
+
+
+class Metrics:
+    """
+    İsteğe bağlı (METRICS_ENABLED) istek ölçümü. Her istek için SQL sorgu sayısı ve süresi (cursor_execute
+    olayları), şablon render süresi (Flask şablon sinyalleri) ve dis_cagri() ile sarılan dış çağrı süresi
+    toplanır; endpoint başına biriktirilir. Eşiği aşan SELECT'ler EXPLAIN QUERY PLAN ile loglanır.
+    """
+
+    def __init__(self, app, yavas_sorgu_ms=100, yavas_kayit=50):
+        self.app = app
+        self.yavas_sorgu_ms = yavas_sorgu_ms
+        self._lock = threading.Lock()
+        self._endpointler = {}
+        self.yavas_sorgular = deque(maxlen=yavas_kayit)
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._sorgu_basladi)
+        event.listen(engine, 'after_cursor_execute', self._sorgu_bitti)
+        event.listen(engine, 'handle_error', self._sorgu_hatasi)
+        request_started.connect(self._istek_basladi, app)
+        request_finished.connect(self._istek_bitti, app)
+        before_render_template.connect(self._render_basladi, app)
+        template_rendered.connect(self._render_bitti, app)
+
+    # --- istek ---
+
+    def _istek_basladi(self, sender, **extra):
+        g.olcum = {'t0': time.perf_counter(), 'sorgu': 0, 'db': 0.0, 'render': 0.0, 'dis': 0.0, 'render_t0': []}
+
+    def _istek_bitti(self, sender, response, **extra):
+        olcum = g.pop('olcum', None)
+        if olcum is None:
+            return
+        sure = time.perf_counter() - olcum['t0']
+        endpoint = request.endpoint or '<eşleşmeyen>'
+        with self._lock:
+            kayit = self._endpointler.get(endpoint)
+            if kayit is None:
+                kayit = self._endpointler[endpoint] = {'istek': 0, 'sure': 0.0, 'sure_max': 0.0, 'sorgu': 0, 'sorgu_max': 0, 'db': 0.0, 'render': 0.0, 'dis': 0.0, 'kovalar': [0] * len(SURE_KOVALARI), 'hata': 0}
+            kayit['istek'] += 1
+            kayit['sure'] += sure
+            kayit['sure_max'] = max(kayit['sure_max'], sure)
+            kayit['sorgu'] += olcum['sorgu']
+            kayit['sorgu_max'] = max(kayit['sorgu_max'], olcum['sorgu'])
+            kayit['db'] += olcum['db']
+            kayit['render'] += olcum['render']
+            kayit['dis'] += olcum['dis']
+            kayit['hata'] += response.status_code >= 500
+            for i, sinir in enumerate(SURE_KOVALARI):
+                if sure <= sinir:
+                    kayit['kovalar'][i] += 1
+
+    # --- şablon ---
+
+    def _render_basladi(self, sender, template, context, **extra):
+        olcum = g.get('olcum')
+        if olcum is not None:
+            olcum['render_t0'].append(time.perf_counter())
+
+    def _render_bitti(self, sender, template, context, **extra):
+        olcum = g.get('olcum')
+        if olcum is not None and olcum['render_t0']:
+            olcum['render'] += time.perf_counter() - olcum['render_t0'].pop()
+
+    # --- SQL ---
+
+    def _sorgu_basladi(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('olcum_t0', []).append(time.perf_counter())
+
+    def _sorgu_bitti(self, conn, cursor, statement, parameters, context, executemany):
+        sure = time.perf_counter() - conn.info['olcum_t0'].pop()
+        olcum = g.get('olcum') if has_request_context() else None
+        if olcum is not None:
+            olcum['sorgu'] += 1
+            olcum['db'] += sure
+        if sure * 1000 >= self.yavas_sorgu_ms and not executemany and statement.lstrip().upper().startswith('SELECT'):
+            self._yavas_sorgu(conn, statement, parameters, sure)
+
+    def _sorgu_hatasi(self, context):
+        baslangiclar = context.connection.info.get('olcum_t0') if context.connection is not None else None
+        if baslangiclar:
+            baslangiclar.pop()
+
+    def _yavas_sorgu(self, conn, statement, parameters, sure):
+        # Ölçülen bağlantının DBAPI cursor'ı üzerinden; SQLAlchemy olaylarını tekrar tetiklemez
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                plan = [satir[-1] for satir in cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ()).fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            plan = [f'EXPLAIN başarısız: {e}']
+        endpoint = request.endpoint if has_request_context() else None
+        self.yavas_sorgular.append({'zaman': time.time(), 'endpoint': endpoint, 'ms': sure * 1000, 'sql': statement, 'plan': plan})
+        self.app.logger.warning('Yavaş sorgu (%.1f ms, %s): %s | plan: %s', sure * 1000, endpoint, ' '.join(statement.split()), ' | '.join(plan))
+
+    # --- raporlama ---
+
+    def ozet(self):
+        """Endpoint başına ortalamalar; en çok toplam süre harcayan önce."""
+        with self._lock:
+            kopyalar = {endpoint: dict(kayit) for endpoint, kayit in self._endpointler.items()}
+        satirlar = []
+        for endpoint, k in kopyalar.items():
+            n = k['istek']
+            satirlar.append({
+                'endpoint': endpoint, 'istek': n, 'hata': k['hata'],
+                'ort_ms': k['sure'] / n * 1000, 'max_ms': k['sure_max'] * 1000,
+                'ort_sorgu': k['sorgu'] / n, 'max_sorgu': k['sorgu_max'],
+                'db_ms': k['db'] / n * 1000, 'render_ms': k['render'] / n * 1000, 'dis_ms': k['dis'] / n * 1000,
+                'toplam_s': k['sure'],
+            })
+        satirlar.sort(key=lambda s: s['toplam_s'], reverse=True)
+        return satirlar
+
+    def prometheus(self):
+        """Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            kopyalar = {endpoint: dict(kayit, kovalar=list(kayit['kovalar'])) for endpoint, kayit in self._endpointler.items()}
+        satirlar = []
+
+        def metrik(ad, tip, aciklama, degerler):
+            satirlar.append(f'# HELP {ad} {aciklama}')
+            satirlar.append(f'# TYPE {ad} {tip}')
+            satirlar.extend(degerler)
+
+        def etiket(endpoint, **ek):
+            parcalar = [('endpoint', endpoint)] + list(ek.items())
+            return '{' + ','.join('{}="{}"'.format(ad, str(deger).replace('\\', '\\\\').replace('"', '\\"')) for ad, deger in parcalar) + '}'
+
+        sirali = sorted(kopyalar.items())
+        kova_satirlari = []
+        for endpoint, k in sirali:
+            for sinir, adet in zip(SURE_KOVALARI, k['kovalar']):
+                kova_satirlari.append(f'app_request_duration_seconds_bucket{etiket(endpoint, le=sinir)} {adet}')
+            kova_satirlari.append(f'app_request_duration_seconds_bucket{etiket(endpoint, le="+Inf")} {k["istek"]}')
+            kova_satirlari.append(f'app_request_duration_seconds_sum{etiket(endpoint)} {k["sure"]:.6f}')
+            kova_satirlari.append(f'app_request_duration_seconds_count{etiket(endpoint)} {k["istek"]}')
+        metrik('app_request_duration_seconds', 'histogram', 'İstek süresi', kova_satirlari)
+        metrik('app_request_errors_total', 'counter', '5xx yanıt sayısı', [f'app_request_errors_total{etiket(e)} {k["hata"]}' for e, k in sirali])
+        metrik('app_db_queries_total', 'counter', 'Çalıştırılan SQL ifadesi sayısı', [f'app_db_queries_total{etiket(e)} {k["sorgu"]}' for e, k in sirali])
+        metrik('app_db_seconds_total', 'counter', 'SQL ifadelerinde geçen süre', [f'app_db_seconds_total{etiket(e)} {k["db"]:.6f}' for e, k in sirali])
+        metrik('app_render_seconds_total', 'counter', 'Şablon render süresi', [f'app_render_seconds_total{etiket(e)} {k["render"]:.6f}' for e, k in sirali])
+        metrik('app_external_seconds_total', 'counter', 'Dış çağrılarda geçen süre', [f'app_external_seconds_total{etiket(e)} {k["dis"]:.6f}' for e, k in sirali])
+        metrik('app_slow_queries', 'gauge', 'Bellekte tutulan yavaş sorgu kaydı sayısı', [f'app_slow_queries {len(self.yavas_sorgular)}'])
+        return '\n'.join(satirlar) + '\n'
+
+    def sifirla(self):
+        with self._lock:
+            self._endpointler.clear()
+        self.yavas_sorgular.clear()
@@ -27,6 +27,8 @@ class Gunluk(db.Model):
     tur = db.Column(db.String(20), nullable=False) # 'GUNLUK' veya 'YILLIK'
     duygu = db.Column(db.String(50)) # 'harika', 'iyi', 'orta', 'kotu'
 
+db.Index('ix_gunluk_tur_tarih', Gunluk.tur, Gunluk.tarih)
+
 class Varlik(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     tur = db.Column(db.String(100), nullable=False)
@@ -48,7 +50,7 @@ class YolHaritasi(db.Model):
     tip = db.Column(db.String(50)) # 'Egitim' veya 'Deneyim'
     tarih_araligi = db.Column(db.String(100))
     logo_url = db.Column(db.String(255))
-    order_index = db.Column(db.Integer, default=0)
+    order_index = db.Column(db.Integer, default=0, index=True)
     start_date = db.Column(db.String(50))
     end_date = db.Column(db.String(50))
     is_active = db.Column(db.Boolean, default=False)
@@ -78,7 +80,7 @@ class Kitap(db.Model):
     kitap_adi = db.Column(db.String(200), nullable=False)
     yazar = db.Column(db.String(150))
     sayfa_sayisi = db.Column(db.Integer)
-    okunma_tarihi = db.Column(db.DateTime)
+    okunma_tarihi = db.Column(db.DateTime, index=True)
 
 class Plan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -97,7 +99,7 @@ class Fikir(db.Model):
 
 class FinansIslem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    tarih = db.Column(db.DateTime, default=datetime.utcnow)
+    tarih = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     islem_turu = db.Column(db.String(50), nullable=False) # 'GELIR', 'GIDER', 'VARLIK_ALIM', 'VARLIK_SATIM'
     kategori = db.Column(db.String(50), nullable=False) # 'NAKIT', 'ALTIN', 'GUMUS', 'DOVIZ', 'DIJITAL'
     tutar_tl = db.Column(db.Float, nullable=False)
@@ -109,6 +111,27 @@ class FinansIslem(db.Model):
     doviz_turu = db.Column(db.String(20)) # 'USD', 'EUR', 'ALTIN', 'GUMUS', 'KRIPTO'
     aciklama = db.Column(db.String(255))
 
+class VarlikBakiye(db.Model):
+    # FinansIslem defterinden türetilen güncel bakiyeler (ledger.py tarafından güncel tutulur)
+    doviz_turu = db.Column(db.String(20), primary_key=True) # 'NAKIT', 'ALTIN', 'GUMUS', 'USD', 'EUR'
+    toplam = db.Column(db.Float, nullable=False, default=0.0)
+    fiziksel = db.Column(db.Float, nullable=False, default=0.0)
+    banka = db.Column(db.Float, nullable=False, default=0.0)
+
+class FinansAylikOzet(db.Model):
+    # Kapanmış aylar için kalıcı toplamlar (finance_stats.py). İçinde bulunulan ay her seferinde SQL'den hesaplanır.
+    ay = db.Column(db.String(7), primary_key=True) # 'YYYY-MM'
+    islem_turu = db.Column(db.String(50), primary_key=True)
+    kategori = db.Column(db.String(50), primary_key=True)
+    tutar_tl = db.Column(db.Float, nullable=False, default=0.0)
+    miktar = db.Column(db.Float, nullable=False, default=0.0)
+    adet = db.Column(db.Integer, nullable=False, default=0)
+
+class FinansOzetDurum(db.Model):
+    # Tek satır: FinansAylikOzet'te hangi aya kadar (dahil) kapanmış ayların hazır olduğu
+    id = db.Column(db.Integer, primary_key=True)
+    kapali_ay = db.Column(db.String(7))
+
 class Gorev(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     baslik = db.Column(db.String(200), nullable=False)
@@ -122,21 +145,35 @@ class Gorev(db.Model):
     saat = db.Column(db.String(10)) # '09:00', '14:30' vb.
     onemli_mi = db.Column(db.Boolean, default=False) # Günün "En Önemli 3 İşi"nden biri mi?
 
+db.Index('ix_gorev_son_tarih_kategori', Gorev.son_tarih, Gorev.kategori)
+db.Index('ix_gorev_onemli_mi_son_tarih', Gorev.onemli_mi, Gorev.son_tarih)
+db.Index('ix_gorev_kategori', Gorev.kategori)
+
 class Mesaj(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     gonderen_ad = db.Column(db.String(100), nullable=False)
     gonderen_email = db.Column(db.String(150), nullable=False)
     konu = db.Column(db.String(200))
     mesaj_icerigi = db.Column(db.Text, nullable=False)
-    tarih = db.Column(db.DateTime, default=datetime.utcnow)
-    okundu_mu = db.Column(db.Boolean, default=False)
+    tarih = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    okundu_mu = db.Column(db.Boolean, default=False, index=True)
 
 class Ziyaretci(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     ip_adresi = db.Column(db.String(50))
-    tarih = db.Column(db.DateTime, default=datetime.utcnow)
+    tarih = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     sayfa = db.Column(db.String(200))
 
+# Aynı IP günde bir kez sayılır; visitors.py INSERT OR IGNORE ile bu index'e dayanır
+db.Index('ux_ziyaretci_ip_gun', Ziyaretci.ip_adresi, db.func.date(Ziyaretci.tarih), unique=True)
+
+class ZiyaretOzet(db.Model):
+    # Günlük ziyaret özeti; ham Ziyaretci satırları saklama süresi dolunca buraya katlanıp silinir
+    gun = db.Column(db.Date, primary_key=True)
+    sayfa = db.Column(db.String(200), primary_key=True)
+    tekil_ziyaretci = db.Column(db.Integer, nullable=False, default=0)
+    goruntuleme = db.Column(db.Integer, nullable=False, default=0)
+
 class ProjeFikri(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     baslik = db.Column(db.String(200), nullable=False)
@@ -154,7 +191,7 @@ class ProjeFikri(db.Model):
 
 class ProjeGorev(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    proje_id = db.Column(db.Integer, db.ForeignKey('proje_fikri.id'), nullable=False)
+    proje_id = db.Column(db.Integer, db.ForeignKey('proje_fikri.id'), nullable=False, index=True)
     baslik = db.Column(db.String(200), nullable=False)
     faz = db.Column(db.String(100)) # Örn: "Faz 1", "Backend", "UI/UX"
     baslangic_tarihi = db.Column(db.DateTime)
@@ -166,12 +203,55 @@ class StudioProject(db.Model):
     name = db.Column(db.String(200), nullable=False)
     category = db.Column(db.String(100), nullable=False) # 'Web', 'Mobil', 'IoT', 'Masaüstü' vb.
     secure_data = db.Column(db.Text, default='') # Şifreler, API keyleri, notlar
-    olusturma_tarihi = db.Column(db.DateTime, default=datetime.utcnow)
+    olusturma_tarihi = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     work_logs = db.relationship('StudioWorkLog', backref=db.backref('proje', lazy=True), cascade='all, delete-orphan')
 
 class StudioWorkLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    proje_id = db.Column(db.Integer, db.ForeignKey('studio_project.id'), nullable=False)
+    proje_id = db.Column(db.Integer, db.ForeignKey('studio_project.id'), nullable=False, index=True)
     note = db.Column(db.Text, nullable=False)
     tarih = db.Column(db.DateTime, default=datetime.utcnow)
+
+class IcerikSurum(db.Model):
+    # Tablo başına değişiklik sayacı; her commit'te değişen tablolar için artar (versions.py)
+    tablo = db.Column(db.String(100), primary_key=True)
+    surum = db.Column(db.Integer, nullable=False, default=0)
+
+class Sayac(db.Model):
+    # Sık okunan sayımlar için tek satırlık sayaçlar (örn. 'okunmamis_mesaj')
+    ad = db.Column(db.String(50), primary_key=True)
+    deger = db.Column(db.Integer, nullable=False, default=0)
+
+class UploadBlob(db.Model):
+    # İçerik adresli yüklemenin (static/uploads/<ab>/<ozet>*) kaç kayıt tarafından kullanıldığı (uploads.py)
+    ozet = db.Column(db.String(64), primary_key=True)
+    ref_sayisi = db.Column(db.Integer, nullable=False, default=0)
+
+class OkumaOzet(db.Model):
+    # Kitap tablosundan türetilen okuma istatistikleri (reading_stats.py); tarihsiz kitaplar yil=0, ay=0, yazarsızlar yazar='' satırındadır
+    yil = db.Column(db.Integer, primary_key=True)
+    ay = db.Column(db.Integer, primary_key=True)
+    yazar = db.Column(db.String(150), primary_key=True)
+    kitap_sayisi = db.Column(db.Integer, nullable=False, default=0)
+    sayfa = db.Column(db.Integer, nullable=False, default=0)
+
+class KurGecmisi(db.Model):
+    # Kur kaynağından çekilen alış/satış noktaları (rate_history.py); eski noktalar seyreltilir.
+    # WITHOUT ROWID: satırlar (varlik, zaman) sırasıyla tek B-ağacında durur, aralık okuması ayrı index gerektirmez
+    __table_args__ = {'sqlite_with_rowid': False}
+    varlik = db.Column(db.String(10), primary_key=True) # 'ALTIN', 'GUMUS', 'USD', 'EUR'
+    zaman = db.Column(db.Integer, primary_key=True) # unix saniye (UTC)
+    alis = db.Column(db.Float, nullable=False)
+    satis = db.Column(db.Float)
+
+class NetServetGunluk(db.Model):
+    # Kapanmış günlerin gün sonu bakiyeleri ve o günün son kurlarıyla net servet (net_worth.py)
+    __table_args__ = {'sqlite_with_rowid': False}
+    gun = db.Column(db.Date, primary_key=True)
+    net_servet = db.Column(db.Float, nullable=False)
+    nakit = db.Column(db.Float, nullable=False, default=0.0)
+    altin = db.Column(db.Float, nullable=False, default=0.0)
+    gumus = db.Column(db.Float, nullable=False, default=0.0)
+    usd = db.Column(db.Float, nullable=False, default=0.0)
+    eur = db.Column(db.Float, nullable=False, default=0.0)
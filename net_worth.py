@@ -0,0 +1,141 @@
+import calendar
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, func, insert
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import FinansIslem, NetServetGunluk
+import ledger
+import rate_history
+
+# VARLIK_TURLERI -> NetServetGunluk kolonu
+KOLONLAR = {'NAKIT': 'nakit', 'ALTIN': 'altin', 'GUMUS': 'gumus', 'USD': 'usd', 'EUR': 'eur'}
+
+
+def gun_sonu(gun):
+    """Günün bittiği an (ertesi gün 00:00 UTC), unix saniye."""
+    return calendar.timegm((gun + timedelta(days=1)).timetuple())
+
+
+def degerle(bakiyeler, kurlar):
+    """{tur: miktar} bakiyelerini {varlık: alış} kurlarıyla TL'ye çevirir; kuru olmayan varlık 0 sayılır."""
+    return bakiyeler.get('NAKIT', 0.0) + sum(bakiyeler.get(tur, 0.0) * (kurlar.get(tur) or 0.0) for tur in ledger.VARLIK_TURLERI if tur != 'NAKIT')
+
+
+def _farklar(baslangic=None, bitis=None, gunluk=True):
+    """
+    {gün: {tur: bakiye farkı}} (gunluk=False ise tek anahtar None). Toplamlar doğrusal olduğundan
+    islem_etkileri SQL'de gruplanmış satırlara uygulanır; tarih filtresi index'li yarı açık aralıktır.
+    """
+    kolonlar = [FinansIslem.islem_turu, FinansIslem.doviz_turu, FinansIslem.kategori]
+    if gunluk:
+        kolonlar.insert(0, func.date(FinansIslem.tarih))
+    sorgu = select(*kolonlar, func.sum(FinansIslem.tutar_tl), func.coalesce(func.sum(FinansIslem.miktar), 0.0)).group_by(*kolonlar)
+    if baslangic is not None:
+        sorgu = sorgu.where(FinansIslem.tarih >= baslangic)
+    if bitis is not None:
+        sorgu = sorgu.where(FinansIslem.tarih < bitis)
+    farklar = {}
+    for satir in db.session.execute(sorgu):
+        gun = datetime.strptime(satir[0], '%Y-%m-%d').date() if gunluk and satir[0] else None
+        islem_turu, doviz_turu, kategori, tutar_tl, miktar = satir[-5:]
+        gun_farki = farklar.setdefault(gun, {})
+        for tur, d_toplam, _, _ in ledger.islem_etkileri(islem_turu, tutar_tl, miktar, doviz_turu, kategori, None):
+            gun_farki[tur] = gun_farki.get(tur, 0.0) + d_toplam
+    return farklar
+
+
+def kapali_gunleri_doldur(bugun=None):
+    """
+    Son anlık görüntüden dünün sonuna kadar eksik günleri yazar; yazılan gün sayısını döndürür.
+    Gün sonu bakiyeleri defterden, kurlar o günün son kur noktasından gelir. Kur geçmişinin
+    başladığı günden önceki günler değerlenemediği için yazılmaz.
+    """
+    bugun = bugun or datetime.utcnow().date()
+    son = db.session.execute(select(func.max(NetServetGunluk.gun))).scalar()
+    if son is not None and son >= bugun - timedelta(days=1):
+        return 0
+    bakiyeler = {tur: 0.0 for tur in ledger.VARLIK_TURLERI}
+    if son is None:
+        kurlar = rate_history.KurSerisi(bitis=gun_sonu(bugun - timedelta(days=1)), kova=86400)
+        ilk = kurlar.ilk()
+        if ilk is None:
+            return 0
+        baslangic = datetime.utcfromtimestamp(ilk).date()
+        if baslangic >= bugun:
+            return 0
+        for tur, fark in _farklar(bitis=datetime.combine(baslangic, datetime.min.time()), gunluk=False).get(None, {}).items():
+            bakiyeler[tur] += fark
+    else:
+        # Son anlık görüntünün bakiyelerinden devam: sadece aradaki günlerin işlemleri okunur
+        baslangic = son + timedelta(days=1)
+        kurlar = rate_history.KurSerisi(gun_sonu(son), gun_sonu(bugun - timedelta(days=1)), kova=86400)
+        onceki = db.session.get(NetServetGunluk, son)
+        bakiyeler.update((tur, getattr(onceki, kolon)) for tur, kolon in KOLONLAR.items())
+    ilk_an, son_an = datetime.combine(baslangic, datetime.min.time()), datetime.combine(bugun, datetime.min.time())
+    gunluk = _farklar(ilk_an, son_an)
+    satirlar = []
+    gun = baslangic
+    while gun < bugun:
+        for tur, fark in gunluk.get(gun, {}).items():
+            bakiyeler[tur] += fark
+        satir = {kolon: bakiyeler[tur] for tur, kolon in KOLONLAR.items()}
+        satir.update(gun=gun, net_servet=degerle(bakiyeler, kurlar.an(gun_sonu(gun))))
+        satirlar.append(satir)
+        gun += timedelta(days=1)
+    try:
+        db.session.execute(insert(NetServetGunluk), satirlar)
+        db.session.commit()
+    except IntegrityError:
+        # Başka bir worker aynı günleri aynı anda yazdı; onun sonucu geçerli
+        db.session.rollback()
+        return 0
+    return len(satirlar)
+
+
+def islem_degisti(tarih):
+    """
+    Kapanmış bir güne işlem eklendiğinde/silindiğinde o günden sonraki anlık görüntüleri siler; bir
+    sonraki okuma yeniden üretir. Çağıranın oturumunda, commit'ten önce çağrılmalıdır.
+    """
+    if tarih is None:
+        return
+    gunler_degisti({tarih.date()})
+
+
+def gunler_degisti(gunler):
+    """islem_degisti'nin toplu hali: en erken günden itibaren tek DELETE."""
+    if gunler:
+        db.session.execute(delete(NetServetGunluk).where(NetServetGunluk.gun >= min(gunler)))
+
+
+def seri(baslangic, bitis=None, kurlar=None, bugun=None, bakiyeler=None):
+    """
+    [{'gun', 'net_servet', 'bakiyeler'}]: kapanmış günler NetServetGunluk'tan tek aralık okumasıyla gelir.
+    kurlar (canlı) verilirse ve aralık bugünü kapsıyorsa bugünkü değer güncel bakiyelerle eklenir;
+    çağıran ledger.envanter()'i zaten okuduysa {tur: toplam} olarak bakiyeler ile verir.
+    """
+    bugun = bugun or datetime.utcnow().date()
+    kapali_gunleri_doldur(bugun)
+    sorgu = select(NetServetGunluk).where(NetServetGunluk.gun >= baslangic).order_by(NetServetGunluk.gun)
+    if bitis is not None:
+        sorgu = sorgu.where(NetServetGunluk.gun < bitis)
+    sonuc = [{'gun': o.gun.isoformat(), 'net_servet': o.net_servet, 'bakiyeler': {tur: getattr(o, kolon) for tur, kolon in KOLONLAR.items()}} for o in db.session.execute(sorgu).scalars()]
+    if kurlar is not None and baslangic <= bugun and (bitis is None or bitis > bugun):
+        if bakiyeler is None:
+            bakiyeler = {tur: degerler['toplam'] for tur, degerler in ledger.envanter().items()}
+        sonuc.append({'gun': bugun.isoformat(), 'net_servet': degerle(bakiyeler, kurlar), 'bakiyeler': bakiyeler})
+    return sonuc
+
+
+def cizgi(seri, genislik=600, yukseklik=120):
+    """Şablondaki SVG çizgi grafiği için 'x,y x,y ...' noktaları ve uç değerler; iki noktadan azsa None."""
+    if len(seri) < 2:
+        return None
+    degerler = [nokta['net_servet'] for nokta in seri]
+    en_dusuk, en_yuksek = min(degerler), max(degerler)
+    aralik = (en_yuksek - en_dusuk) or 1.0
+    adim = genislik / (len(degerler) - 1)
+    noktalar = ' '.join(f'{i * adim:.1f},{yukseklik - (deger - en_dusuk) / aralik * yukseklik:.1f}' for i, deger in enumerate(degerler))
+    return {'noktalar': noktalar, 'en_dusuk': en_dusuk, 'en_yuksek': en_yuksek, 'ilk': seri[0]['gun'], 'son': seri[-1]['gun'], 'genislik': genislik, 'yukseklik': yukseklik}
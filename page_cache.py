@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from flask import request, session, make_response, g
+from flask_login import current_user
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+import changes
+import versions
+
+
+class PageCache:
+    """
+    Anonim ziyaretçiler için render edilmiş HTML önbelleği.
+    Anahtar: endpoint + URL argümanları + query string. Sayfa, bağlı olduğu modellerin tablosunda
+    commit edilen bir değişiklik olunca düşürülür (changes.commit_sonrasi). Diğer worker'ların commit'leri
+    bu kancayı tetiklemez; bu yüzden kayıt, render'dan önce okunan icerik_surum değerleriyle saklanır ve
+    her isabette sürümler karşılaştırılır. ttl verilirse kayıt en fazla bu kadar saniye yaşar. Giriş yapmış
+    kullanıcılar ve bekleyen flash mesajı olan istekler önbelleği atlar. ETag/Last-Modified ile 304 döner.
+    """
+
+    def __init__(self, max_entries=512, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._kayitlar = {}
+        self._bagimlilar = {}
+        self._nesiller = {}
+        self.hit = 0
+        self.miss = 0
+        changes.commit_sonrasi(self.gecersiz_kil)
+
+    def gecersiz_kil(self, tablolar):
+        with self._lock:
+            for tablo in tablolar:
+                self._nesiller[tablo] = self._nesiller.get(tablo, 0) + 1
+                for anahtar in self._bagimlilar.pop(tablo, ()):
+                    self._kayitlar.pop(anahtar, None)
+
+    def temizle(self):
+        with self._lock:
+            for tablo in self._nesiller:
+                self._nesiller[tablo] += 1
+            self._kayitlar.clear()
+            self._bagimlilar.clear()
+
+    def _nesil(self, tablolar):
+        return tuple(self._nesiller.get(tablo, 0) for tablo in tablolar)
+
+    def _surumler(self, tablolar):
+        """
+        Bağlı tabloların sürümleri; ConditionalGet bu istekte okuduysa sorgu yapılmaz. Okunanlar g'ye yazılır,
+        view'daki ProfileCache de aynı sürümlerle doğrular. Okunamazsa None.
+        """
+        tumu = g.get('icerik_surumleri')
+        if tumu is None:
+            try:
+                tumu = g.icerik_surumleri = versions.surumler()
+            except OperationalError:
+                db.session.rollback()
+                return None
+        return tuple(tumu.get(tablo, 0) for tablo in tablolar)
+
+    def cached(self, *modeller):
+        tablolar = [model.__tablename__ for model in modeller]
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET' or '_flashes' in session or current_user.is_authenticated:
+                    return view(*args, **kwargs)
+                surum = self._surumler(tablolar)
+                if surum is None:
+                    return view(*args, **kwargs)
+                anahtar = (request.endpoint, tuple(sorted(kwargs.items())), request.query_string)
+                kayit = self._kayitlar.get(anahtar)
+                if kayit is not None and (kayit[4] != surum or (self.ttl is not None and time.time() - kayit[3] > self.ttl)):
+                    # Başka bir worker bağlı tablolardan birini değiştirdi ya da kayıt süresini doldurdu
+                    kayit = None
+                if kayit is None:
+                    self.miss += 1
+                    nesil = self._nesil(tablolar)
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    govde = response.get_data()
+                    # Sürüm render'dan önce okundu: render sırasında commit olursa sonraki istek yeniden üretir
+                    kayit = (govde, response.mimetype, hashlib.sha1(govde).hexdigest(), time.time(), surum)
+                    self._sakla(anahtar, kayit, tablolar, nesil)
+                else:
+                    self.hit += 1
+                govde, mimetype, etag, zaman, _ = kayit
+                response = make_response(govde)
+                response.mimetype = mimetype
+                response.set_etag(etag)
+                response.last_modified = zaman
+                response.cache_control.public = True
+                response.cache_control.no_cache = True
+                response.vary.add('Cookie')
+                return response.make_conditional(request)
+            wrapper.etag_tablolar = tablolar
+            return wrapper
+        return decorator
+
+    def _sakla(self, anahtar, kayit, tablolar, nesil):
+        with self._lock:
+            if nesil != self._nesil(tablolar):
+                # Render sırasında bir değişiklik commit edildi; eski içeriği saklama
+                return
+            if len(self._kayitlar) >= self.max_entries:
+                self._kayitlar.pop(next(iter(self._kayitlar)))
+            self._kayitlar[anahtar] = kayit
+            for tablo in tablolar:
+                self._bagimlilar.setdefault(tablo, set()).add(anahtar)
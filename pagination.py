@@ -0,0 +1,125 @@
+import base64
+import json
+import operator
+from collections import namedtuple
+from datetime import datetime
+
+from flask import abort, current_app, jsonify, render_template, request
+from sqlalchemy import Select, asc, desc, tuple_
+from sqlalchemy.engine import Row
+
+from extensions import db
+
+
+class GecersizImlec(ValueError):
+    pass
+
+
+# sonraki: bir sonraki sayfanın imleci; son sayfada None
+Sayfa = namedtuple('Sayfa', 'ogeler sonraki')
+
+
+def _kodla(deger):
+    return deger.isoformat() if isinstance(deger, datetime) else deger
+
+
+class Keyset:
+    """
+    (kolon, id) üzerinden imleç tabanlı sayfalama. OFFSET yerine son görülen satırın anahtarından sonrası
+    okunur; sayfa maliyeti kaçıncı sayfada olunduğundan bağımsızdır ve araya eklenen/silinen satırlar
+    sayfaları kaydırmaz. kolon None ise sadece id kullanılır.
+
+    SQLite'ta NULL'lar ASC'de başta, DESC'te sonda sıralanır. Satır değeri karşılaştırması NULL'ları dışarıda
+    bıraktığı için NULL kolonlu satırlar ayrı bir bölge olarak okunur: bölge sınırına gelen sayfa ikinci
+    sorguyla diğer bölgeden tamamlanır.
+    """
+
+    def __init__(self, kolon, kimlik, azalan=True):
+        self.kolon = kolon
+        self.kimlik = kimlik
+        self.azalan = azalan
+        self._sonra = operator.lt if azalan else operator.gt
+
+    def _sirala(self, sorgu):
+        yon = desc if self.azalan else asc
+        kolonlar = [self.kimlik] if self.kolon is None else [self.kolon, self.kimlik]
+        return sorgu.order_by(None).order_by(*[yon(kolon) for kolon in kolonlar])
+
+    def _anahtar(self, satir):
+        nesne = satir[0] if isinstance(satir, Row) else satir
+        kimlik = getattr(nesne, self.kimlik.key)
+        return [kimlik] if self.kolon is None else [_kodla(getattr(nesne, self.kolon.key)), kimlik]
+
+    def imlec(self, satir):
+        veri = json.dumps(self._anahtar(satir), separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(veri).decode().rstrip('=')
+
+    def coz(self, imlec):
+        try:
+            anahtar = json.loads(base64.urlsafe_b64decode(imlec + '=' * (-len(imlec) % 4)))
+            if not isinstance(anahtar, list) or len(anahtar) != (1 if self.kolon is None else 2) or not isinstance(anahtar[-1], int):
+                raise ValueError(anahtar)
+            if self.kolon is not None and isinstance(anahtar[0], str) and self.kolon.type.python_type is datetime:
+                anahtar[0] = datetime.fromisoformat(anahtar[0])
+        except (ValueError, TypeError, NotImplementedError) as e:
+            raise GecersizImlec(imlec) from e
+        return anahtar
+
+    def _kosullar(self, anahtar):
+        """İmleçten sonrası için sırayla okunacak bölgelerin WHERE koşulları."""
+        if self.kolon is None:
+            return [self._sonra(self.kimlik, anahtar[0])]
+        deger, kimlik = anahtar
+        if deger is None:
+            bolge = self.kolon.is_(None) & self._sonra(self.kimlik, kimlik)
+            # ASC'de NULL bölgesinden sonra dolu değerler gelir; DESC'te NULL'lar zaten sondadır
+            return [bolge] if self.azalan else [bolge, self.kolon.isnot(None)]
+        bolge = self._sonra(tuple_(self.kolon, self.kimlik), tuple_(deger, kimlik))
+        return [bolge, self.kolon.is_(None)] if self.azalan else [bolge]
+
+    def siralanmis(self, sorgu, anahtar=None):
+        """Bu anahtarla sıralanmış sorgu; anahtar verilirse imleçten sonraki ilk bölgeyle sınırlı (plan denetimi için)."""
+        sorgu = self._sirala(sorgu)
+        return sorgu if anahtar is None else sorgu.filter(self._kosullar(anahtar)[0])
+
+    def _calistir(self, sorgu, adet):
+        sorgu = sorgu.limit(adet)
+        return db.session.execute(sorgu).all() if isinstance(sorgu, Select) else sorgu.all()
+
+    def sayfa(self, sorgu, imlec=None, boyut=50):
+        """sorgu: Query ya da select(); mevcut sıralaması bu anahtarın sıralamasıyla değiştirilir."""
+        sorgu = self._sirala(sorgu)
+        if imlec is None:
+            satirlar = self._calistir(sorgu, boyut + 1)
+        else:
+            satirlar = []
+            for kosul in self._kosullar(self.coz(imlec)):
+                satirlar += self._calistir(sorgu.filter(kosul), boyut + 1 - len(satirlar))
+                if len(satirlar) > boyut:
+                    break
+        if len(satirlar) > boyut:
+            satirlar = satirlar[:boyut]
+            return Sayfa(satirlar, self.imlec(satirlar[-1]))
+        return Sayfa(satirlar, None)
+
+
+def istek_sayfasi(keyset, sorgu):
+    """İstekteki ?imlec= değerine göre sayfayı okur; bozuk imleç 400 döner."""
+    try:
+        return keyset.sayfa(sorgu, request.args.get('imlec') or None, current_app.config['ADMIN_PAGE_SIZE'])
+    except GecersizImlec:
+        abort(400, 'Geçersiz sayfa imleci.')
+
+
+def json_istegi():
+    return request.args.get('format') == 'json'
+
+
+def json_yaniti(sayfa, sablon, ad, **baglam):
+    """
+    Sonsuz kaydırma için sonraki sayfa: satırlar sayfanın ilk yüklemesindeki parça şablonuyla basılır.
+    ?adet= o ana kadar yüklenmiş satır sayısıdır (sıra numarası gösteren listeler için).
+    """
+    baglam[ad] = sayfa.ogeler
+    html = render_template(sablon, baslangic=request.args.get('adet', 0, type=int), **baglam)
+    return jsonify({'html': html, 'sonraki': sayfa.sonraki, 'adet': len(sayfa.ogeler)})
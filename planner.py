@@ -0,0 +1,66 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import or_
+
+from models import Gorev
+from queries import gunler_arasinda
+
+GUNLER = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar']
+# Takvim tek istekte en fazla bu kadar günlük aralık isteyebilir (ay görünümü ~6 hafta)
+TAKVIM_MAKS_GUN = 62
+
+
+def pencere_sorgusu(hafta_basla, hafta_sonu):
+    """Planner sayfasının ihtiyaç duyduğu tüm görevler: bu haftanın görevleri + yıllık hedefler."""
+    return Gorev.query.filter(or_(gunler_arasinda(Gorev.son_tarih, hafta_basla, hafta_sonu), Gorev.kategori == 'HEDEF'))
+
+
+def planlayici_verisi(bugun):
+    """
+    Tek index'li sorguyla gelen pencereyi bellekte günlük / önemli / haftalık / yıllık kovalara ayırır.
+    Maliyet bu haftanın görev sayısıyla sınırlıdır; geçmiş görevler okunmaz (takvim onları takvim_olaylari ile ister).
+    """
+    hafta_basla = bugun - timedelta(days=bugun.weekday())
+    hafta_sonu = hafta_basla + timedelta(days=6)
+    gunluk_plan, gunun_onemlileri, yillik_hedefler = [], [], []
+    haftalik_plan = {gun: [] for gun in GUNLER}
+    for gorev in pencere_sorgusu(hafta_basla, hafta_sonu).order_by(Gorev.id).all():
+        gun = gorev.son_tarih.date() if gorev.son_tarih else None
+        if gorev.kategori == 'HEDEF':
+            yillik_hedefler.append(gorev)
+        if gun is None or not hafta_basla <= gun <= hafta_sonu:
+            continue
+        haftalik_plan[GUNLER[gun.weekday()]].append(gorev)
+        if gun == bugun:
+            if gorev.kategori == 'GOREV':
+                gunluk_plan.append(gorev)
+            if gorev.onemli_mi:
+                gunun_onemlileri.append(gorev)
+    # ORDER BY saat ile aynı: saati olmayanlar önce
+    gunluk_plan.sort(key=lambda g: (g.saat is not None, g.saat or ''))
+    return dict(gunluk_plan=gunluk_plan, gunun_onemlileri=gunun_onemlileri, haftalik_plan=haftalik_plan, yillik_hedefler=yillik_hedefler)
+
+
+def _gun(deger):
+    # FullCalendar '2025-01-01T00:00:00+03:00' gönderir; sadece tarih kısmı kullanılır
+    return datetime.strptime(deger[:10], '%Y-%m-%d').date()
+
+
+def takvim_olaylari(baslangic, bitis):
+    """Takvimin görünen [baslangic, bitis) aralığındaki görevler, FullCalendar olay formatında."""
+    ilk, son = _gun(baslangic), _gun(bitis) - timedelta(days=1)
+    if son < ilk:
+        return []
+    son = min(son, ilk + timedelta(days=TAKVIM_MAKS_GUN))
+    olaylar = []
+    for gorev in Gorev.query.filter(gunler_arasinda(Gorev.son_tarih, ilk, son)).order_by(Gorev.son_tarih).all():
+        if gorev.durum == 'BITTI':
+            renk = '#10b981'
+        elif gorev.oncelik == 'YUKSEK':
+            renk = '#ef4444'
+        elif gorev.oncelik == 'NORMAL':
+            renk = '#eab308'
+        else:
+            renk = '#3b82f6'
+        olaylar.append({'id': gorev.id, 'title': gorev.baslik, 'start': gorev.son_tarih.strftime('%Y-%m-%d'), 'color': renk})
+    return olaylar
@@ -0,0 +1,206 @@
+import threading
+from array import array
+from datetime import datetime
+
+from sqlalchemy import select, func, text
+
+from extensions import db
+from models import FinansIslem, IcerikSurum
+import ledger
+
+ISLEM_TURLERI = ('VARLIK_ALIM', 'VARLIK_SATIM')
+YONTEMLER = ('fifo', 'ortalama')
+PARTI = 10000
+# Tüketilmiş lotlar dizinin başından bu sayıyı ve dizinin yarısını aşınca silinir
+SIKISTIR = 1024
+
+# schema.py'deki kısmi index (ix_finans_islem_varlik) bu koşulla birebir aynı olmalı; bağlı parametreli
+# IN (?, ?) kısmi index'i kullanamaz, koşul bu yüzden sabit metindir
+VARLIK_KOSULU = "islem_turu IN ('VARLIK_ALIM', 'VARLIK_SATIM')"
+VARLIK_ISLEMI = text(VARLIK_KOSULU)
+
+
+class Havuz:
+    """
+    Bir varlığın tek bir konumdaki (fiziksel ya da belirli bir banka) pozisyonu. FIFO lotları iki paralel
+    array('d') kolonunda tutulur (miktar, birim maliyet); satışlar baştan tüketir. Ortalama maliyet aynı
+    geçişte ayrıca izlenir, böylece iki yöntem de tek oynatmadan çıkar.
+    """
+    __slots__ = ('miktar', 'fifo_maliyet', 'ort_maliyet', 'fifo_gerceklesen', 'ort_gerceklesen', 'eksik', 'lot_miktar', 'lot_birim', 'bas')
+
+    def __init__(self):
+        self.miktar = self.fifo_maliyet = self.ort_maliyet = 0.0
+        self.fifo_gerceklesen = self.ort_gerceklesen = self.eksik = 0.0
+        self.lot_miktar = array('d')
+        self.lot_birim = array('d')
+        self.bas = 0
+
+    def al(self, miktar, tutar):
+        self.miktar += miktar
+        self.fifo_maliyet += tutar
+        self.ort_maliyet += tutar
+        self.lot_miktar.append(miktar)
+        self.lot_birim.append(tutar / miktar)
+
+    def sat(self, miktar, tutar):
+        """Eldekinden fazlası satılırsa aşan kısım maliyetsiz sayılır ve eksik'e yazılır (alımı kaydedilmemiş varlık)."""
+        karsilanan = min(miktar, self.miktar)
+        if miktar - karsilanan > ledger.TOLERANS:
+            self.eksik += miktar - karsilanan
+        ort = self.ort_maliyet * karsilanan / self.miktar if self.miktar > 0 else 0.0
+        fifo = 0.0
+        kalan = karsilanan
+        lot_miktar, lot_birim, i, n = self.lot_miktar, self.lot_birim, self.bas, len(self.lot_miktar)
+        while kalan > ledger.TOLERANS and i < n:
+            alinan = lot_miktar[i] if lot_miktar[i] <= kalan else kalan
+            fifo += alinan * lot_birim[i]
+            kalan -= alinan
+            lot_miktar[i] -= alinan
+            if lot_miktar[i] <= ledger.TOLERANS:
+                i += 1
+        self.bas = i
+        self.miktar -= karsilanan
+        self.fifo_gerceklesen += tutar - fifo
+        self.ort_gerceklesen += tutar - ort
+        if self.miktar <= ledger.TOLERANS:
+            # Pozisyon kapandı: kayan nokta artıklarını sıfırla
+            self.miktar = self.fifo_maliyet = self.ort_maliyet = 0.0
+            del lot_miktar[:], lot_birim[:]
+            self.bas = 0
+            return
+        self.fifo_maliyet -= fifo
+        self.ort_maliyet -= ort
+        if i > SIKISTIR and i * 2 > n:
+            del lot_miktar[:i], lot_birim[:i]
+            self.bas = 0
+
+    def satir(self, yontem):
+        maliyet = self.fifo_maliyet if yontem == 'fifo' else self.ort_maliyet
+        gerceklesen = self.fifo_gerceklesen if yontem == 'fifo' else self.ort_gerceklesen
+        return {'miktar': self.miktar, 'maliyet': maliyet, 'gerceklesen': gerceklesen, 'eksik': self.eksik}
+
+
+def havuz_anahtari(doviz_turu, kategori, varlik_konumu, banka_adi):
+    """(tur, konum, banka) ya da varlık dışı satırlar için None; tür/konum kuralı ledger.islem_etkileri ile aynıdır."""
+    tur = doviz_turu or kategori
+    if tur not in ledger.VARLIK_TURLERI or tur == 'NAKIT':
+        return None
+    if varlik_konumu == 'BANKA':
+        return (tur, 'BANKA', banka_adi or '')
+    return (tur, 'FIZIKSEL', '')
+
+
+def _sorgu():
+    # (tarih, id) sırası kısmi index'ten okunur; satırlar ORM nesnesi değil demet olarak gelir
+    return select(FinansIslem.id, FinansIslem.tarih, FinansIslem.islem_turu, FinansIslem.miktar, FinansIslem.tutar_tl, FinansIslem.doviz_turu, FinansIslem.kategori, FinansIslem.varlik_konumu, FinansIslem.banka_adi).where(VARLIK_ISLEMI).order_by(FinansIslem.tarih, FinansIslem.id)
+
+
+def _sira(satir):
+    return (satir[1] or datetime.min, satir[0])
+
+
+def _surum():
+    return db.session.execute(select(IcerikSurum.surum).where(IcerikSurum.tablo == FinansIslem.__tablename__)).scalar()
+
+
+def _ekle(sonuc, satir, kur):
+    for alan in ('miktar', 'maliyet', 'gerceklesen', 'eksik'):
+        sonuc[alan] += satir[alan]
+    sonuc['deger'] += satir['deger']
+    if satir['gerceklesmemis'] is None or sonuc['gerceklesmemis'] is None:
+        sonuc['gerceklesmemis'] = None
+    else:
+        sonuc['gerceklesmemis'] += satir['gerceklesmemis']
+
+
+class Portfolio:
+    """
+    Varlık işlemlerinden maliyet esası (FIFO ve ortalama) ile gerçekleşen / gerçekleşmemiş kâr-zarar.
+    Durum bellekte tutulur ve defter (tarih, id) sırasıyla oynatılarak kurulur. Sonraki okumalarda
+    finans_islem'in icerik_surum değeri değişmemişse sorgu yapılmaz; değiştiyse yalnız son işlenen
+    satırdan sonra eklenenler uygulanır. Silme, geriye tarihli ekleme ya da son satırın değişmesi
+    tam yeniden kurulum gerektirir. Diğer worker'ların commit'leri de sürüm üzerinden görülür.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._havuzlar = None
+        self._surum = None
+        self._adet = 0
+        self._son = None # (tarih, id): oynatılan en geç satır
+        self._son_satir = None # en büyük id'li satır; yerinde değişip değişmediği buna bakılarak anlaşılır
+
+    def _uygula(self, satirlar):
+        havuzlar = self._havuzlar
+        for satir in satirlar:
+            id_, tarih, islem_turu, miktar, tutar_tl, doviz_turu, kategori, varlik_konumu, banka_adi = satir
+            anahtar = havuz_anahtari(doviz_turu, kategori, varlik_konumu, banka_adi)
+            self._adet += 1
+            if self._son is None or _sira(satir) > self._son:
+                self._son = _sira(satir)
+            if self._son_satir is None or id_ > self._son_satir[0]:
+                self._son_satir = tuple(satir)
+            if anahtar is None or not miktar or miktar <= 0:
+                continue
+            havuz = havuzlar.get(anahtar)
+            if havuz is None:
+                havuz = havuzlar[anahtar] = Havuz()
+            if islem_turu == 'VARLIK_ALIM':
+                havuz.al(miktar, tutar_tl or 0.0)
+            else:
+                havuz.sat(miktar, tutar_tl or 0.0)
+
+    def yeniden_olustur(self):
+        with self._lock:
+            self._yeniden_olustur(_surum())
+
+    def _yeniden_olustur(self, surum):
+        self._havuzlar, self._adet, self._son, self._son_satir = {}, 0, None, None
+        self._uygula(db.session.execute(_sorgu().execution_options(yield_per=PARTI)))
+        self._surum = surum
+
+    def guncelle(self):
+        """Bellekteki durumu deftere yetiştirir; değişiklik yoksa tek satırlık sürüm sorgusudur."""
+        with self._lock:
+            # Sürüm veriden önce okunur: arada commit olursa bir sonraki çağrı yeniden bakar
+            surum = _surum()
+            if self._havuzlar is not None and surum == self._surum:
+                return
+            if self._havuzlar is None or self._son_satir is None:
+                self._yeniden_olustur(surum)
+                return
+            adet = db.session.execute(select(func.count()).select_from(FinansIslem).where(VARLIK_ISLEMI)).scalar()
+            satirlar = db.session.execute(_sorgu().where(FinansIslem.id >= self._son_satir[0])).all()
+            eski = [satir for satir in satirlar if satir[0] == self._son_satir[0]]
+            yeniler = [satir for satir in satirlar if satir[0] > self._son_satir[0]]
+            if eski and tuple(eski[0]) == self._son_satir and adet == self._adet + len(yeniler) and (not yeniler or _sira(yeniler[0]) > self._son):
+                self._uygula(yeniler)
+                self._surum = surum
+            else:
+                self._yeniden_olustur(surum)
+
+    def ozet(self, kurlar, yontem='fifo'):
+        """
+        {'yontem', 'havuzlar': [...], 'varliklar': {tur: {...}}, 'toplam': {...}}. Her satırda miktar,
+        maliyet (eldekilerin maliyet esası), birim_maliyet, gerceklesen, deger (miktar * kur), gerceklesmemis
+        (deger - maliyet; kur yoksa None) ve eksik (alımı kaydedilmemiş satılan miktar) bulunur.
+        """
+        self.guncelle()
+        with self._lock:
+            havuzlar = [(anahtar, havuz.satir(yontem)) for anahtar, havuz in sorted(self._havuzlar.items())]
+        sonuc = {'yontem': yontem, 'havuzlar': [], 'varliklar': {}, 'toplam': dict.fromkeys(('maliyet', 'gerceklesen', 'deger', 'gerceklesmemis', 'miktar', 'eksik'), 0.0)}
+        for (tur, konum, banka), satir in havuzlar:
+            kur = kurlar.get(tur) or 0.0
+            satir.update(tur=tur, konum=konum, banka=banka or None, deger=satir['miktar'] * kur, gerceklesmemis=satir['miktar'] * kur - satir['maliyet'] if kur > 0 else None)
+            satir['birim_maliyet'] = satir['maliyet'] / satir['miktar'] if satir['miktar'] > 0 else None
+            sonuc['havuzlar'].append(satir)
+            varlik = sonuc['varliklar'].get(tur)
+            if varlik is None:
+                varlik = sonuc['varliklar'][tur] = dict.fromkeys(('miktar', 'maliyet', 'gerceklesen', 'deger', 'gerceklesmemis', 'eksik'), 0.0)
+            _ekle(varlik, satir, kur)
+            _ekle(sonuc['toplam'], satir, kur)
+        for varlik in sonuc['varliklar'].values():
+            varlik['birim_maliyet'] = varlik['maliyet'] / varlik['miktar'] if varlik['miktar'] > 0 else None
+        # Farklı birimlerin (gram, dolar) toplam miktarı anlamsız
+        del sonuc['toplam']['miktar']
+        return sonuc
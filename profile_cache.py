@@ -0,0 +1,90 @@
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_login import UserMixin
+
+from models import Kullanici
+import changes
+
+# Önbellekte tutulmayan alanlar
+GIZLI_ALANLAR = {'sifre'}
+
+
+class KullaniciProfili(UserMixin):
+    """Kullanici satırının oturumdan bağımsız, değiştirilemez kopyası (şablonlar ve current_user için)."""
+
+    def __init__(self, kullanici):
+        for kolon in Kullanici.__table__.columns:
+            if kolon.name not in GIZLI_ALANLAR:
+                object.__setattr__(self, kolon.name, getattr(kullanici, kolon.name))
+
+    def __setattr__(self, ad, deger):
+        raise AttributeError('KullaniciProfili salt okunurdur; değişiklik için Kullanici modelini kullanın')
+
+
+def _istek_surumu():
+    """Bu istekte ConditionalGet / PageCache'in okuduğu kullanici içerik sürümü; okunmadıysa None."""
+    if not has_app_context():
+        return None
+    surumler = g.get('icerik_surumleri')
+    return None if surumler is None else surumler.get('kullanici', 0)
+
+
+class ProfileCache:
+    """
+    Tek sahipli site için admin satırının süreç içi önbelleği.
+    Bu süreçte kullanici tablosuna yapılan commit'ler önbelleği hemen düşürür. Diğer worker'ların
+    commit'leri kopyayla birlikte saklanan kullanici içerik sürümünden anlaşılır: istekte versions.py'nin
+    okuduğu sürüm farklıysa satır yeniden okunur. Sürümün okunmadığı isteklerde (POST, etag_yok) kopya
+    en geç ttl saniye yaşar.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._profil = None
+        self._zaman = 0.0
+        self._surum = None
+        # yenile() her çağrıda artırır; okuma sırasında düşürülen önbelleğe eski satır yazılmasın
+        self._nesil = 0
+        self.hit = 0
+        self.sorgu = 0
+        changes.commit_sonrasi(self._degisti)
+
+    def _degisti(self, tablolar):
+        if 'kullanici' in tablolar:
+            self.yenile()
+
+    def yenile(self):
+        with self._lock:
+            self._nesil += 1
+            self._profil = None
+
+    def admin(self):
+        with self._lock:
+            profil, zaman, surum = self._profil, self._zaman, self._surum
+        guncel = _istek_surumu()
+        if profil is not None and time.time() - zaman < self.ttl and (guncel is None or guncel == surum):
+            self.hit += 1
+            return profil
+        self.sorgu += 1
+        nesil = self._nesil
+        kullanici = Kullanici.query.first()
+        profil = KullaniciProfili(kullanici) if kullanici else None
+        with self._lock:
+            if nesil == self._nesil:
+                self._profil, self._zaman, self._surum = profil, time.time(), guncel
+        return profil
+
+    def kullanici(self, kullanici_id):
+        """load_user için: admin ise önbellekten, değilse veritabanından (önbelleğe alınmadan)."""
+        profil = self.admin()
+        if profil is not None and profil.id == kullanici_id:
+            return profil
+        self.sorgu += 1
+        kullanici = Kullanici.query.get(kullanici_id)
+        return KullaniciProfili(kullanici) if kullanici else None
+
+    def istatistik(self):
+        return {'hit': self.hit, 'sorgu': self.sorgu}
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import selectinload
+
+from extensions import db
+from models import Gorev, Gunluk, Kitap, Mesaj, Ziyaretci, FinansIslem, ProjeFikri, ProjeGorev, StudioProject, StudioWorkLog, YolHaritasi, Proje, Yetenek
+from pagination import Keyset
+
+
+def gun_araligi(gun):
+    """Bir günü yarı açık [00:00, ertesi gün 00:00) datetime aralığına çevirir."""
+    baslangic = datetime.combine(gun, datetime.min.time())
+    return baslangic, baslangic + timedelta(days=1)
+
+
+def gunde(kolon, gun):
+    # func.date(kolon) == gun yerine: index kullanabilen aralık karşılaştırması
+    baslangic, bitis = gun_araligi(gun)
+    return and_(kolon >= baslangic, kolon < bitis)
+
+
+def gunler_arasinda(kolon, ilk_gun, son_gun):
+    """ilk_gun ve son_gun dahil."""
+    return and_(kolon >= gun_araligi(ilk_gun)[0], kolon < gun_araligi(son_gun)[1])
+
+
+def yilda(kolon, yil):
+    return and_(kolon >= datetime(yil, 1, 1), kolon < datetime(yil + 1, 1, 1))
+
+
+# Sıcak sorgular: view'lar bunları kullanır, check-indexes komutu da aynı sorguların planını denetler.
+
+# Admin listelerinin sayfalama anahtarları; her biri (kolon, id) sırasını okuyabilen bir index'e dayanır
+GUNLUK_SIRASI = Keyset(Gunluk.tarih, Gunluk.id)
+MESAJ_SIRASI = Keyset(Mesaj.tarih, Mesaj.id)
+KITAP_SIRASI = Keyset(Kitap.okunma_tarihi, Kitap.id)
+STUDIO_SIRASI = Keyset(StudioProject.olusturma_tarihi, StudioProject.id)
+YOL_HARITASI_SIRASI = Keyset(YolHaritasi.order_index, YolHaritasi.id, azalan=False)
+PROJE_SIRASI = Keyset(None, Proje.id, azalan=False)
+YETENEK_SIRASI = Keyset(None, Yetenek.id, azalan=False)
+
+def gunlukler(tur):
+    return Gunluk.query.filter_by(tur=tur).order_by(Gunluk.tarih.desc())
+
+
+def yilin_kitaplari(yil):
+    return Kitap.query.filter(yilda(Kitap.okunma_tarihi, yil)).order_by(Kitap.okunma_tarihi.desc())
+
+
+def kitaplar(yil=None):
+    return yilin_kitaplari(yil) if yil else Kitap.query.order_by(Kitap.okunma_tarihi.desc())
+
+
+def gelen_kutusu():
+    return Mesaj.query.order_by(Mesaj.tarih.desc())
+
+
+def okunmamis_mesajlar():
+    return Mesaj.query.filter_by(okundu_mu=False)
+
+
+def gunun_ziyaretcileri(gun):
+    return Ziyaretci.query.filter(gunde(Ziyaretci.tarih, gun))
+
+
+def son_finans_islemleri(adet=20):
+    return FinansIslem.query.order_by(FinansIslem.tarih.desc()).limit(adet)
+
+
+def aktif_projeler():
+    # Proje başına lazy load (N+1) yerine tüm görevler tek IN (...) sorgusuyla
+    return ProjeFikri.query.filter_by(durum='AKTIF').options(selectinload(ProjeFikri.gorevler)).order_by(ProjeFikri.baslangic_tarihi.desc())
+
+
+def studio_projeleri():
+    """(StudioProject, not_sayisi) satırları veren select; notlar yüklenmez, sayı ilişkili alt sorgudan gelir."""
+    not_sayisi = select(func.count()).where(StudioWorkLog.proje_id == StudioProject.id).correlate(StudioProject).scalar_subquery()
+    return select(StudioProject, not_sayisi).order_by(StudioProject.olusturma_tarihi.desc())
+
+
+def kontrol_edilecek_sorgular():
+    import planner
+    bugun = datetime.utcnow().date()
+    hafta_basla = bugun - timedelta(days=bugun.weekday())
+    return [
+        ('planner: hafta + hedefler', planner.pencere_sorgusu(hafta_basla, hafta_basla + timedelta(days=6))),
+        ('planner: takvim aralığı', Gorev.query.filter(gunler_arasinda(Gorev.son_tarih, hafta_basla, hafta_basla + timedelta(days=41))).order_by(Gorev.son_tarih)),
+        ('diaries: günlükler', gunlukler('GUNLUK')),
+        ('books: yıla göre', yilin_kitaplari(bugun.year)),
+        ('inbox: tarih sırası', gelen_kutusu()),
+        ('inbox: okunmamış sayısı', okunmamis_mesajlar().with_entities(Mesaj.id)),
+        ('visitors: gün aralığı', gunun_ziyaretcileri(bugun)),
+        ('finance: son işlemler', son_finans_islemleri()),
+        ('ideas: proje görevleri', ProjeGorev.query.filter(ProjeGorev.proje_id.in_([1, 2]))),
+        ('studio: not sayısı', StudioWorkLog.query.filter_by(proje_id=1).with_entities(func.count())),
+        ('diaries: sonraki sayfa', GUNLUK_SIRASI.siralanmis(gunlukler('GUNLUK'), [bugun, 1])),
+        ('inbox: sonraki sayfa', MESAJ_SIRASI.siralanmis(gelen_kutusu(), [bugun, 1])),
+        ('books: sonraki sayfa', KITAP_SIRASI.siralanmis(kitaplar(), [bugun, 1])),
+        ('studio: sonraki sayfa', STUDIO_SIRASI.siralanmis(StudioProject.query, [bugun, 1])),
+        ('resume: sonraki sayfa', YOL_HARITASI_SIRASI.siralanmis(YolHaritasi.query, [1, 1])),
+    ]
+
+
+def sorgu_plani(sorgu):
+    """EXPLAIN QUERY PLAN satırlarının detay metinleri. Plan parametre değerine bağlı olmadığından NULL bağlanır."""
+    derlenmis = sorgu.statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    parametreler = tuple(None for _ in (derlenmis.positiontup or ()))
+    satirlar = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + str(derlenmis), parametreler).all()
+    return [satir[-1] for satir in satirlar]
+
+
+def tam_tarama_var(plan):
+    # 'SCAN gorev' tam tablo taramasıdır; 'SCAN gorev USING INDEX ...' index üzerinden sıralı okumadır
+    return any(adim.startswith('SCAN ') and 'INDEX' not in adim for adim in plan)
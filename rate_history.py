@@ -0,0 +1,93 @@
+import logging
+import time
+from bisect import bisect_left
+
+from sqlalchemy import func, insert, select, text
+
+from extensions import db
+from models import KurGecmisi
+
+logger = logging.getLogger(__name__)
+
+# Bir katmanın yaş sınırından eski noktalarından, (varlık, zaman / kova) başına sadece en sonuncusu kalır:
+# aynı kovada kendisinden sonra nokta olan silinir. Alt sorgu birincil anahtarda kova sonuyla sınırlı bir
+# aralık okumasıdır, tablo boyutuyla doğrusal çalışır.
+SEYRELT = text(
+    'DELETE FROM kur_gecmisi WHERE zaman < :sinir AND EXISTS ('
+    'SELECT 1 FROM kur_gecmisi AS sonraki WHERE sonraki.varlik = kur_gecmisi.varlik '
+    'AND sonraki.zaman > kur_gecmisi.zaman AND sonraki.zaman < MIN(:sinir, (kur_gecmisi.zaman / :kova + 1) * :kova))')
+
+
+def kaydet(quotes, zaman):
+    """RateService.on_fetch dinleyicisi: {varlık: (alış, satış)} değerlerini tek executemany ile yazar."""
+    satirlar = [{'varlik': varlik, 'zaman': int(zaman), 'alis': alis, 'satis': satis} for varlik, (alis, satis) in quotes.items() if alis and alis > 0]
+    if not satirlar:
+        return 0
+    try:
+        # Aynı saniyede iki worker aynı kuru yazarsa ilki kalır
+        db.session.execute(insert(KurGecmisi).prefix_with('OR IGNORE'), satirlar)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception('%d kur noktası yazılamadı', len(satirlar))
+        return 0
+    return len(satirlar)
+
+
+def seyrelt(katmanlar, simdi=None):
+    """
+    katmanlar: [(gün, kova saniyesi)]; her katmanda o günden eski noktalar kova başına bire (kovanın
+    son kuru) indirilir. Silinen nokta sayısını döndürür.
+    """
+    simdi = simdi or time.time()
+    silinen = 0
+    for gun, kova in sorted(katmanlar):
+        silinen += db.session.execute(SEYRELT, {'sinir': int(simdi - gun * 86400), 'kova': kova}).rowcount
+    db.session.commit()
+    return silinen
+
+
+class KurSerisi:
+    """
+    Varlık başına zaman sıralı (zaman, alış) dizileri; an(t) t'den önceki son kuru bisect ile bulur.
+    [baslangic, bitis) aralığı birincil anahtardan aralık okumasıyla yüklenir. kova verilirse SQL'de
+    kova başına son nokta seçilir: kova sınırına denk gelen t'ler (gün sonları) için sonuç aynıdır.
+    """
+
+    def __init__(self, baslangic=None, bitis=None, kova=None):
+        self._zamanlar, self._alislar = {}, {}
+        satirlar = []
+        if baslangic is not None:
+            # baslangic anındaki kur için her varlığın ondan önceki son noktası; SQLite'ta MAX() ile seçilen
+            # satırın diğer kolonları o satırdan gelir
+            satirlar.extend(db.session.execute(select(KurGecmisi.varlik, func.max(KurGecmisi.zaman), KurGecmisi.alis).where(KurGecmisi.zaman < baslangic).group_by(KurGecmisi.varlik)).all())
+        if kova:
+            # MAX() ile seçilen satırın alış değeri (yukarıdaki gibi)
+            sorgu = select(KurGecmisi.varlik, func.max(KurGecmisi.zaman), KurGecmisi.alis).group_by(KurGecmisi.varlik, KurGecmisi.zaman / kova)
+        else:
+            sorgu = select(KurGecmisi.varlik, KurGecmisi.zaman, KurGecmisi.alis)
+        if baslangic is not None:
+            sorgu = sorgu.where(KurGecmisi.zaman >= baslangic)
+        if bitis is not None:
+            sorgu = sorgu.where(KurGecmisi.zaman < bitis)
+        satirlar.extend(db.session.execute(sorgu).all())
+        satirlar.sort()
+        for varlik, zaman, alis in satirlar:
+            self._zamanlar.setdefault(varlik, []).append(zaman)
+            self._alislar.setdefault(varlik, []).append(alis)
+
+    def ilk(self):
+        """Tüm varlıkların kuru bilinen ilk an; geçmiş boşsa None."""
+        if not self._zamanlar:
+            return None
+        return max(zamanlar[0] for zamanlar in self._zamanlar.values())
+
+    def an(self, zaman):
+        """{varlık: alış}: zaman'dan (hariç) önceki son nokta; o ana kadar noktası olmayan varlık yer almaz."""
+        kurlar = {}
+        for varlik, zamanlar in self._zamanlar.items():
+            i = bisect_left(zamanlar, zaman)
+            if i:
+                kurlar[varlik] = self._alislar[varlik][i - 1]
+        return kurlar
+
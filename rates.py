@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+VARLIKLAR = ('ALTIN', 'GUMUS', 'USD', 'EUR')
+
+
+def bos_kurlar():
+    return {varlik: 0.0 for varlik in VARLIKLAR}
+
+
+class RateProvider:
+    """
+    Kur kaynağı arayüzü: fetch() {varlık: alış fiyatı} döndürür, hata durumunda exception fırlatır.
+    fetch_quotes() {varlık: (alış, satış)} döndürür; satış fiyatı vermeyen kaynaklarda satış None'dır.
+    """
+    name = 'base'
+    timeout = 5
+
+    def fetch(self):
+        raise NotImplementedError
+
+    def fetch_quotes(self):
+        return {varlik: (alis, None) for varlik, alis in self.fetch().items()}
+
+
+class DovizComProvider(RateProvider):
+    name = 'doviz.com'
+    url = 'https://www.doviz.com/'
+    socket_keys = {'ALTIN': 'gram-altin', 'GUMUS': 'gumus', 'USD': 'USD', 'EUR': 'EUR'}
+
+    def __init__(self, timeout=5):
+        self.timeout = timeout
+
+    @staticmethod
+    def _parse_val(el):
+        return float(el.text.replace('.', '').replace(',', '.'))
+
+    def fetch(self):
+        return {varlik: alis for varlik, (alis, satis) in self.fetch_quotes().items()}
+
+    def fetch_quotes(self):
+        response = requests.get(self.url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=self.timeout)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.text, 'html.parser')
+        quotes = {varlik: (0.0, None) for varlik in VARLIKLAR}
+        for varlik, key in self.socket_keys.items():
+            alis = soup.find('span', {'data-socket-key': key, 'data-socket-attr': 'buy'})
+            satis = soup.find('span', {'data-socket-key': key, 'data-socket-attr': 'sell'})
+            quotes[varlik] = (self._parse_val(alis) if alis else 0.0, self._parse_val(satis) if satis else None)
+        return quotes
+
+
+class FixtureProvider(RateProvider):
+    """Ağa çıkmadan sabit kurlar döndürür (test ve benchmark için). İsteğe bağlı JSON dosyasından okur."""
+    name = 'fixture'
+
+    def __init__(self, rates=None, path=None, delay=0.0):
+        self.rates = rates
+        self.path = path
+        self.delay = delay
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        rates = bos_kurlar()
+        if self.path:
+            with open(self.path, encoding='utf-8') as f:
+                rates.update(json.load(f))
+        if self.rates:
+            rates.update(self.rates)
+        return rates
+
+
+class RateService:
+    """
+    Kurlar için TTL önbelleği.
+    - ttl içinde: önbellekten döner.
+    - ttl ile stale_ttl arası: eski değer hemen döner, arka planda yenilenir (stale-while-revalidate).
+    - hiç veri yoksa / stale_ttl aşıldıysa: senkron çekilir.
+    Aynı anda gelen istekler tek bir fetch'i paylaşır (single-flight); başarısız fetch sonrası
+    error_ttl boyunca kaynağa tekrar gidilmez. on_fetch(quotes, fetched_at) her başarılı fetch'ten
+    sonra (alış/satış demetleriyle) yenileme thread'inde çağrılır; hatası önbelleği etkilemez.
+    """
+
+    def __init__(self, provider, ttl=300, stale_ttl=86400, error_ttl=30, persist_path=None, on_fetch=None):
+        self.provider = provider
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+        self.persist_path = persist_path
+        self.on_fetch = on_fetch
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._rates = None
+        self._fetched_at = 0.0
+        self._failed_at = 0.0
+        self._load()
+
+    @property
+    def fetched_at(self):
+        return self._fetched_at
+
+    def get_rates(self):
+        rates, yas = self._rates, time.time() - self._fetched_at
+        if rates is not None and yas < self.ttl:
+            return dict(rates)
+        if rates is not None and yas < self.stale_ttl:
+            self.refresh(wait=False)
+            return dict(rates)
+        self.refresh(wait=True)
+        return dict(self._rates) if self._rates is not None else bos_kurlar()
+
+    def refresh(self, wait=True):
+        with self._lock:
+            event = self._inflight
+            owner = False
+            if event is None:
+                if time.time() - self._failed_at < self.error_ttl:
+                    return
+                event = self._inflight = threading.Event()
+                owner = True
+        if owner:
+            # Senkron yenilemede de fetch ayrı thread'de: istek event'le serbest kalır, on_fetch'in
+            # veritabanı yazması (kur geçmişi) isteğin süresine eklenmez
+            threading.Thread(target=self._run, args=(event,), name='kur-yenile', daemon=True).start()
+        if wait:
+            event.wait(self.provider.timeout + 1)
+
+    def _run(self, event):
+        sonuc = None
+        try:
+            quotes = self.provider.fetch_quotes()
+            rates = bos_kurlar()
+            rates.update((varlik, alis) for varlik, (alis, satis) in quotes.items())
+            now = time.time()
+            with self._lock:
+                self._rates = rates
+                self._fetched_at = now
+            self._save(rates, now)
+            sonuc = (quotes, now)
+        except Exception:
+            logger.warning('Kur kaynağı (%s) okunamadı', self.provider.name, exc_info=True)
+            self._failed_at = time.time()
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+        # Bekleyen istekler serbest bırakıldıktan sonra: dinleyicinin yazması onları geciktirmez
+        if sonuc is not None and self.on_fetch is not None:
+            try:
+                self.on_fetch(*sonuc)
+            except Exception:
+                logger.exception('Kur dinleyicisi (on_fetch) başarısız oldu')
+
+    def _load(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, encoding='utf-8') as f:
+                data = json.load(f)
+            self._rates = {varlik: float(data['rates'].get(varlik, 0.0)) for varlik in VARLIKLAR}
+            self._fetched_at = float(data['fetched_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning('Kur önbellek dosyası okunamadı: %s', self.persist_path)
+
+    def _save(self, rates, fetched_at):
+        if not self.persist_path:
+            return
+        tmp = None
+        try:
+            # Her worker kendi RateService'iyle aynı anda yazabilir; geçici dosya adı benzersiz olmalı
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.persist_path) or '.', prefix=os.path.basename(self.persist_path) + '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'rates': rates, 'fetched_at': fetched_at}, f)
+            os.replace(tmp, self.persist_path)
+        except OSError:
+            logger.warning('Kur önbellek dosyası yazılamadı: %s', self.persist_path)
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
@@ -0,0 +1,108 @@
+from collections import Counter
+
+from sqlalchemy import Integer, cast, delete, func, select, text
+
+from extensions import db
+from models import Kitap, OkumaOzet
+
+# Ana sayfadaki "en çok okunan yazarlar" listesinin uzunluğu
+EN_COK_OKUNAN = 5
+
+KOVA_DEGISTIR = text(
+    'INSERT INTO okuma_ozet (yil, ay, yazar, kitap_sayisi, sayfa) VALUES (:yil, :ay, :yazar, :adet, :sayfa) '
+    'ON CONFLICT (yil, ay, yazar) DO UPDATE SET kitap_sayisi = kitap_sayisi + :adet, sayfa = sayfa + :sayfa')
+BOS_KOVALARI_SIL = text('DELETE FROM okuma_ozet WHERE kitap_sayisi <= 0')
+
+
+def kova(okunma_tarihi, yazar):
+    """(yil, ay, yazar) anahtarı; tarihsiz kitaplar (0, 0) kovasına düşer."""
+    if okunma_tarihi is None:
+        return 0, 0, (yazar or '').strip()
+    return okunma_tarihi.year, okunma_tarihi.month, (yazar or '').strip()
+
+
+def kitaplari_yansit(kitaplar, isaret=1):
+    """
+    Kitapları (isaret=1) ya da silinmelerini/eski hallerini (isaret=-1) özet tablosuna yansıtır.
+    kitaplar: Kitap nesneleri ya da (okunma_tarihi, yazar, sayfa_sayisi) üçlüleri. Aynı kovaya düşenler
+    tek satırda toplanır; çağıranın oturumunda, commit'ten önce çağrılmalıdır.
+    """
+    farklar = {}
+    for kitap in kitaplar:
+        okunma_tarihi, yazar, sayfa = (kitap.okunma_tarihi, kitap.yazar, kitap.sayfa_sayisi) if isinstance(kitap, Kitap) else kitap
+        anahtar = kova(okunma_tarihi, yazar)
+        adet, toplam = farklar.get(anahtar, (0, 0))
+        farklar[anahtar] = (adet + isaret, toplam + (sayfa or 0) * isaret)
+    if not farklar:
+        return
+    db.session.execute(KOVA_DEGISTIR, [{'yil': yil, 'ay': ay, 'yazar': yazar, 'adet': adet, 'sayfa': sayfa} for (yil, ay, yazar), (adet, sayfa) in farklar.items()])
+    if isaret < 0:
+        db.session.execute(BOS_KOVALARI_SIL)
+
+
+def kitap_degisti(kitap, isaret=1):
+    kitaplari_yansit([kitap], isaret)
+
+
+def _kitaplardan_grupla():
+    yil = func.coalesce(cast(func.strftime('%Y', Kitap.okunma_tarihi), Integer), 0)
+    ay = func.coalesce(cast(func.strftime('%m', Kitap.okunma_tarihi), Integer), 0)
+    yazar = func.trim(func.coalesce(Kitap.yazar, ''))
+    sorgu = select(yil, ay, yazar, func.count(), func.coalesce(func.sum(Kitap.sayfa_sayisi), 0)).group_by(yil, ay, yazar)
+    return {(y, a, yz): (adet, sayfa) for y, a, yz, adet, sayfa in db.session.execute(sorgu)}
+
+
+def yeniden_olustur():
+    """Özet tablosunu Kitap tablosundan tek GROUP BY ile baştan kurar."""
+    db.session.execute(delete(OkumaOzet))
+    for (yil, ay, yazar), (adet, sayfa) in _kitaplardan_grupla().items():
+        db.session.add(OkumaOzet(yil=yil, ay=ay, yazar=yazar, kitap_sayisi=adet, sayfa=sayfa))
+    db.session.flush()
+
+
+def sapmalari_bul():
+    """[((yil, ay, yazar), tablodaki (adet, sayfa), beklenen (adet, sayfa))]"""
+    beklenen = _kitaplardan_grupla()
+    mevcut = {(s.yil, s.ay, s.yazar): (s.kitap_sayisi, s.sayfa) for s in OkumaOzet.query}
+    return [(anahtar, mevcut.get(anahtar, (0, 0)), beklenen.get(anahtar, (0, 0)))
+            for anahtar in sorted(set(beklenen) | set(mevcut)) if mevcut.get(anahtar, (0, 0)) != beklenen.get(anahtar, (0, 0))]
+
+
+def yillar():
+    """Okunma tarihi olan yıllar, yeniden eskiye (birincil anahtarın önekinden okunur)."""
+    return [yil for (yil,) in db.session.execute(select(OkumaOzet.yil).where(OkumaOzet.yil > 0).distinct().order_by(OkumaOzet.yil.desc()))]
+
+
+def ozet(yil=None):
+    """
+    Bir yılın (yil=None ise tüm zamanların, tarihsizler dahil) istatistikleri:
+    {'kitap', 'sayfa', 'yazar', 'aylik_sayfa': [12], 'aylik_kitap': [12], 'en_cok_okunan': [(yazar, kitap, sayfa)]}
+    """
+    sorgu = OkumaOzet.query if yil is None else OkumaOzet.query.filter_by(yil=yil)
+    sonuc = {'kitap': 0, 'sayfa': 0, 'aylik_sayfa': [0] * 12, 'aylik_kitap': [0] * 12}
+    yazar_kitap, yazar_sayfa = Counter(), Counter()
+    for satir in sorgu:
+        sonuc['kitap'] += satir.kitap_sayisi
+        sonuc['sayfa'] += satir.sayfa
+        if satir.ay:
+            sonuc['aylik_sayfa'][satir.ay - 1] += satir.sayfa
+            sonuc['aylik_kitap'][satir.ay - 1] += satir.kitap_sayisi
+        if satir.yazar:
+            yazar_kitap[satir.yazar] += satir.kitap_sayisi
+            yazar_sayfa[satir.yazar] += satir.sayfa
+    sonuc['yazar'] = len(yazar_kitap)
+    sonuc['en_cok_okunan'] = [(yazar, adet, yazar_sayfa[yazar]) for yazar, adet in sorted(yazar_kitap.items(), key=lambda x: (-x[1], -yazar_sayfa[x[0]], x[0]))[:EN_COK_OKUNAN]]
+    return sonuc
+
+
+def yillik_seri():
+    """Trend grafikleri için yıl başına [{'yil', 'kitap', 'sayfa', 'yazar'}], eskiden yeniye; tarihsiz kitaplar hariç."""
+    yillik = {}
+    for yil, yazar, adet, sayfa in db.session.execute(
+            select(OkumaOzet.yil, OkumaOzet.yazar, func.sum(OkumaOzet.kitap_sayisi), func.sum(OkumaOzet.sayfa))
+            .where(OkumaOzet.yil > 0).group_by(OkumaOzet.yil, OkumaOzet.yazar).order_by(OkumaOzet.yil)):
+        nokta = yillik.setdefault(yil, {'yil': yil, 'kitap': 0, 'sayfa': 0, 'yazar': 0})
+        nokta['kitap'] += adet
+        nokta['sayfa'] += sayfa
+        nokta['yazar'] += bool(yazar)
+    return list(yillik.values())
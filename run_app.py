@@ -1,7 +1,5 @@
 from main import app
-from extensions import db
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
+    # Şema create_app() içinde yükseltilir (DB_AUTO_UPGRADE); kapalıysa önce 'flask --app main db-upgrade'
     app.run(host="0.0.0.0", port=5000, debug=True)
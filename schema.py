@@ -0,0 +1,131 @@
+import logging
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+import visitors
+import uploads
+import reading_stats
+import search
+import portfolio
+import unread
+import ledger
+
+logger = logging.getLogger(__name__)
+
+# db.create_all() yeni tabloları kurar ama mevcut tablolara index eklemez / veri taşımaz.
+# Sıralı adımlar; uygulanan adım sayısı SQLite'ın PRAGMA user_version değerinde tutulur.
+# Yeni kurulan veritabanlarında da çalışabilmeleri için adımlar idempotent yazılır.
+ADIMLAR = [
+    [
+        'CREATE INDEX IF NOT EXISTS ix_finans_islem_tarih ON finans_islem (tarih)',
+    ],
+    [
+        # Eski oku-sonra-yaz akışındaki yarışlardan kalan aynı gün tekrarlarını temizle
+        'DELETE FROM ziyaretci WHERE id NOT IN (SELECT MIN(id) FROM ziyaretci GROUP BY ip_adresi, date(tarih))',
+        'CREATE UNIQUE INDEX IF NOT EXISTS ux_ziyaretci_ip_gun ON ziyaretci (ip_adresi, date(tarih))',
+    ],
+    [
+        'CREATE INDEX IF NOT EXISTS ix_ziyaretci_tarih ON ziyaretci (tarih)',
+        # Özet tablosundan önceki ziyaretleri özete aktar
+        visitors.ozet_doldur,
+    ],
+    [
+        'CREATE INDEX IF NOT EXISTS ix_mesaj_okundu_mu ON mesaj (okundu_mu)',
+    ],
+    [
+        # func.date() filtrelerinin yerini alan tarih aralığı sorguları için (queries.py)
+        'CREATE INDEX IF NOT EXISTS ix_gorev_son_tarih_kategori ON gorev (son_tarih, kategori)',
+        'CREATE INDEX IF NOT EXISTS ix_gorev_onemli_mi_son_tarih ON gorev (onemli_mi, son_tarih)',
+        'CREATE INDEX IF NOT EXISTS ix_gunluk_tur_tarih ON gunluk (tur, tarih)',
+        'CREATE INDEX IF NOT EXISTS ix_kitap_okunma_tarihi ON kitap (okunma_tarihi)',
+        'CREATE INDEX IF NOT EXISTS ix_mesaj_tarih ON mesaj (tarih)',
+    ],
+    [
+        # planner.pencere_sorgusu: son_tarih aralığı OR kategori = 'HEDEF' iki index'in birleşimiyle çözülür
+        'CREATE INDEX IF NOT EXISTS ix_gorev_kategori ON gorev (kategori)',
+    ],
+    [
+        # SQLite foreign key kolonlarını kendiliğinden index'lemez; selectinload ve sayım alt sorguları bunlarla çalışır
+        'CREATE INDEX IF NOT EXISTS ix_proje_gorev_proje_id ON proje_gorev (proje_id)',
+        'CREATE INDEX IF NOT EXISTS ix_studio_work_log_proje_id ON studio_work_log (proje_id)',
+    ],
+    [
+        # upload_blob referans sayılarını mevcut URL kolonlarından kur
+        uploads.yeniden_say,
+    ],
+    [
+        # Tam metin arama (search.py); sonraki değişiklikler flush olaylarıyla eşitlenir
+        search.TABLO_OLUSTUR,
+        search.yeniden_olustur,
+    ],
+    [
+        # Keyset sayfalama (pagination.py): (kolon, id) sırası index'ten okunur, id rowid olarak index'te zaten var
+        'CREATE INDEX IF NOT EXISTS ix_yol_haritasi_order_index ON yol_haritasi (order_index)',
+        'CREATE INDEX IF NOT EXISTS ix_studio_project_olusturma_tarihi ON studio_project (olusturma_tarihi)',
+    ],
+    [
+        # okuma_ozet (reading_stats.py) mevcut kitaplardan kurulur; sonrası kitap ekle/güncelle/sil ile artımlı
+        reading_stats.yeniden_olustur,
+    ],
+    [
+        # portfolio.py: varlık işlemleri (tarih, id) sırasıyla ve sayım için tablonun geri kalanına dokunmadan okunur
+        f'CREATE INDEX IF NOT EXISTS ix_finans_islem_varlik ON finans_islem (tarih) WHERE {portfolio.VARLIK_KOSULU}',
+    ],
+    [
+        # Okunmamış mesaj sayacı (unread.py) okuma yolunda kurulmaz; satır yoksa her okuma tam sayıma düşer
+        unread.sayaci_kur,
+    ],
+    [
+        # Bakiye tablosu (ledger.py) GET isteklerinde kurulmaz; mevcut defterden burada kurulur
+        ledger.yeniden_olustur,
+    ],
+]
+
+
+def surum():
+    return db.session.execute(text('PRAGMA user_version')).scalar()
+
+
+def upgrade():
+    mevcut = surum()
+    for no, adim in enumerate(ADIMLAR, start=1):
+        if no <= mevcut:
+            continue
+        for komut in adim:
+            if callable(komut):
+                komut()
+            else:
+                db.session.execute(text(komut))
+        db.session.execute(text(f'PRAGMA user_version = {no}'))
+        db.session.commit()
+
+
+def guncel_mi():
+    """Tüm model tabloları var ve tüm adımlar uygulanmış mı; açılışta tek PRAGMA ve tablo listesi okur."""
+    if surum() < len(ADIMLAR):
+        return False
+    return set(db.metadata.tables) <= set(inspect(db.engine).get_table_names())
+
+
+def yukselt(deneme=3):
+    """
+    db.create_all() + upgrade(); iki adım da idempotenttir. Aynı anda açılan worker'lar çakışırsa
+    (tablo zaten var, veritabanı kilitli) kısa bekleyip yeniden dener: diğer worker'ın tamamladığı
+    adımlar ikinci denemede atlanır. Uygulanan değişiklik yoksa False döner.
+    """
+    if guncel_mi():
+        return False
+    for no in range(1, deneme + 1):
+        try:
+            db.create_all()
+            upgrade()
+            return True
+        except OperationalError:
+            db.session.rollback()
+            if no == deneme:
+                raise
+            logger.warning('Şema yükseltmesi çakıştı, yeniden deneniyor (%d/%d)', no, deneme)
+            time.sleep(0.5 * no)
@@ -0,0 +1,162 @@
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Gunluk, ProjeFikri, Proje, Mesaj
+
+# Türkçe katlama: her karakter tek karaktere eşlenir, böylece katlanmış metindeki konumlar orijinalle aynı kalır
+# ve özetler orijinal metinden kesilebilir. 'İ'.lower() iki karakter ürettiği için önce tablo uygulanır.
+KATLAMA = str.maketrans('ıİIŞşĞğÇçÖöÜüÂâÎîÛû', 'iiissggccoouuaaiiuu')
+
+# Arama tablosuna alınan kaynaklar: ad -> (model, başlık kolonları, gövde kolonları, rowid kaydırması)
+# rowid = kayit_id * 4 + kaydırma; tek tabloda dört kaynağın id'leri çakışmaz.
+KAYNAKLAR = {
+    'gunluk': (Gunluk, ('baslik',), ('icerik',), 0),
+    'fikir': (ProjeFikri, ('baslik', 'ozet'), ('detay', 'sorun', 'teknolojiler'), 1),
+    'proje': (Proje, ('baslik',), ('notlar', 'detayli_icerik'), 2),
+    'mesaj': (Mesaj, ('konu', 'gonderen_ad'), ('mesaj_icerigi', 'gonderen_email'), 3),
+}
+_MODEL_KAYNAK = {model: ad for ad, (model, _, _, _) in KAYNAKLAR.items()}
+_KAYDIRMA_KAYNAK = {kaydirma: ad for ad, (_, _, _, kaydirma) in KAYNAKLAR.items()}
+
+TABLO_OLUSTUR = "CREATE VIRTUAL TABLE IF NOT EXISTS arama USING fts5(baslik, govde, tokenize = 'unicode61 remove_diacritics 2')"
+EKLE = text('INSERT OR REPLACE INTO arama (rowid, baslik, govde) VALUES (:rowid, :baslik, :govde)')
+SIL = text('DELETE FROM arama WHERE rowid = :rowid')
+# bm25: başlıktaki eşleşme gövdedekinin 5 katı ağırlıkta; küçük değer daha iyi
+ARA = text('SELECT rowid, bm25(arama, 5.0, 1.0) AS skor FROM arama WHERE arama MATCH :ifade ORDER BY skor LIMIT :limit')
+ARA_KAYNAK = text('SELECT rowid, bm25(arama, 5.0, 1.0) AS skor FROM arama WHERE arama MATCH :ifade AND rowid % 4 = :kaydirma ORDER BY skor LIMIT :limit')
+
+KELIME = re.compile(r'\w+')
+OZET_UZUNLUK = 200
+
+
+def katla(metin):
+    return (metin or '').translate(KATLAMA).lower()
+
+
+def _birlestir(nesne, kolonlar):
+    return '\n'.join(getattr(nesne, kolon) or '' for kolon in kolonlar)
+
+
+def _satir(ad, nesne):
+    _, baslik, govde, kaydirma = KAYNAKLAR[ad]
+    return {'rowid': nesne.id * 4 + kaydirma, 'baslik': katla(_birlestir(nesne, baslik)), 'govde': katla(_birlestir(nesne, govde))}
+
+
+@event.listens_for(Session, 'after_flush')
+def _indeksi_guncelle(session, flush_context):
+    eklenecek, silinecek = [], []
+    for nesne in session.new:
+        ad = _MODEL_KAYNAK.get(type(nesne))
+        if ad:
+            eklenecek.append(_satir(ad, nesne))
+    for nesne in session.dirty:
+        ad = _MODEL_KAYNAK.get(type(nesne))
+        if ad and session.is_modified(nesne, include_collections=False):
+            eklenecek.append(_satir(ad, nesne))
+    for nesne in session.deleted:
+        ad = _MODEL_KAYNAK.get(type(nesne))
+        if ad:
+            silinecek.append({'rowid': nesne.id * 4 + KAYNAKLAR[ad][3]})
+    # Flush ile aynı transaction: kayıt geri alınırsa indeks de geri alınır
+    baglanti = session.connection()
+    if silinecek:
+        baglanti.execute(SIL, silinecek)
+    if eklenecek:
+        baglanti.execute(EKLE, eklenecek)
+
+
+def yeniden_olustur(parti=5000):
+    """Arama tablosunu kaynak tablolardan baştan kurar. Eklenen satır sayısını döner."""
+    baglanti = db.session.connection()
+    baglanti.exec_driver_sql(TABLO_OLUSTUR)
+    baglanti.exec_driver_sql('DELETE FROM arama')
+    toplam = 0
+    for ad, (model, baslik, govde, kaydirma) in KAYNAKLAR.items():
+        kolonlar = [getattr(model, kolon) for kolon in ('id',) + baslik + govde]
+        satirlar = []
+        for kayit in db.session.execute(select(*kolonlar).execution_options(yield_per=parti)):
+            satirlar.append({
+                'rowid': kayit[0] * 4 + kaydirma,
+                'baslik': katla('\n'.join(deger or '' for deger in kayit[1:1 + len(baslik)])),
+                'govde': katla('\n'.join(deger or '' for deger in kayit[1 + len(baslik):])),
+            })
+            if len(satirlar) >= parti:
+                baglanti.execute(EKLE, satirlar)
+                toplam += len(satirlar)
+                satirlar = []
+        if satirlar:
+            baglanti.execute(EKLE, satirlar)
+            toplam += len(satirlar)
+    baglanti.exec_driver_sql("INSERT INTO arama (arama) VALUES ('optimize')")
+    return toplam
+
+
+def sorgu_ifadesi(sorgu):
+    """Kullanıcı girdisini FTS5 ifadesine çevirir: her kelime ön ek eşleşmeli, hepsi zorunlu (AND)."""
+    kelimeler = KELIME.findall(katla(sorgu))
+    return ' '.join(f'"{kelime}"*' for kelime in kelimeler), kelimeler
+
+
+def ozet_kes(metin, kelimeler, uzunluk=OZET_UZUNLUK):
+    """Orijinal metinden ilk eşleşmenin çevresini keser ve eşleşen kelime başlarını <mark> ile işaretler."""
+    metin = metin or ''
+    katli = katla(metin)
+    desen = re.compile(r'\b(' + '|'.join(re.escape(k) for k in sorted(kelimeler, key=len, reverse=True)) + r')\w*') if kelimeler else None
+    if len(katli) != len(metin):
+        # Tabloda olmayan, küçük harfe çevrilince uzayan bir karakter var; konumlar kayar, işaretleme yapılmaz
+        desen = None
+    ilk = desen.search(katli) if desen else None
+    baslangic = max(0, (ilk.start() if ilk else 0) - uzunluk // 3)
+    bitis = min(len(metin), baslangic + uzunluk)
+    parcalar = [Markup('…') if baslangic else Markup('')]
+    konum = baslangic
+    for eslesme in (desen.finditer(katli, baslangic, bitis) if desen else ()):
+        parcalar.append(escape(metin[konum:eslesme.start()]))
+        parcalar.append(Markup('<mark>{}</mark>').format(metin[eslesme.start():eslesme.end()]))
+        konum = eslesme.end()
+    parcalar.append(escape(metin[konum:bitis]))
+    if bitis < len(metin):
+        parcalar.append(Markup('…'))
+    return Markup('').join(parcalar)
+
+
+def ara(sorgu, kaynak=None, limit=50):
+    """
+    [{'kaynak', 'id', 'baslik', 'ozet', 'tarih', 'nesne', 'skor'}] — bm25'e göre sıralı.
+    Eşleşen satırlar kaynak başına tek IN (...) sorgusuyla yüklenir.
+    """
+    ifade, kelimeler = sorgu_ifadesi(sorgu)
+    if not ifade:
+        return []
+    parametreler = {'ifade': ifade, 'limit': limit}
+    if kaynak in KAYNAKLAR:
+        parametreler['kaydirma'] = KAYNAKLAR[kaynak][3]
+        satirlar = db.session.execute(ARA_KAYNAK, parametreler).all()
+    else:
+        satirlar = db.session.execute(ARA, parametreler).all()
+    idler = {}
+    for rowid, _ in satirlar:
+        idler.setdefault(_KAYDIRMA_KAYNAK[rowid % 4], []).append(rowid // 4)
+    nesneler = {}
+    for ad, kimlikler in idler.items():
+        model = KAYNAKLAR[ad][0]
+        for nesne in model.query.filter(model.id.in_(kimlikler)):
+            nesneler[(ad, nesne.id)] = nesne
+    sonuclar = []
+    for rowid, skor in satirlar:
+        ad, kimlik = _KAYDIRMA_KAYNAK[rowid % 4], rowid // 4
+        nesne = nesneler.get((ad, kimlik))
+        if nesne is None:
+            continue
+        _, baslik, govde, _ = KAYNAKLAR[ad]
+        sonuclar.append({
+            'kaynak': ad, 'id': kimlik, 'skor': skor, 'nesne': nesne,
+            'baslik': ozet_kes(' · '.join(getattr(nesne, k) for k in baslik if getattr(nesne, k)), kelimeler, 120),
+            'ozet': ozet_kes(_birlestir(nesne, govde), kelimeler),
+            'tarih': getattr(nesne, 'tarih', None) or getattr(nesne, 'olusturma_tarihi', None),
+        })
+    return sonuclar
@@ -0,0 +1,68 @@
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from extensions import db
+
+# Her yeni SQLite bağlantısında çalıştırılan PRAGMA'lar.
+# 'default' SQLite varsayılanlarını olduğu gibi bırakır (rollback journal, synchronous=FULL).
+PROFILLER = {
+    'default': {},
+    'production': {
+        # Okuyucular yazarı, yazar okuyucuları beklemez; commit tek bir WAL append'idir.
+        # journal_mode dosyaya yazılır: bir kez production ile açılan veritabanı WAL'da kalır.
+        'journal_mode': 'WAL',
+        # WAL ile güvenli: güç kesintisinde son commit'ler kaybolabilir, veritabanı bozulmaz
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        # Negatif değer KiB cinsindendir: bağlantı başına ~64 MB sayfa önbelleği
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def pragmalar(app):
+    profil = app.config['SQLITE_PROFILE']
+    if profil not in PROFILLER:
+        raise ValueError(f'Bilinmeyen SQLITE_PROFILE: {profil!r} (seçenekler: {", ".join(PROFILLER)})')
+    return dict(PROFILLER[profil], **(app.config['SQLITE_PRAGMAS'] or {}))
+
+
+def motor_ayarlari(app):
+    """db.init_app'ten önce SQLALCHEMY_ENGINE_OPTIONS'a eklenecek havuz ayarları."""
+    if app.config['SQLITE_PROFILE'] == 'default' or not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite:///'):
+        return {}
+    return {
+        # Worker thread'leri arasında paylaşılan sabit boyutlu havuz; bağlantı açmak (ve PRAGMA'ları kurmak) istek başına tekrarlanmaz
+        'poolclass': QueuePool,
+        'pool_size': app.config['SQLITE_POOL_SIZE'],
+        'max_overflow': app.config['SQLITE_POOL_OVERFLOW'],
+        'pool_timeout': 30,
+        # pysqlite'ın kendi kilit beklemesi; busy_timeout PRAGMA'sıyla aynı değer
+        'connect_args': {'timeout': pragmalar(app).get('busy_timeout', 5000) / 1000, 'check_same_thread': False},
+    }
+
+
+def uygula(app):
+    """Profilin PRAGMA'larını uygulamanın motoruna bağlar; db.init_app'ten sonra çağrılır."""
+    ayarlar = pragmalar(app)
+    if not ayarlar or not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def _pragmalari_kur(dbapi_baglanti, kayit):
+        cursor = dbapi_baglanti.cursor()
+        try:
+            for ad, deger in ayarlar.items():
+                cursor.execute(f'PRAGMA {ad} = {deger}')
+        finally:
+            cursor.close()
+
+
+def durum():
+    """Aktif bağlantıda geçerli PRAGMA değerleri (ayar kontrolü için)."""
+    baglanti = db.session.connection()
+    return {ad: baglanti.exec_driver_sql(f'PRAGMA {ad}').scalar() for ad in PROFILLER['production']}
@@ -0,0 +1,44 @@
+// Sonsuz kaydırma: data-sonsuz niteliği taşıyan kapların sonuna, görünür olduklarında sonraki sayfayı ekler.
+// Sunucu ?format=json&imlec=... isteğine {html, sonraki, adet} döner (pagination.py).
+(function () {
+    function kur(kap) {
+        if (!kap.dataset.imlec) return;
+        const isaret = document.createElement('div');
+        isaret.className = 'py-6 text-center text-slate-500 text-sm';
+        isaret.textContent = 'Yükleniyor…';
+        (kap.closest('table') || kap).after(isaret);
+
+        let yukleniyor = false;
+        const gozlemci = new IntersectionObserver(function (girdiler) {
+            if (!girdiler.some(g => g.isIntersecting) || yukleniyor) return;
+            yukleniyor = true;
+            const url = new URL(kap.dataset.sonsuz, window.location.href);
+            url.searchParams.set('imlec', kap.dataset.imlec);
+            url.searchParams.set('adet', kap.dataset.adet || '0');
+            fetch(url, { headers: { 'Accept': 'application/json' } })
+                .then(yanit => {
+                    if (!yanit.ok) throw new Error(yanit.status);
+                    return yanit.json();
+                })
+                .then(veri => {
+                    kap.insertAdjacentHTML('beforeend', veri.html);
+                    kap.dataset.adet = parseInt(kap.dataset.adet || '0', 10) + veri.adet;
+                    kap.dataset.imlec = veri.sonraki || '';
+                    if (!veri.sonraki) {
+                        gozlemci.disconnect();
+                        isaret.remove();
+                    }
+                })
+                .catch(hata => {
+                    console.error('Sonraki sayfa yüklenemedi:', hata);
+                    isaret.textContent = 'Yüklenemedi, tekrar denemek için kaydırın.';
+                })
+                .finally(() => { yukleniyor = false; });
+        }, { rootMargin: '400px 0px' });
+        gozlemci.observe(isaret);
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-sonsuz]').forEach(kur);
+    });
+})();
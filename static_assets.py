@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import request, send_file, abort, url_for
+from werkzeug.security import safe_join
+
+import uploads
+
+try:
+    import brotli
+except ImportError:  # isteğe bağlı; yoksa sadece gzip üretilir
+    brotli = None
+
+# Sıkıştırmaya değen metin tabanlı türler; görseller (webp/avif/jpg/png) zaten sıkıştırılmış
+SIKISTIRILABILIR = {'.css', '.js', '.mjs', '.json', '.map', '.svg', '.txt', '.html', '.xml', '.ico', '.woff', '.ttf', '.otf', '.wasm'}
+# Bundan küçük dosyalarda başlık maliyeti kazançtan büyüktür
+MIN_BOYUT = 1024
+
+# (uzantı, Content-Encoding); tercih sırasıyla
+KODLAMALAR = (('.br', 'br'), ('.gz', 'gzip'))
+
+
+def _guncel(kaynak, hedef):
+    return os.path.exists(hedef) and os.path.getmtime(hedef) >= os.path.getmtime(kaynak)
+
+
+def _atomik_yaz(yol, veri):
+    gecici = f'{yol}.{threading.get_ident()}.tmp'
+    with open(gecici, 'wb') as f:
+        f.write(veri)
+    os.replace(gecici, yol)
+
+
+def on_sikistir(kok, haric=()):
+    """
+    kok altındaki uygun dosyaların .gz (ve brotli varsa .br) kopyalarını üretir; güncel olanları atlar. (yeni, atlanan)
+    haric'teki dizinlere hiç inilmez: yüklemeler (static/uploads) çok büyük olabilir ve sadece görsel içerir.
+    """
+    haric = {os.path.realpath(d) for d in haric}
+    yeni = atlanan = 0
+    for dizin, alt_dizinler, dosyalar in os.walk(kok):
+        alt_dizinler[:] = [ad for ad in alt_dizinler if os.path.realpath(os.path.join(dizin, ad)) not in haric]
+        for ad in dosyalar:
+            yol = os.path.join(dizin, ad)
+            if os.path.splitext(ad)[1].lower() not in SIKISTIRILABILIR or os.path.getsize(yol) < MIN_BOYUT:
+                continue
+            hedefler = [('.gz', lambda veri: gzip.compress(veri, 9, mtime=0))]
+            if brotli is not None:
+                hedefler.append(('.br', lambda veri: brotli.compress(veri, quality=11)))
+            veri = None
+            for uzanti, sikistir in hedefler:
+                if _guncel(yol, yol + uzanti):
+                    atlanan += 1
+                    continue
+                if veri is None:
+                    with open(yol, 'rb') as f:
+                        veri = f.read()
+                sikismis = sikistir(veri)
+                if len(sikismis) < len(veri):
+                    _atomik_yaz(yol + uzanti, sikismis)
+                    yeni += 1
+    return yeni, atlanan
+
+
+class StaticAssets:
+    """
+    Flask'ın static view'unun yerine geçer: istemcinin Accept-Encoding'ine göre hazır .br/.gz kopyayı,
+    yoksa dosyanın kendisini send_file ile (Range, ETag, 304 ve wsgi.file_wrapper/sendfile desteğiyle) sunar.
+    asset_url() içerik özetini ?v= olarak ekler; özet eşleşen istekler ve içerik adresli yüklemeler
+    1 yıl 'immutable' önbelleklenir, diğerleri her seferinde yeniden doğrulanır.
+    """
+
+    def __init__(self, app, on_sikistirma=True, haric=()):
+        self.app = app
+        self._ozetler = {}
+        self._lock = threading.Lock()
+        if on_sikistirma and app.static_folder and os.path.isdir(app.static_folder):
+            try:
+                on_sikistir(app.static_folder, haric)
+            except OSError as e:
+                # Salt okunur dağıtımlarda (örn. serverless) kopyalar build sırasında 'flask assets-build' ile üretilmeli
+                app.logger.warning('static ön sıkıştırma yapılamadı: %s', e)
+        app.view_functions['static'] = self.sun
+        app.jinja_env.globals['asset_url'] = self.asset_url
+
+    def ozet(self, dosya_adi):
+        yol = safe_join(self.app.static_folder, dosya_adi)
+        if yol is None or not os.path.isfile(yol):
+            return None
+        mtime = os.path.getmtime(yol)
+        kayit = self._ozetler.get(dosya_adi)
+        if kayit is None or kayit[0] != mtime:
+            ozet = hashlib.sha256()
+            with open(yol, 'rb') as f:
+                for parca in iter(lambda: f.read(64 * 1024), b''):
+                    ozet.update(parca)
+            kayit = (mtime, ozet.hexdigest()[:12])
+            with self._lock:
+                self._ozetler[dosya_adi] = kayit
+        return kayit[1]
+
+    def asset_url(self, dosya_adi):
+        """İçerik özetiyle parmak izli URL; dosya değişince URL de değişir."""
+        ozet = self.ozet(dosya_adi)
+        return url_for('static', filename=dosya_adi, v=ozet) if ozet else url_for('static', filename=dosya_adi)
+
+    def _kodlama_sec(self, yol):
+        for uzanti, kodlama in KODLAMALAR:
+            if request.accept_encodings[kodlama] and _guncel(yol, yol + uzanti):
+                return yol + uzanti, kodlama
+        return yol, None
+
+    def sun(self, filename):
+        yol = safe_join(self.app.static_folder, filename)
+        if yol is None or not os.path.isfile(yol):
+            abort(404)
+        sunulan, kodlama = self._kodlama_sec(yol) if os.path.splitext(yol)[1].lower() in SIKISTIRILABILIR else (yol, None)
+        mimetype = mimetypes.guess_type(yol)[0] or 'application/octet-stream'
+        response = send_file(sunulan, mimetype=mimetype, conditional=True, etag=True, max_age=None)
+        if kodlama:
+            response.headers['Content-Encoding'] = kodlama
+        if os.path.splitext(yol)[1].lower() in SIKISTIRILABILIR:
+            response.vary.add('Accept-Encoding')
+        surum = request.args.get('v')
+        if uploads.DOSYA_YOLU.search(request.path) or (surum and surum == self.ozet(filename)):
+            uploads.immutable_basliklar(response)
+        else:
+            response.cache_control.public = True
+            response.cache_control.no_cache = True
+        return response
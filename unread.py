@@ -0,0 +1,64 @@
+import threading
+import time
+
+from sqlalchemy import select, update, delete, insert
+
+from extensions import db
+from models import Sayac
+import changes
+import queries
+
+ANAHTAR = 'okunmamis_mesaj'
+
+
+def sayaci_kur():
+    """Şema adımı: sayaç satırı yoksa mevcut mesajlardan kurar (commit upgrade()'de). get() hiç yazmaz."""
+    if db.session.execute(select(Sayac.deger).where(Sayac.ad == ANAHTAR)).scalar() is None:
+        db.session.execute(insert(Sayac).values(ad=ANAHTAR, deger=queries.okunmamis_mesajlar().count()))
+
+
+class UnreadCounter:
+    """
+    Okunmamış mesaj sayısı. Kaynak, contact() ve okundu/silme işlemlerinde artırılıp azaltılan
+    Sayac satırıdır; değer bellekte ttl saniye tutulur. Bu süreçteki commit'ler bellekteki değeri
+    hemen düşürür, diğer worker'lar en geç ttl sonra satırı yeniden okur.
+    """
+
+    def __init__(self, ttl=5):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._deger = None
+        self._zaman = 0.0
+        changes.commit_sonrasi(self._degisti)
+
+    def _degisti(self, tablolar):
+        if 'sayac' in tablolar or 'mesaj' in tablolar:
+            with self._lock:
+                self._deger = None
+
+    def get(self):
+        deger, zaman = self._deger, self._zaman
+        if deger is not None and time.time() - zaman < self.ttl:
+            return deger
+        deger = db.session.execute(select(Sayac.deger).where(Sayac.ad == ANAHTAR)).scalar()
+        if deger is None:
+            # Satır schema.upgrade() (sayaci_kur) ya da ilk degistir() ile kurulur. get() şablon render'ı sırasında
+            # çağrılır: burada yazıp commit etmek view'un yüklediği nesneleri expire eder, her erişim yeniden sorgu olur
+            deger = queries.okunmamis_mesajlar().count()
+        with self._lock:
+            self._deger, self._zaman = deger, time.time()
+        return deger
+
+    def degistir(self, fark):
+        """Çağıranın transaction'ında sayacı fark kadar değiştirir."""
+        sonuc = db.session.execute(update(Sayac).where(Sayac.ad == ANAHTAR).values(deger=Sayac.deger + fark))
+        if sonuc.rowcount == 0:
+            # Sayaç henüz yok: bekleyen değişiklik autoflush ile dahil edilerek baştan sayılır
+            self.yeniden_say()
+
+    def yeniden_say(self):
+        deger = queries.okunmamis_mesajlar().count()
+        db.session.execute(delete(Sayac).where(Sayac.ad == ANAHTAR))
+        db.session.add(Sayac(ad=ANAHTAR, deger=deger))
+        db.session.flush()
+        return deger
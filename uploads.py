@@ -0,0 +1,148 @@
+import os
+import re
+import time
+from collections import Counter
+
+from sqlalchemy import delete, event, inspect, select, text
+from sqlalchemy.orm import Session
+
+from extensions import db
+from images import ICERIK_URL
+from models import Kullanici, YolHaritasi, Proje, UploadBlob
+
+# İçerik adresli görsel URL'si tutan kolonlar; referans sayıları bunlardan türetilir
+REF_ALANLARI = ((Kullanici, 'profil_foto_url'), (YolHaritasi, 'logo_url'), (Proje, 'kapak_resmi'))
+_MODEL_ALANLARI = {model: alan for model, alan in REF_ALANLARI}
+
+# Ana görsel ve varyantları: /uploads/ab/ab...(-320)?.(webp|avif)
+DOSYA_YOLU = re.compile(r'/uploads/([0-9a-f]{2})/\1[0-9a-f]{62}(-\d+)?\.(webp|avif)$')
+
+REF_DEGISTIR = text('INSERT INTO upload_blob (ozet, ref_sayisi) VALUES (:ozet, :fark) ON CONFLICT (ozet) DO UPDATE SET ref_sayisi = ref_sayisi + :fark')
+
+# Yüklenip henüz bir kayda bağlanmamış (commit edilmemiş formdaki) dosyalar bu süreden genç ise silinmez
+GC_BEKLEME = 3600
+# 31536000 saniye = 1 yıl; içerik adresli URL'nin arkasındaki dosya asla değişmez
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def ozet(url):
+    eslesme = ICERIK_URL.search(url or '')
+    return eslesme.group(2) if eslesme else None
+
+
+@event.listens_for(Session, 'before_flush')
+def _referanslari_izle(session, flush_context, instances):
+    farklar = Counter()
+    for nesne in session.new:
+        alan = _MODEL_ALANLARI.get(type(nesne))
+        if alan and ozet(getattr(nesne, alan)):
+            farklar[ozet(getattr(nesne, alan))] += 1
+    for nesne in session.deleted:
+        alan = _MODEL_ALANLARI.get(type(nesne))
+        if alan and ozet(getattr(nesne, alan)):
+            farklar[ozet(getattr(nesne, alan))] -= 1
+    for nesne in session.dirty:
+        alan = _MODEL_ALANLARI.get(type(nesne))
+        if not alan:
+            continue
+        gecmis = inspect(nesne).attrs[alan].history
+        for deger in gecmis.added:
+            if ozet(deger):
+                farklar[ozet(deger)] += 1
+        for deger in gecmis.deleted:
+            if ozet(deger):
+                farklar[ozet(deger)] -= 1
+    degisenler = [{'ozet': h, 'fark': fark} for h, fark in farklar.items() if fark]
+    if degisenler:
+        # Flush ile aynı transaction'da; kayıt geri alınırsa sayaç da geri alınır
+        session.connection().execute(REF_DEGISTIR, degisenler)
+
+
+def kolonlardan_say():
+    """{ozet: referans sayısı}, doğrudan URL kolonlarından."""
+    sayilar = Counter()
+    for model, alan in REF_ALANLARI:
+        for (url,) in db.session.execute(select(getattr(model, alan)).where(getattr(model, alan).like('%/uploads/%'))):
+            if ozet(url):
+                sayilar[ozet(url)] += 1
+    return sayilar
+
+
+def sahip_tablolar(h):
+    """URL kolonlarında h özetine referans veren tabloların adları."""
+    return {model.__tablename__ for model, alan in REF_ALANLARI if db.session.execute(select(getattr(model, alan)).where(getattr(model, alan).like(f'%/{h}.webp')).limit(1)).first()}
+
+
+def sapmalari_bul():
+    """(ozet, tablodaki, kolonlardaki) listesi."""
+    tablo = dict(db.session.execute(select(UploadBlob.ozet, UploadBlob.ref_sayisi)).all())
+    gercek = kolonlardan_say()
+    return [(h, tablo.get(h, 0), gercek.get(h, 0)) for h in sorted(set(tablo) | set(gercek)) if tablo.get(h, 0) != gercek.get(h, 0)]
+
+
+def yeniden_say():
+    gercek = kolonlardan_say()
+    db.session.execute(UploadBlob.__table__.delete())
+    if gercek:
+        db.session.execute(UploadBlob.__table__.insert(), [{'ozet': h, 'ref_sayisi': n} for h, n in gercek.items()])
+    db.session.flush()
+
+
+def diskteki_bloblar(klasor):
+    """{ozet: [dosya yolları]}; içerik adresli alt klasörlerdeki ana görsel ve tüm varyantları."""
+    bloblar = {}
+    for alt in os.listdir(klasor):
+        alt_yol = os.path.join(klasor, alt)
+        if len(alt) != 2 or not os.path.isdir(alt_yol):
+            continue
+        for ad in os.listdir(alt_yol):
+            h = ad.split('.', 1)[0].split('-', 1)[0]
+            if len(h) == 64 and h.startswith(alt):
+                bloblar.setdefault(h, []).append(os.path.join(alt_yol, ad))
+    return bloblar
+
+
+def sahipsizler(klasor, bekleme=GC_BEKLEME, korunan=()):
+    """
+    upload_blob'da referans sayısı 0 olan (ya da hiç satırı olmayan) ve bekleme süresinden eski bloblar:
+    [(ozet, dosyalar, bayt)]. Kolonlar yeniden sayılmaz; sapma kontrolü sapmalari_bul() ile ayrıca yapılır,
+    kolonlarda referansı bulunan ozetler korunan ile dışarıda bırakılabilir.
+    """
+    referanslar = set(db.session.execute(select(UploadBlob.ozet).where(UploadBlob.ref_sayisi > 0)).scalars())
+    referanslar.update(korunan)
+    sinir = time.time() - bekleme
+    sonuc = []
+    for h, dosyalar in sorted(diskteki_bloblar(klasor).items()):
+        if h in referanslar or max(os.path.getmtime(d) for d in dosyalar) > sinir:
+            continue
+        sonuc.append((h, dosyalar, sum(os.path.getsize(d) for d in dosyalar)))
+    return sonuc
+
+
+def kayitlari_sil(ozetler):
+    """Dosyaları silinen blobların sıfırlanmış sayaç satırlarını kaldırır (çağıranın transaction'ında)."""
+    if ozetler:
+        db.session.execute(delete(UploadBlob).where(UploadBlob.ozet.in_(list(ozetler)), UploadBlob.ref_sayisi <= 0))
+
+
+def eski_dosyalar(klasor, url_oneki, bekleme=GC_BEKLEME):
+    """İçerik adresli olmayan, hiçbir kolonda geçmeyen eski düz yüklemeler: [(yol, bayt)]. url_oneki örn. '/static/uploads/'."""
+    kullanilan = set()
+    for model, alan in REF_ALANLARI:
+        kullanilan.update(url for (url,) in db.session.execute(select(getattr(model, alan))) if url)
+    sinir = time.time() - bekleme
+    sonuc = []
+    for ad in sorted(os.listdir(klasor)):
+        yol = os.path.join(klasor, ad)
+        if os.path.isfile(yol) and os.path.getmtime(yol) <= sinir and url_oneki + ad not in kullanilan:
+            sonuc.append((yol, os.path.getsize(yol)))
+    return sonuc
+
+
+def immutable_basliklar(response):
+    """İçerik adresli dosya yanıtlarına 'public, max-age=1y, immutable'; tarayıcı yeniden doğrulama bile yapmaz."""
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    response.cache_control.no_cache = None
+    return response
@@ -0,0 +1,137 @@
+import hashlib
+import os
+from datetime import date
+
+from flask import request, session, g, has_request_context
+from flask_login import current_user
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+import changes
+
+SURUM_ARTIR = text('INSERT INTO icerik_surum (tablo, surum) VALUES (:tablo, 1) ON CONFLICT (tablo) DO UPDATE SET surum = surum + 1')
+
+# Ziyaret tabloları her flush'ta değişir; varsayılan bağımlılığa girerse admin sayfalarının ETag'i sürekli değişir.
+# Bu tablolara bağlı sayfalar bagimli(...) ile açıkça belirtilmeli.
+VARSAYILAN_HARIC = {'ziyaretci', 'ziyaret_ozet', 'icerik_surum'}
+
+
+@changes.commit_oncesi
+def _surumleri_artir(session, tablolar):
+    # Aynı transaction içinde: sürüm, verinin kendisiyle birlikte commit edilir ya da geri alınır
+    baglanti = session.connection()
+    for tablo in sorted(tablolar - {'icerik_surum'}):
+        baglanti.execute(SURUM_ARTIR, {'tablo': tablo})
+
+
+def surumler():
+    return dict(db.session.execute(text('SELECT tablo, surum FROM icerik_surum')).all())
+
+
+def bagimli(*modeller):
+    """View'un ETag'ini sadece verilen modellerin sürümüne bağlar."""
+    def decorator(view):
+        view.etag_tablolar = [model.__tablename__ for model in modeller]
+        return view
+    return decorator
+
+
+def etag_yok(view):
+    """Veritabanı dışı içerik (canlı kur, bellek sayaçları) gösteren view'lar için sürüm ETag'i üretme."""
+    view.etag_yok = True
+    return view
+
+
+def kod_surumu(root_path):
+    """Şablon ve kaynak dosyalarının içerik özeti; deploy sonrası eski ETag'lerin geçmemesi için."""
+    ozet = hashlib.sha1()
+    for ad in sorted(os.listdir(root_path)):
+        if ad.endswith('.py'):
+            with open(os.path.join(root_path, ad), 'rb') as f:
+                ozet.update(ad.encode())
+                ozet.update(f.read())
+    # Şablonlar alt klasörleriyle (partials/) birlikte; yalnız bir parçası değişen deploy da yeni ETag almalı
+    sablonlar = os.path.join(root_path, 'templates')
+    yollar = []
+    for dizin, alt_dizinler, dosyalar in os.walk(sablonlar):
+        yollar.extend(os.path.join(dizin, ad) for ad in dosyalar if ad.endswith('.html'))
+    for yol in sorted(yollar):
+        with open(yol, 'rb') as f:
+            ozet.update(os.path.relpath(yol, sablonlar).replace(os.sep, '/').encode())
+            ozet.update(f.read())
+    return ozet.hexdigest()
+
+
+class ConditionalGet:
+    """
+    GET isteklerine tablo sürümlerinden türetilmiş güçlü ETag ekler. İstemci aynı ETag'i
+    If-None-Match ile gönderirse view hiç çalışmadan 304 döner.
+    ETag girdisi: kod sürümü, endpoint + argümanlar, kullanıcı, gün ve bağlı tabloların sürümleri.
+    Yazan GET view'ları (örn. read_message mesajı okundu işaretler) için ETag yanıt anında, view'un
+    kendi commit'inden sonraki sürümlerle yeniden hesaplanır; istemci gördüğü durumun ETag'ini alır.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.kod = kod_surumu(app.root_path)
+        app.before_request(self._once)
+        app.after_request(self._sonra)
+        changes.commit_sonrasi(self._commit_edildi)
+
+    @staticmethod
+    def _commit_edildi(tablolar):
+        # Arka plan thread'lerindeki commit'lerin (ziyaret flush'ı, kur geçmişi) istek bağlamı yoktur
+        if has_request_context():
+            g.surum_degisti = True
+
+    def _etag(self):
+        if request.method not in ('GET', 'HEAD') or request.endpoint in (None, 'static'):
+            return None
+        view = self.app.view_functions.get(request.endpoint)
+        if view is None or getattr(view, 'etag_yok', False) or '_flashes' in session:
+            return None
+        try:
+            tumu = surumler()
+        except OperationalError:
+            # icerik_surum henüz yok (şema yükseltilmemiş) ya da veritabanı kilitli: ETag'siz devam,
+            # sayfa bu hook'tan önceki gibi tam üretilir
+            db.session.rollback()
+            self.app.logger.warning('İçerik sürümleri okunamadı, ETag üretilmedi', exc_info=True)
+            return None
+        # PageCache aynı istekte tekrar okumasın
+        g.icerik_surumleri = tumu
+        tablolar = getattr(view, 'etag_tablolar', None)
+        if tablolar is None:
+            parcalar = sorted((tablo, surum) for tablo, surum in tumu.items() if tablo not in VARSAYILAN_HARIC)
+        else:
+            parcalar = [(tablo, tumu.get(tablo, 0)) for tablo in tablolar]
+        kullanici = current_user.get_id() if current_user.is_authenticated else ''
+        anahtar = repr((self.kod, request.endpoint, sorted((request.view_args or {}).items()), request.query_string, kullanici, date.today().isoformat(), parcalar))
+        return hashlib.sha1(anahtar.encode()).hexdigest()
+
+    def _basliklar(self, response):
+        if current_user.is_authenticated:
+            response.cache_control.private = True
+        else:
+            response.cache_control.public = True
+            response.vary.add('Cookie')
+        response.cache_control.no_cache = True
+
+    def _once(self):
+        etag = g.surum_etag = self._etag()
+        if etag and etag in request.if_none_match:
+            response = self.app.response_class(status=304)
+            response.set_etag(etag)
+            self._basliklar(response)
+            return response
+
+    def _sonra(self, response):
+        etag = g.pop('surum_etag', None)
+        if etag and g.pop('surum_degisti', False):
+            g.pop('icerik_surumleri', None)
+            etag = self._etag()
+        if etag and response.status_code == 200 and response.get_etag()[0] is None:
+            response.set_etag(etag)
+            self._basliklar(response)
+        return response
@@ -0,0 +1,171 @@
+import atexit
+import hashlib
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, func, text
+
+from extensions import db
+from models import Ziyaretci, ZiyaretOzet
+from queries import gun_araligi
+
+logger = logging.getLogger(__name__)
+
+# tekil_ziyaretci ham tablodan yeniden sayılır (aynı gün tekrar flush edilse de doğru kalır);
+# goruntuleme bellekte biriken sayaç kadar artar.
+OZET_UPSERT = text(
+    'INSERT INTO ziyaret_ozet (gun, sayfa, tekil_ziyaretci, goruntuleme) '
+    'VALUES (:gun, :sayfa, (SELECT COUNT(*) FROM ziyaretci WHERE tarih >= :baslangic AND tarih < :bitis AND sayfa = :sayfa), :goruntuleme) '
+    'ON CONFLICT (gun, sayfa) DO UPDATE SET '
+    'tekil_ziyaretci = MAX(ziyaret_ozet.tekil_ziyaretci, excluded.tekil_ziyaretci), '
+    'goruntuleme = ziyaret_ozet.goruntuleme + excluded.goruntuleme')
+
+# Ham satırları özete katlarken: özet zaten varsa ham sayımdan küçük olmadığı sürece korunur
+KATLA_UPSERT = text(
+    'INSERT INTO ziyaret_ozet (gun, sayfa, tekil_ziyaretci, goruntuleme) VALUES (:gun, :sayfa, :adet, :adet) '
+    'ON CONFLICT (gun, sayfa) DO UPDATE SET '
+    'tekil_ziyaretci = MAX(ziyaret_ozet.tekil_ziyaretci, excluded.tekil_ziyaretci), '
+    'goruntuleme = MAX(ziyaret_ozet.goruntuleme, excluded.goruntuleme)')
+
+
+class VisitorTracker:
+    """
+    Ziyaretleri istek içinde veritabanına gitmeden kaydeder.
+    Aynı gün aynı IP bellekteki kümede (IP'nin kısa hash'i) elenir; yeni ziyaretler biriktirilip
+    arka plan thread'i tarafından flush_interval saniyede bir ya da batch_size dolunca tek
+    executemany ile yazılır. (ip, gün) unique index'i sayesinde yeniden başlatma sonrası
+    tekrar gelen kayıtlar INSERT OR IGNORE ile sessizce atlanır. Yazılamayan (örn. 'database is locked')
+    parti bekleyenlerin başına geri konur ve sonraki turda yeniden denenir; bellekte en fazla
+    azami_bekleyen satır tutulur, aşan en eski satırlar loglanıp bırakılır.
+    """
+
+    def __init__(self, app, flush_interval=5.0, batch_size=100, azami_bekleyen=None):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.azami_bekleyen = azami_bekleyen or batch_size * 100
+        self._lock = threading.Lock()
+        self._uyandir = threading.Event()
+        self._durdu = False
+        self._thread = None
+        self._gun = None
+        self._gorulen = set()
+        self._bekleyen = []
+        self._goruntuleme = Counter()
+        atexit.register(self.stop)
+
+    @staticmethod
+    def _anahtar(ip):
+        return hashlib.blake2b((ip or '').encode(), digest_size=8).digest()
+
+    def track(self, ip, sayfa):
+        simdi = datetime.utcnow()
+        anahtar = self._anahtar(ip)
+        with self._lock:
+            if simdi.date() != self._gun:
+                self._gun = simdi.date()
+                self._gorulen = set()
+            self._goruntuleme[(simdi.date(), sayfa)] += 1
+            if anahtar in self._gorulen:
+                return False
+            self._gorulen.add(anahtar)
+            self._bekleyen.append({'ip_adresi': ip, 'tarih': simdi, 'sayfa': sayfa})
+            # Geri konmuş parti varken her istekte değil, her batch_size yeni satırda bir uyandırır
+            dolu = len(self._bekleyen) % self.batch_size == 0
+        self._baslat()
+        if dolu:
+            self._uyandir.set()
+        return True
+
+    def bekleyen_tekil(self, gun):
+        """Henüz yazılmamış, verilen güne ait tekil ziyaret sayısı."""
+        with self._lock:
+            return sum(1 for satir in self._bekleyen if satir['tarih'].date() == gun)
+
+    def flush(self):
+        with self._lock:
+            satirlar, self._bekleyen = self._bekleyen, []
+            goruntuleme, self._goruntuleme = self._goruntuleme, Counter()
+        if not satirlar and not goruntuleme:
+            return 0
+        with self.app.app_context():
+            try:
+                if satirlar:
+                    db.session.execute(insert(Ziyaretci).prefix_with('OR IGNORE'), satirlar)
+                for (gun, sayfa), adet in goruntuleme.items():
+                    baslangic, bitis = gun_araligi(gun)
+                    db.session.execute(OZET_UPSERT, {'gun': gun.isoformat(), 'sayfa': sayfa, 'baslangic': str(baslangic), 'bitis': str(bitis), 'goruntuleme': adet})
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception('%d ziyaret kaydı yazılamadı, sonraki turda yeniden denenecek', len(satirlar))
+                self._geri_koy(satirlar, goruntuleme)
+                return 0
+        return len(satirlar)
+
+    def _geri_koy(self, satirlar, goruntuleme):
+        with self._lock:
+            self._bekleyen[:0] = satirlar
+            goruntuleme.update(self._goruntuleme)
+            self._goruntuleme = goruntuleme
+            fazla = len(self._bekleyen) - self.azami_bekleyen
+            if fazla > 0:
+                del self._bekleyen[:fazla]
+            # (gün, sayfa) anahtarları da aynı sınırla; en eski günler bırakılır
+            fazla_ozet = len(self._goruntuleme) - self.azami_bekleyen
+            if fazla_ozet > 0:
+                for anahtar in sorted(self._goruntuleme)[:fazla_ozet]:
+                    del self._goruntuleme[anahtar]
+        if fazla > 0 or fazla_ozet > 0:
+            logger.error('Ziyaret tamponu dolu: %d ziyaret ve %d özet satırı bırakıldı', max(fazla, 0), max(fazla_ozet, 0))
+
+    def stop(self):
+        self._durdu = True
+        self._uyandir.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def _baslat(self):
+        if self._thread is not None or self._durdu:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dongu, name='ziyaret-flush', daemon=True)
+                self._thread.start()
+
+    def _dongu(self):
+        while not self._durdu:
+            self._uyandir.wait(self.flush_interval)
+            self._uyandir.clear()
+            self.flush()
+
+
+def ozet_doldur(sinir=None):
+    """Ham tablodaki (sinir verilirse sadece o tarihten önceki) günleri özete katlar."""
+    gun = func.date(Ziyaretci.tarih)
+    sorgu = db.session.query(gun, Ziyaretci.sayfa, func.count()).group_by(gun, Ziyaretci.sayfa)
+    if sinir is not None:
+        sorgu = sorgu.filter(Ziyaretci.tarih < sinir)
+    satirlar = sorgu.all()
+    for gun_str, sayfa, adet in satirlar:
+        db.session.execute(KATLA_UPSERT, {'gun': gun_str, 'sayfa': sayfa or '/', 'adet': adet})
+    return len(satirlar)
+
+
+def sikistir(gun_sayisi):
+    """gun_sayisi günden eski ham ziyaretleri özete katlayıp siler; (katlanan gün, silinen satır) döndürür."""
+    sinir = datetime.combine(datetime.utcnow().date() - timedelta(days=gun_sayisi), datetime.min.time())
+    katlanan = ozet_doldur(sinir)
+    silinen = Ziyaretci.query.filter(Ziyaretci.tarih < sinir).delete(synchronize_session=False)
+    db.session.commit()
+    return katlanan, silinen
+
+
+def istatistikler(bugun):
+    """Dashboard sayaçları: (toplam tekil ziyaret, bugünkü tekil ziyaret)."""
+    toplam = db.session.query(func.coalesce(func.sum(ZiyaretOzet.tekil_ziyaretci), 0)).scalar()
+    bugunku = db.session.query(func.coalesce(func.sum(ZiyaretOzet.tekil_ziyaretci), 0)).filter(ZiyaretOzet.gun == bugun).scalar()
+    return toplam, bugunku